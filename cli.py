@@ -0,0 +1,128 @@
+#cli.py
+# Headless batch processing: load projects, build the hull, write meshes/tables.
+#
+#   python cli.py hull_a.json hull_b.csv variants/*.hullbin --out build --jobs 8
+#
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core import hull_pipeline
+from core.hull_model import HullModel
+
+
+def output_names(paths):
+    """
+    Output base name per project: the file stem, or for stems used more than
+    once the path below their common directory (v1/hull.csv -> v1_hull),
+    with an index when that is still not unique.
+    """
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    counts = Counter(stems)
+
+    dup_dirs = [os.path.dirname(os.path.abspath(p)) for p, s in zip(paths, stems) if counts[s] > 1]
+    common = os.path.commonpath(dup_dirs) if dup_dirs else ""
+
+    names = []
+    for p, stem in zip(paths, stems):
+        if counts[stem] > 1:
+            rel = os.path.relpath(os.path.abspath(p), common)
+            stem = os.path.splitext(rel)[0].replace(os.sep, "_")
+        names.append(stem)
+
+    # same file twice, hull.csv + hull.json, ...
+    counts = Counter(names)
+    seen = Counter()
+    for i, name in enumerate(names):
+        if counts[name] > 1:
+            seen[name] += 1
+            names[i] = f"{name}_{seen[name]}"
+    return names
+
+
+def process_project(path, out_dir, write_mesh=True, write_grid=True, name=None):
+    """Build one project, returns a summary dict (runs in a worker process with --jobs)"""
+    start = time.perf_counter()
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+
+    model = HullModel.from_file(path)
+    if len(model.station_order) < 4:
+        raise ValueError("Need at least 4 stations to build the hull")
+
+    hull = model.build_hull(with_normals=write_mesh)
+
+    outputs = []
+    if write_mesh:
+        outputs.append(os.path.join(out_dir, name + ".obj"))
+        hull_pipeline.write_obj(outputs[-1], hull["vertices"], hull["faces"], hull["normals"], name)
+    if write_grid:
+        outputs.append(os.path.join(out_dir, name + "_grid.csv"))
+        hull_pipeline.write_grid_csv(outputs[-1], hull["S"])
+
+    return {
+        "project": path,
+        "stations": len(model.station_order),
+        "grid": hull["S"].shape[:2],
+        "faces": len(hull["faces"]),
+        "outputs": outputs,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="JALAYN headless hull builder: station frames, Gordon surface, "
+                    "buttock bottom blend and meshing for JSON / CSV / binary projects."
+    )
+    parser.add_argument("projects", nargs="+", help="project files (.json, .csv, .hullbin)")
+    parser.add_argument("-o", "--out", default=".", help="output directory (default: current)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="projects built in parallel (process pool)")
+    parser.add_argument("--no-mesh", action="store_true", help="do not write the OBJ mesh")
+    parser.add_argument("--no-grid", action="store_true", help="do not write the surface grid CSV")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    options = (args.out, not args.no_mesh, not args.no_grid)
+    jobs = list(zip(args.projects, output_names(args.projects)))
+
+    failed = 0
+
+    def report(path, result=None, error=None):
+        nonlocal failed
+        if error is not None:
+            failed += 1
+            print(f"FAILED {path}: {error}", file=sys.stderr)
+        else:
+            nu, nv = result["grid"]
+            print(f"ok     {path}: {result['stations']} stations, grid {nu}x{nv}, "
+                  f"{result['faces']} faces, {result['seconds']:.2f} s")
+
+    if args.jobs <= 1 or len(args.projects) == 1:
+        for path, name in jobs:
+            try:
+                report(path, process_project(path, *options, name))
+            except Exception as e:
+                report(path, error=e)
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(process_project, path, *options, name): path for path, name in jobs}
+            for future in as_completed(futures):
+                try:
+                    report(futures[future], future.result())
+                except Exception as e:
+                    report(futures[future], error=e)
+
+    print(f"{len(args.projects) - failed}/{len(args.projects)} projects built")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#autosave.py
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from . import project_io
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".jalayn", "autosave")
+MANIFEST = "autosave.json"
+HEARTBEAT = 60          # seconds, an idle session touches its manifest
+STALE_AFTER = 10 * 60   # a session without a heartbeat this long has ended
+
+
+# ==============================
+# Change signatures
+# ==============================
+# Cheap values taken on the Tk thread, a section is packed and rewritten
+# only when its signature differs from the one of the last autosave.
+
+def _polylines(order, points):
+    return tuple((k, tuple(points.get(k, ()))) for k in order)
+
+
+def signature(model, section):
+    if section == "meta":
+        dims = getattr(model, "ship_dimensions", {})
+        return getattr(model, "project_name", None), tuple(dims.items())
+
+    if section == "stations":
+        stations = model.stations
+        order = tuple(model.station_order)
+        names = tuple(model.station_names.get(x) for x in order)
+        version = getattr(stations, "version", None)     # StationTable edit stamp
+        if version is None:
+            version = _polylines(order, stations)
+        return version, order, names
+
+    if section == "waterlines":
+        order = tuple(getattr(model, "waterline_order", None) or model.waterlines)
+        names = tuple(model.waterline_names.get(z) for z in order)
+        return _polylines(order, model.waterline_points), names
+
+    if section == "buttocklines":
+        order = tuple(getattr(model, "buttocklines", []))
+        names = tuple(model.buttockline_names.get(y) for y in order)
+        return _polylines(order, getattr(model, "buttockline_points", {})), names
+
+    return tuple(getattr(model, "centerline_points", ()) or ())
+
+
+# ==============================
+# Autosave worker
+# ==============================
+class Autosave:
+    """
+    Background autosave into one file per section (project_io layout),
+    each session (app instance) in its own subdirectory.
+
+    request(model) runs on the Tk thread: it compares the section
+    signatures and packs only the changed sections into new arrays
+    (memcpy, no serialization). The first save of a session packs every
+    section, so a session's autosave is always complete.
+    A daemon thread writes them to new files, then switches the
+    session's manifest to them and removes the files it no longer
+    lists: a failed write leaves the last complete set in place.
+    Requests made while a write is running are merged and written next.
+
+    Other sessions are left alone while they run (an idle one touches
+    its manifest every HEARTBEAT seconds); they are removed once they
+    are closed or have been silent for STALE_AFTER.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        self.session = uuid.uuid4().hex[:12]
+        self.path = os.path.join(directory, self.session)
+        self.signatures = {}
+        self.complete = False       # every section written in this session
+        self.pending = {}           # section -> (header, arrays) waiting for the worker
+        self.cond = threading.Condition()   # guards the three above and stopped
+        self.files = {}             # section -> file name in the manifest (worker)
+        self.manifest = None
+        self.generation = 0
+        self.thread = None
+        self.stopped = False
+
+        self.saves = 0
+        self.last_save = None
+        self.last_error = None
+
+    def file_name(self, section):
+        return f"{section}-{self.generation}.bin"
+
+    # ------------------------------
+    # Tk thread
+    # ------------------------------
+    def request(self, model):
+        """Snapshot the changed sections and hand them to the worker, their names"""
+        sigs = {section: signature(model, section) for section in project_io.SECTIONS}
+        with self.cond:
+            changed = [s for s, sig in sigs.items() if self.signatures.get(s) != sig]
+            if not changed:
+                return []
+            if not self.complete:
+                changed = list(project_io.SECTIONS)
+                self.complete = True
+
+            self.signatures.update(sigs)
+            self.pending.update({section: project_io.SECTIONS[section](model) for section in changed})
+            self.cond.notify()
+        self.start()
+        return changed
+
+    def prime(self, model):
+        """Take the current state as saved (the last session's autosave stays until an edit)"""
+        sigs = {section: signature(model, section) for section in project_io.SECTIONS}
+        with self.cond:
+            self.signatures.update(sigs)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """Write what is pending, mark the session closed and wait for the worker"""
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    # ------------------------------
+    # Worker thread
+    # ------------------------------
+    def run(self):
+        while True:
+            with self.cond:
+                if not self.pending and not self.stopped:
+                    self.cond.wait(HEARTBEAT)
+                sections, self.pending = self.pending, {}
+                stopped = self.stopped
+
+            if sections:
+                self.save(sections)
+            elif stopped:
+                self.close()
+                return
+            else:
+                self.heartbeat()
+
+    def save(self, sections):
+        try:
+            self.write(sections)
+            self.saves += 1
+            self.last_save = time.time()
+            self.last_error = None
+        except Exception as e:
+            # retried on the next request (everything if no complete set is on disk yet)
+            with self.cond:
+                self.last_error = e
+                for section in sections:
+                    self.signatures.pop(section, None)
+                if len(self.files) < len(project_io.SECTIONS):
+                    self.complete = False
+
+    def write(self, sections):
+        os.makedirs(self.path, exist_ok=True)
+        self.generation += 1
+        files = dict(self.files)
+        for section, (header, arrays) in sections.items():
+            files[section] = self.file_name(section)
+            project_io.write_arrays(os.path.join(self.path, files[section]), header, arrays)
+
+        # all sections written: switch the manifest to the new set
+        self.write_manifest({"saved": time.time(), "session": self.session, "sections": files})
+        self.files = files
+
+        self.remove_stale()
+
+    def write_manifest(self, manifest):
+        tmp = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.path, MANIFEST))
+        self.manifest = manifest
+
+    def heartbeat(self):
+        if self.manifest is not None:
+            try:
+                os.utime(os.path.join(self.path, MANIFEST))
+            except OSError:
+                pass
+
+    def close(self):
+        """Mark the manifest closed: the next session may remove it after its first save"""
+        if self.manifest is not None:
+            try:
+                self.write_manifest(dict(self.manifest, closed=True))
+            except OSError:
+                pass
+
+    def remove_stale(self):
+        """Own files the manifest no longer lists, and the directories of ended sessions"""
+        listed = set(self.files.values()) | {MANIFEST}
+        for name in os.listdir(self.path):
+            if name not in listed:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name != self.session and os.path.isdir(path) and session_ended(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+
+# ==============================
+# Sessions on disk
+# ==============================
+def read_manifest(path):
+    """Manifest of the session directory path, None when it has none"""
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def session_ended(path):
+    """Session closed, or without a write or heartbeat for STALE_AFTER"""
+    manifest = read_manifest(path)
+    if manifest is not None and manifest.get("closed"):
+        return True
+    try:
+        # a session still writing its first set has no manifest yet
+        changed = os.path.getmtime(os.path.join(path, MANIFEST) if manifest is not None else path)
+    except OSError:
+        return False
+    return time.time() - changed > STALE_AFTER
+
+
+def read_autosave(directory=DEFAULT_DIR):
+    """Newest autosave of all sessions as a read_project-like dict, None when there is none"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return None
+
+    newest = None
+    for name in names:
+        manifest = read_manifest(os.path.join(directory, name))
+        if manifest is not None and (newest is None or manifest.get("saved", 0) > newest[1].get("saved", 0)):
+            newest = (os.path.join(directory, name), manifest)
+    if newest is None:
+        return None
+
+    path, manifest = newest
+    project = {"header": {}, "arrays": {}, "saved": manifest.get("saved")}
+    for filename in manifest.get("sections", {}).values():
+        # read into memory: the next autosave replaces these files
+        part = project_io.read_project(os.path.join(path, filename), mmap=False)
+        project["header"].update(part["header"])
+        project["arrays"].update(part["arrays"])
+    return project
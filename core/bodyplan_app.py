@@ -1,12 +1,30 @@
 #bodyplan_app.py
 import tkinter as tk
-from collections import defaultdict
 from PIL import Image, ImageTk
 from ui.draw_canvas import CanvasDrawer
+from core.hull_model import HullModel, model_property
+from core.undo_journal import UndoJournal
 
 class BodyPlan3DApp:
 
+    # geometry lives in self.model (core/hull_model.py), the UI observes it
+    stations = model_property("stations")
+    station_order = model_property("station_order")
+    station_names = model_property("station_names")
+    waterlines = model_property("waterlines")
+    waterline_order = model_property("waterline_order")
+    waterline_names = model_property("waterline_names")
+    waterline_points = model_property("waterline_points")
+    buttocklines = model_property("buttocklines")
+    buttockline_names = model_property("buttockline_names")
+    buttockline_points = model_property("buttockline_points")
+    centerline_points = model_property("centerline_points")
+    ship_dimensions = model_property("ship_dimensions")
+
     def __init__(self, master):        
+        self.model = HullModel()
+        self.model.subscribe(self.on_model_changed)
+
         # --- data initialization ---
         self.width = 1400
         self.height = 700
@@ -14,8 +32,6 @@ class BodyPlan3DApp:
         self.divider_y = self.height // 2
         self.dragging = None
 
-        self.stations = {}
-        self.station_order = []
         self.station_spline = {}
 
         self.point_angles = {}  # On Progress
@@ -45,20 +61,10 @@ class BodyPlan3DApp:
         self.use_spline = True
         self.station_names = {-1.0: "WL1", -2.5: "WL2"}
 
-        self.waterlines = {}
-        self.waterline_order = []  
-        self.waterline_names = {}
-        self.waterline_points = defaultdict(list)
-        self.centerline_points = []
         self.centerline_spline = True
-
-        self.buttockline_points = defaultdict(list)
         self.buttockline_spline = {}
-        self.buttockline_names = {} 
 
-        self.undo_stack = []
-        self.redo_stack = []
-        self.ship_dimensions = {"Lpp": 20.0, "Bmax": 10.0, "Draft": 5.0}
+        self.journal = UndoJournal()        # undo / redo as diff patches
         self.additional_canvases = []
 
         self.popup_windows = []
@@ -118,6 +124,18 @@ class BodyPlan3DApp:
         d.project_side = m.project_side
         d.project_iso = m.project_iso
         d.update_waterlines = m.update_waterlines
+
+
+    def on_model_changed(self, model, what, keys):
+        """Model observer: drop caches, queue the live preview, redraw"""
+        if what == "loaded":
+            if getattr(self, "waterline_cache", None) is not None:
+                self.waterline_cache.clear()
+            keys = model.station_order
+        for x in keys or ():
+            self.mark_station_dirty(x)
+        if self.canvas is not None:
+            self.draw_all()
         
 
     # ==== projection ====
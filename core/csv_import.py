@@ -0,0 +1,204 @@
+#csv_import.py
+import csv
+import io
+import os
+import numpy as np
+
+# ==============================
+# Streaming CSV importer
+# ==============================
+#
+# Reads offset tables block by block (BLOCK_BYTES of whole lines) and
+# parses each block with np.loadtxt into a structured array, no Python
+# object per row. A block loadtxt rejects (empty or non-numeric field,
+# missing column) is parsed again row by row and its bad rows are
+# dropped, like the old csv.DictReader loader did. Two layouts are
+# recognized from the header:
+#
+#   project  : type,name,axis_value,y,z      (save_project, assets/sample.csv)
+#   stations : station_name,station_x,y,z    (Station List > Export CSV)
+#
+# The result has the layout of project_io.read_project, so it is put
+# into the model with project_io.load_into.
+
+BLOCK_BYTES = 1024 * 1024          # ~25k rows, keeps each GIL hold short
+
+LAYOUTS = {
+    "project": ("type", "name", "axis_value", "y", "z"),
+    "stations": ("station_name", "station_x", "y", "z"),
+}
+
+KINDS = ("station", "waterline", "buttockline", "centerline")
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+def detect_layout(header_line):
+    """Layout name and column indexes from the header line"""
+    columns = [c.strip().strip('"').lower() for c in header_line.strip().split(",")]
+    for layout, needed in LAYOUTS.items():
+        if all(c in columns for c in needed):
+            return layout, [columns.index(c) for c in needed]
+    raise ValueError(f"Unknown CSV header: {header_line.strip()}")
+
+
+def read_blocks(f, block_bytes=BLOCK_BYTES):
+    """Text blocks of whole lines from an open file"""
+    rest = ""
+    while True:
+        text = f.read(block_bytes)
+        if not text:
+            break
+        text = rest + text
+        cut = text.rfind("\n") + 1
+        if cut == 0:
+            rest = text
+            continue
+        rest = text[cut:]
+        yield text[:cut]
+    if rest.strip():
+        yield rest + "\n"
+
+
+def block_dtype(layout):
+    if layout == "project":
+        return [("kind", "U16"), ("name", "U64"), ("axis", "f8"), ("a", "f8"), ("b", "f8")]
+    return [("name", "U64"), ("axis", "f8"), ("a", "f8"), ("b", "f8")]
+
+
+def parse_block(text, layout, usecols):
+    """Rows of a block as a structured array (kind, name, axis, a, b)"""
+    # "-" marks a station without points
+    marked = text.replace(",-,", ",nan,").replace(",-\n", ",nan\n")
+    try:
+        rows = np.loadtxt(io.StringIO(marked), delimiter=",", quotechar='"',
+                          dtype=block_dtype(layout), usecols=usecols, ndmin=1)
+    except ValueError:
+        return parse_rows(text, layout, usecols)
+    return rows[~np.isnan(rows["axis"])]
+
+
+def parse_rows(text, layout, usecols):
+    """Slow path of parse_block: row by row, rows with a bad field are dropped"""
+    rows = []
+    for fields in csv.reader(io.StringIO(text)):
+        if not fields:
+            continue
+        try:
+            picked = [fields[i].strip() for i in usecols]
+            axis = float(picked[-3])
+            a, b = (np.nan if v == "-" else float(v) for v in picked[-2:])
+        except (IndexError, ValueError):
+            continue
+        if np.isnan(axis):
+            continue
+        rows.append((*picked[:-3], axis, a, b))
+    return np.array(rows, dtype=block_dtype(layout))
+
+
+class SectionBuilder:
+    """
+    Rows of one kind (station, waterline, ...) collected over the blocks,
+    grouped by axis value at the end. Names are kept for the first row of
+    each key only.
+    """
+
+    def __init__(self):
+        self.axis = []
+        self.points = []
+        self.names = {}     # key -> name, in order of first appearance
+
+    def add(self, axis, a, b, names):
+        if not len(axis):
+            return
+        keys, first = np.unique(axis, return_index=True)
+        for k in np.argsort(first).tolist():
+            key = keys[k].item()
+            if key not in self.names:
+                self.names[key] = str(names[first[k]])
+
+        # rows with "-" only register the key
+        keep = ~(np.isnan(a) | np.isnan(b))
+        self.axis.append(axis[keep])
+        self.points.append(np.column_stack((a[keep], b[keep])))
+
+    def build(self, order=None):
+        """keys (n,), lengths (n,), points (total, 2) grouped by key, file order inside a key"""
+        keys = list(self.names) if order is None else order
+        keys_arr = np.array(keys, dtype=float)
+        axis = np.concatenate(self.axis) if self.axis else np.empty(0)
+        points = np.concatenate(self.points) if self.points else np.empty((0, 2))
+
+        # position of each row's key in keys
+        sorter = np.argsort(keys_arr)
+        rank = sorter[np.searchsorted(keys_arr, axis, sorter=sorter)] if len(keys) else np.zeros(0, dtype=int)
+        order = np.argsort(rank, kind="stable")
+        lengths = np.bincount(rank, minlength=len(keys)).astype(np.int64)
+        return keys_arr, lengths, points[order]
+
+
+def import_csv(path, progress=None, cancelled=None, block_bytes=BLOCK_BYTES):
+    """
+    Parse an offset CSV, returns {"header", "arrays"} like project_io.read_project.
+    progress(done_bytes, total_bytes) is called after each block,
+    cancelled() returning True stops with ImportCancelled.
+    A stations layout file only holds the station arrays.
+    """
+    total = max(os.path.getsize(path), 1)
+    sections = {kind: SectionBuilder() for kind in KINDS}
+
+    with open(path, "r", encoding="utf-8-sig", newline=None) as f:
+        header_line = f.readline()
+        layout, usecols = detect_layout(header_line)
+        done = len(header_line)
+        for text in read_blocks(f, block_bytes):
+            if cancelled is not None and cancelled():
+                raise ImportCancelled()
+
+            rows = parse_block(text, layout, usecols)
+            if layout == "project":
+                kinds = rows["kind"]
+                if not np.isin(kinds, KINDS).all():
+                    kinds = np.char.lower(np.char.strip(kinds))    # " Station" etc.
+                for kind, builder in sections.items():
+                    m = kinds == kind
+                    if m.any():
+                        builder.add(rows["axis"][m], rows["a"][m], rows["b"][m], rows["name"][m])
+            else:
+                sections["station"].add(rows["axis"], rows["a"], rows["b"], rows["name"])
+
+            done += len(text)
+            if progress is not None:
+                progress(min(done, total), total)
+
+    if progress is not None:
+        progress(total, total)
+
+    # === Stations (x, y, z) ===
+    st = sections["station"]
+    keys, lengths, P = st.build(sorted(st.names))
+    stations = np.column_stack((np.repeat(keys, lengths), P))
+    header = {"station_names": [st.names[k] for k in keys.tolist()]}
+    arrays = {"station_keys": keys, "station_lengths": lengths, "station_points": stations}
+
+    if layout == "project":
+        wl = sections["waterline"]
+        keys, lengths, P = wl.build(sorted(wl.names, reverse=True))
+        header["waterline_names"] = [wl.names[k] for k in keys.tolist()]
+        arrays.update(waterline_keys=keys, waterline_lengths=lengths, waterline_points=P)
+
+        bl = sections["buttockline"]
+        keys, lengths, P = bl.build()
+        header["buttockline_names"] = [bl.names[k] for k in keys.tolist()]
+        arrays.update(buttockline_keys=keys, buttockline_lengths=lengths, buttockline_points=P)
+
+        # centerline rows: axis_value = x, z column = z
+        cl = sections["centerline"]
+        axis = np.concatenate(cl.axis) if cl.axis else np.empty(0)
+        z = np.concatenate(cl.points)[:, 1] if cl.points else np.empty(0)
+        order = np.argsort(axis, kind="stable")
+        arrays["centerline_points"] = np.column_stack((axis[order], z[order]))
+
+    return {"header": header, "arrays": arrays}
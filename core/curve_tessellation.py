@@ -0,0 +1,113 @@
+#curve_tessellation.py
+from functools import lru_cache
+import numpy as np
+
+
+# ==============================
+# Hermite basis (cached per step count)
+# ==============================
+@lru_cache(maxsize=32)
+def hermite_basis(steps, endpoint=False):
+    """
+    Cubic Hermite weights [h00, h10, h01, h11] at t = s / steps,
+    s = 0..steps-1 (0..steps with endpoint), (samples, 4) read-only.
+    """
+    t = np.arange(steps + 1 if endpoint else steps) / steps
+    t2 = t * t
+    t3 = t2 * t
+
+    H = np.column_stack((
+        2*t3 - 3*t2 + 1,    # h00
+        t3 - 2*t2 + t,      # h10
+        -2*t3 + 3*t2,       # h01
+        t3 - t2,            # h11
+    ))
+    H.setflags(write=False)
+    return H
+
+
+# ==============================
+# Tangents
+# ==============================
+def default_tangents(P):
+    """Forward difference at the start, backward at the end, half central difference between"""
+    M = np.empty_like(P)
+    M[0] = P[1] - P[0]
+    M[-1] = P[-1] - P[-2]
+    M[1:-1] = (P[2:] - P[:-2]) * 0.5
+    return M
+
+
+def catmull_rom_tangents(P):
+    """Catmull-Rom with the end points repeated: half differences everywhere"""
+    M = default_tangents(P)
+    M[[0, -1]] *= 0.5
+    return M
+
+
+# ==============================
+# Tessellation
+# ==============================
+def _segments(P, M):
+    """Per-segment control rows [p0, m0, p1, m1], (n-1, 4, dim)"""
+    return np.stack((P[:-1], M[:-1], P[1:], M[1:]), axis=1)
+
+
+def hermite_polyline(points, tangents=None, steps=20):
+    """
+    Polyline through points (n, dim): steps samples per segment
+    (t = 0..(steps-1)/steps) and the last point, (steps*(n-1) + 1, dim).
+    tangents default to default_tangents(points).
+    """
+    P = np.asarray(points, dtype=float)
+    M = default_tangents(P) if tangents is None else np.asarray(tangents, dtype=float)
+
+    out = np.empty(((len(P) - 1) * steps + 1, P.shape[1]))
+    out[:-1] = (hermite_basis(steps) @ _segments(P, M)).reshape(-1, P.shape[1])
+    out[-1] = P[-1]
+    return out
+
+
+def catmull_rom_polyline(points, steps=20):
+    """Catmull-Rom polyline (end points repeated), same sampling as hermite_polyline"""
+    P = np.asarray(points, dtype=float)
+    return hermite_polyline(P, catmull_rom_tangents(P), steps)
+
+
+def hermite_polylines(polylines, tangents=None, steps=20):
+    """
+    Many polylines (all of the same dim, at least 2 points each) with
+    one matrix product, list of arrays in the same order. tangents: one
+    array per polyline, default default_tangents.
+    """
+    Ps = [np.asarray(points, dtype=float) for points in polylines]
+    if not Ps:
+        return []
+    if tangents is None:
+        tangents = [default_tangents(P) for P in Ps]
+
+    G = np.concatenate([_segments(P, np.asarray(M, dtype=float)) for P, M in zip(Ps, tangents)])
+    samples = hermite_basis(steps) @ G          # (all segments, steps, dim)
+
+    result = []
+    start = 0
+    for P in Ps:
+        n = len(P) - 1
+        out = np.empty((n * steps + 1, P.shape[1]))
+        out[:-1] = samples[start:start + n].reshape(-1, P.shape[1])
+        out[-1] = P[-1]
+        result.append(out)
+        start += n
+    return result
+
+
+def catmull_rom_polylines(polylines, steps=20):
+    """Batch of catmull_rom_polyline, one matrix product"""
+    Ps = [np.asarray(points, dtype=float) for points in polylines]
+    return hermite_polylines(Ps, [catmull_rom_tangents(P) for P in Ps], steps)
+
+
+def hermite_segment(p0, p1, t0, t1, samples=32):
+    """One Hermite segment, samples + 1 points including both ends, (samples + 1, dim)"""
+    G = np.array((p0, t0, p1, t1), dtype=float)
+    return hermite_basis(samples, endpoint=True) @ G
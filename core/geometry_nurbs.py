@@ -2,6 +2,8 @@
 from scipy.interpolate import CubicSpline
 import numpy as np
 from .nurbs import NurbsSurface
+from .nurbs_basis import greville
+from .nurbs_curve import NurbsCurve
 
 
 class Nurbs_geometry: 
@@ -101,27 +103,52 @@ class Nurbs_geometry:
 
 
     def sample_surface(surface, nu=50, nv=30):
-        return np.array([
-            [surface.evaluate(u, v)
-            for v in np.linspace(0, 1, nv)]
-            for u in np.linspace(0, 1, nu)
-        ])
+        return surface.evaluate_grid(
+            np.linspace(0, 1, nu),
+            np.linspace(0, 1, nv)
+        )
+
+
+    @staticmethod
+    def surface_from_grid(Q, deg_u=3, deg_v=3):
+        """
+        NurbsSurface using grid Q (nu, nv, 3) as control net
+        (degree reduced if the grid is too small)
+        """
+        Q = np.asarray(Q, dtype=float)
+        nu, nv = Q.shape[:2]
+        p = min(deg_u, nu - 1)
+        q = min(deg_v, nv - 1)
+
+        U = NurbsSurface.open_uniform_knot(nu, p)
+        V = NurbsSurface.open_uniform_knot(nv, q)
+        return NurbsSurface(Q, np.ones((nu, nv)), U, V, p, q)
+
+
+    @staticmethod
+    def grid_normals(Q):
+        """
+        Analytic unit normals of the surface with Q (nu, nv, 3) as control
+        net, at the Greville point of each control point. That surface
+        only approximates Q: for the normals of a mesh through Q use
+        mesh.vertex_normals.
+        """
+        surface = Nurbs_geometry.surface_from_grid(Q)
+        us = greville(surface.U, surface.p, surface.nu)
+        vs = greville(surface.V, surface.q, surface.nv)
+
+        return surface.normals_grid(us, vs)
 
 
     @staticmethod
     def find_v_for_waterline(surface, z_target, u=0.5, n=200):
         vs = np.linspace(0, 1, n)
-        best_v = 0
-        best_err = 1e9
-
-        for v in vs:
-            pt = surface.evaluate(u, v)
-            err = abs(pt[2] - z_target)
-            if err < best_err:
-                best_err = err
-                best_v = v
+        pts = surface.evaluate_points(
+            np.column_stack((np.full(n, u), vs))
+        )
+        err = np.abs(pts[:, 2] - z_target)
 
-        return best_v
+        return vs[np.argmin(err)]
     
 
     @staticmethod
@@ -191,8 +218,11 @@ class Nurbs_geometry:
     ):
         """
         Gordon Surface:
-        - station_curves  : interpolatory curves (YZ)
-        - waterline_curves: interpolatory curves (XY)
+        - station_curves  : interpolatory curves (YZ), station i at u_i
+        - waterline_curves: interpolatory curves (XY), waterline j at v_j
+        u_i, v_j uniform in [0, 1]
+
+        Q = Lu(stations) + Lv(waterlines) - T(intersections)
         """
 
         # ==============================
@@ -201,142 +231,125 @@ class Nurbs_geometry:
         u_vals = np.linspace(0, 1, nu)
         v_vals = np.linspace(0, 1, nv)
 
-        Su = np.zeros((nu, nv, 3))
-        Sv = np.zeros((nu, nv, 3))
-        Suv = np.zeros((nu, nv, 3))
+        u_nodes = np.linspace(0, 1, len(station_curves))
+        v_nodes = np.linspace(0, 1, len(waterline_curves))
 
         # ==============================
-        # 2. Surface from stations
+        # 2. Evaluate each curve once
         # ==============================
-        for i, u in enumerate(u_vals):
-            idx = int(u * (len(station_curves) - 1))
-            curve = station_curves[idx]
-
-            for j, v in enumerate(v_vals):
-                Su[i, j] = curve.evaluate(v)
+        C_st = np.stack([c.evaluate(v_vals) for c in station_curves])      # (n_st, nv, 3)
+        C_wl = np.stack([c.evaluate(u_vals) for c in waterline_curves])    # (n_wl, nu, 3)
 
         # ==============================
-        # 3. Surface from waterlines
+        # 3. Intersection points of the curve network
         # ==============================
-        for j, v in enumerate(v_vals):
-            idx = int(v * (len(waterline_curves) - 1))
-            curve = waterline_curves[idx]
-
-            for i, u in enumerate(u_vals):
-                Sv[i, j] = curve.evaluate(u)
+        X_st = np.stack([c.evaluate(v_nodes) for c in station_curves])     # (n_st, n_wl, 3)
+        X_wl = np.stack([c.evaluate(u_nodes) for c in waterline_curves])   # (n_wl, n_st, 3)
+        X = 0.5 * (X_st + X_wl.transpose(1, 0, 2))
 
         # ==============================
-        # 4. Correction surface
+        # 4. Lofting operators
         # ==============================
-        for i, u in enumerate(u_vals):
-            idx_u = int(u * (len(station_curves) - 1))
-            c_u = station_curves[idx_u]
+        Lu = NurbsCurve.interpolation_matrix(u_nodes, u_vals)   # (nu, n_st)
+        Lv = NurbsCurve.interpolation_matrix(v_nodes, v_vals)   # (nv, n_wl)
+
+        n_st, n_wl = len(station_curves), len(waterline_curves)
 
-            for j, v in enumerate(v_vals):
-                idx_v = int(v * (len(waterline_curves) - 1))
-                c_v = waterline_curves[idx_v]
+        Su = (Lu @ C_st.reshape(n_st, -1)).reshape(nu, nv, 3)
+        Sv = (Lv @ C_wl.reshape(n_wl, -1)).reshape(nv, nu, 3).transpose(1, 0, 2)
 
-                Suv[i, j] = 0.5 * (
-                    c_u.evaluate(v) +
-                    c_v.evaluate(u)
-                )
+        T = (Lu @ X.reshape(n_st, -1)).reshape(nu, n_wl, 3)
+        Suv = np.matmul(Lv, T)      # (nu, nv, 3)
 
         # ==============================
         # 5. Final Gordon surface grid
         # ==============================
         Q = Su + Sv - Suv
 
-        # ==============================
-        # 6. Interpolate surface from Q
-        # ==============================
         return Q
 
 
     @staticmethod
     def build_gordon_surface_grid(
         station_frames,     # list of StationFrame (sudah resample!)
-        waterline_zs        # list of Z (waterline)
+        waterline_zs,       # list of Z (waterline)
+        z_min=None          # bottom Z, default from station_frames
         ):
         """
         Gordon Surface GRID-LOCKED
         - station_frames harus punya jumlah sample YZ sama
         - waterline_zs diambil dari domain Z yang sama
+        - z_min given -> rows for a subset of the stations (live preview)
         """
 
-        n_station = len(station_frames)
         n_v = len(station_frames[0].yz)
-        n_wl = len(waterline_zs)
+        if any(len(frame.yz) != n_v for frame in station_frames):
+            raise ValueError("All station frames need the same number of YZ samples")
 
         # ==============================
         # 1. GRID from STATION
         # S[i,j]
         # ==============================
-        S = np.zeros((n_station, n_v, 3))
+        X = np.array([frame.x for frame in station_frames], dtype=float)
+        YZ = np.array([frame.yz for frame in station_frames], dtype=float)   # (n_station, n_v, 2)
+        Y, Z = YZ[:, :, 0], YZ[:, :, 1]
+
+        S = np.empty((len(X), n_v, 3))
+        S[:, :, 0] = X[:, None]
+        S[:, :, 1] = Y
+        S[:, :, 2] = Z
 
-        for i, frame in enumerate(station_frames):
-            for j, (y, z) in enumerate(frame.yz):
-                S[i, j] = [frame.x, y, z]
+        wl = np.asarray(waterline_zs, dtype=float)
+        if wl.size == 0:
+            return S
 
         # ==============================
-        # 2. GRID from WATERLINE
-        # W[j,i]
+        # 2. GRID from WATERLINE, all stations at once
+        # W[i,j] (station, waterline)
         # ==============================
-        W = np.zeros((n_wl, n_station, 3))
-        I = np.zeros((n_station, n_v, 3))  # intersection
-
-        z_min = min(
-            z for frame in station_frames
-            for _, z in frame.yz
-            )
-
-        for j, z_wl in enumerate(waterline_zs):
+        y_wl = _interp_rows(wl, Z, Y)
 
-            is_bottom = abs(z_wl - z_min) < 1e-6
+        # outside station Z range -> on centerline
+        inside = (wl[None, :] >= Z[:, :1]) & (wl[None, :] <= Z[:, -1:])
+        y_wl = np.where(inside, y_wl, 0.0)
 
-            for i, frame in enumerate(station_frames):
-                ys = [p[0] for p in frame.yz]
-                zs = [p[1] for p in frame.yz]
-
-                # ensure z valid
-                if z_wl < zs[0] or z_wl > zs[-1]:
-                    W[j, i] = [frame.x, 0.0, z_wl]
-                    continue
-
-                y = np.interp(z_wl, zs, ys)
-                W[j, i] = [frame.x, y, z_wl]
-
-                if is_bottom:
-                    continue 
+        W = np.empty((len(X), wl.size, 3))
+        W[:, :, 0] = X[:, None]
+        W[:, :, 1] = y_wl
+        W[:, :, 2] = wl[None, :]
 
         # ==============================
         # 3. INTERSECTION GRID
         # I[i,j]
         # ==============================
-        for i in range(n_station):
-            for j in range(n_v):
-                I[i, j] = S[i, j]  # identic by construction
+        I = S  # identic by construction
 
         # ==============================
         # 4. GORDON FORMULA (GRID)
         # ==============================
-        Q = np.zeros_like(S)
+        # nearest waterline for every sample Z
+        order = np.argsort(wl, kind="stable")
+        wl_sorted = wl[order]                   # ascending, equal Z by index
 
-        z_min = min(
-            z for frame in station_frames
-            for _, z in frame.yz
-        )
+        # neighbours below / above, first of equal waterlines
+        pos = np.searchsorted(wl_sorted, Z)
+        lo = np.searchsorted(wl_sorted, wl_sorted[np.clip(pos - 1, 0, wl.size - 1)])
+        hi = np.searchsorted(wl_sorted, wl_sorted[np.clip(pos, 0, wl.size - 1)])
 
-        for i in range(n_station):
-            for j in range(n_v):
-                z = S[i, j, 2]
+        # same choice as argmin: on equal distance the first waterline given
+        d_lo = np.abs(wl_sorted[lo] - Z)
+        d_hi = np.abs(wl_sorted[hi] - Z)
+        pick_hi = (d_hi < d_lo) | ((d_hi == d_lo) & (order[hi] < order[lo]))
+        k = order[np.where(pick_hi, hi, lo)]
 
-                # bottom = station only
-                if abs(z - z_min) < 1e-6:
-                    Q[i, j] = S[i, j]
-                    continue
+        Wk = np.take_along_axis(W, k[:, :, None], axis=1)
 
-                k = np.argmin(np.abs(np.array(waterline_zs) - z))
-                Q[i, j] = S[i, j] + W[k, i] - I[i, j]
+        # bottom = station only
+        if z_min is None:
+            z_min = Z.min()
+        bottom = np.abs(Z - z_min) < 1e-6
+
+        Q = np.where(bottom[:, :, None], S, S + Wk - I)
 
         return Q
 
@@ -380,6 +393,36 @@ class Nurbs_geometry:
         return Q
 
 
+def _interp_rows(x, xp, fp):
+    """
+    np.interp(x, xp[i], fp[i]) for every row i in one pass.
+    xp rows must be increasing. Returns (n_rows, len(x))
+    """
+    n_rows, n = xp.shape
+    x = np.asarray(x, dtype=float)
+
+    if n == 1:
+        return np.repeat(fp, x.size, axis=1)
+
+    # shift each row to its own band so one searchsorted covers all rows
+    band = (np.max(xp) - np.min(xp)) + np.max(np.abs(x - np.min(xp))) + 1.0
+    shift = np.arange(n_rows)[:, None] * band
+    keys = (xp + shift).ravel()
+
+    pos = np.searchsorted(keys, (x[None, :] + shift), side="right") - 1
+    idx = np.clip(pos - np.arange(n_rows)[:, None] * n, 0, n - 2)
+
+    rows = np.arange(n_rows)[:, None]
+    x0, x1 = xp[rows, idx], xp[rows, idx + 1]
+    f0, f1 = fp[rows, idx], fp[rows, idx + 1]
+
+    dx = x1 - x0
+    t = np.divide(x[None, :] - x0, dx, out=np.ones_like(x0), where=dx != 0)
+    t = np.clip(t, 0.0, 1.0)
+
+    return f0 + t * (f1 - f0)
+
+
 class StationFrame:
     def __init__(self, x_pos, yz_points, n_samples=50, collapse=False):
         """
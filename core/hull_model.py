@@ -0,0 +1,189 @@
+#hull_model.py
+from collections import defaultdict
+from . import project_io, hull_pipeline
+from .station_table import StationTable
+
+
+class HullModel:
+    """
+    Geometry of one hull without any UI: stations, waterlines, buttocks,
+    centerline and main dimensions, plus the hull build pipeline.
+
+    The GUI keeps one in app.model (the app attributes of FIELDS forward
+    to it) and observes it: after an edit, changed(what, keys) calls
+    every subscriber with (model, what, keys).
+    """
+
+    FIELDS = (
+        "stations", "station_order", "station_names",
+        "waterlines", "waterline_order", "waterline_names", "waterline_points",
+        "buttocklines", "buttockline_names", "buttockline_points",
+        "centerline_points", "ship_dimensions",
+    )
+
+    def __init__(self):
+        self.observers = []
+        self.ship_dimensions = {"Lpp": 20.0, "Bmax": 10.0, "Draft": 5.0}
+        self.station_frames = []    # shared with the viewer, only changed in place
+        self.clear_geometry()
+
+    def clear_geometry(self):
+        self.stations = StationTable()      # {x: [(x, y, z), ...]} backed by one array
+        self.station_order = []
+        self.station_names = {}
+
+        self.waterlines = {}
+        self.waterline_order = []
+        self.waterline_names = {}
+        self.waterline_points = defaultdict(list)
+
+        self.buttocklines = []
+        self.buttockline_names = {}
+        self.buttockline_points = defaultdict(list)
+
+        self.centerline_points = []
+
+        # last hull build (station frames, grid state for row updates)
+        self.station_frames.clear()
+        self.hull_state = None
+
+    # ------------------------------
+    # Observers
+    # ------------------------------
+    def subscribe(self, callback):
+        """callback(model, what, keys), returns callback"""
+        self.observers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.observers:
+            self.observers.remove(callback)
+
+    def changed(self, what, keys=None):
+        """
+        Notify after an edit. what: "stations", "sections", "dimensions",
+        "history" (undo / redo), "loaded" (everything replaced),
+        keys: touched station keys or None.
+        """
+        if what == "loaded":
+            self.hull_state = None
+        for callback in list(self.observers):
+            callback(self, what, keys)
+
+    # ------------------------------
+    # Files
+    # ------------------------------
+    def clear(self):
+        self.clear_geometry()
+        self.changed("loaded")
+
+    def load(self, project):
+        """Take a project from project_io.read_file / read_project / import_csv"""
+        project_io.load_into(self, project)
+        self.changed("loaded")
+
+    @classmethod
+    def from_file(cls, path, mmap=True):
+        model = cls()
+        project_io.load_into(model, project_io.read_file(path, mmap))
+        return model
+
+    def save(self, path):
+        project_io.write_project(path, self)
+
+    # ------------------------------
+    # Hull pipeline (arrays out)
+    # ------------------------------
+    def build_hull_grid(self):
+        """Full hull grid S (n_station, n_samples, 3), kept for row updates"""
+        S, frames, self.hull_state = hull_pipeline.build_hull_grid(
+            self.stations, self.station_order, self.waterline_order, self.buttockline_points
+        )
+        self.hull_state["version"] = self.stations.version
+        self.station_frames[:] = frames
+        return S
+
+    def edited_since(self, version):
+        """Stations edited after stations.version was version (all for None)"""
+        if version is None:
+            return set(self.station_order)
+        return {x for x, stamp in self.stations.stamps.items() if stamp > version}
+
+    def update_hull_rows(self, xs):
+        """
+        Re-fit the grid rows of stations xs and of those edited since
+        the last build, (S, first_row, last_row + 1) or None
+        """
+        st = self.hull_state
+        if st is None:
+            return None
+        result = hull_pipeline.update_hull_rows(
+            st, self.station_frames,
+            self.stations, self.station_order, self.waterline_order,
+            self.buttockline_points, set(xs) | self.edited_since(st["version"])
+        )
+        if result is not None:
+            st["version"] = self.stations.version
+        return result
+
+    def row_update_inputs(self, xs):
+        """
+        build_inputs() plus copies of the build state and frames for
+        hull_pipeline.update_rows in a worker thread, None without a build
+        """
+        st = self.hull_state
+        if st is None:
+            return None
+        inputs = self.build_inputs()
+        inputs["xs"] = set(xs) | self.edited_since(st["version"])
+        inputs["state"] = dict(st, S=st["S"].copy())   # rows of S are re-fitted in place
+        inputs["frames"] = list(self.station_frames)
+        return inputs
+
+    def accept_rows(self, result):
+        """Keep the state of a finished hull_pipeline.update_rows"""
+        self.station_frames[:] = result["frames"]
+        self.hull_state = result["state"]
+
+    def build_inputs(self, copy=True):
+        """Pipeline inputs, copies (for a worker thread) unless copy=False"""
+        stations = self.stations
+        buttocks = self.buttockline_points
+        if copy:
+            stations = stations.copy()
+            buttocks = {y: list(pts) for y, pts in buttocks.items()}
+        return {
+            "stations": stations,
+            "station_order": list(self.station_order),
+            "waterline_order": list(self.waterline_order),
+            "buttockline_points": buttocks,
+            "version": getattr(self.stations, "version", None),
+        }
+
+    def accept_build(self, result):
+        """
+        Keep a finished build for row updates, unless the buttocks moved
+        since its inputs. Stations edited since then are re-fitted by the
+        next row update.
+        """
+        self.station_frames[:] = result["frames"]
+        state = result["state"]
+        if state["buttocks"] != hull_pipeline.buttock_signature(self.buttockline_points):
+            state = None
+        else:
+            state["version"] = result["version"]
+        self.hull_state = state
+
+    def build_hull(self, with_normals=False):
+        """Grid and mesh (and vertex normals), {"S", "vertices", "faces", "normals", ...}"""
+        result = hull_pipeline.build_hull(self.build_inputs(copy=False), with_normals=with_normals)
+        self.accept_build(result)
+        return result
+
+
+def model_property(name):
+    """App attribute forwarded to app.model.<name>"""
+    return property(
+        lambda self: getattr(self.model, name),
+        lambda self, value: setattr(self.model, name, value),
+    )
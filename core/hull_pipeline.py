@@ -0,0 +1,308 @@
+#hull_pipeline.py
+import numpy as np
+from scipy.interpolate import interp1d
+from .geometry_nurbs import Nurbs_geometry, StationFrame
+from .mesh import surface_to_mesh, grid_faces, vertex_normals
+from .project_io import pack_polylines
+
+# ==============================
+# Hull build pipeline (no Tk)
+# ==============================
+# stations -> station frames -> Gordon grid -> buttock bottom blend -> mesh
+#
+# Plain functions on the geometry (stations mapping, station order,
+# waterline Z levels, buttock points), run by HullModel for the GUI
+# preview and the headless CLI (cli.py).
+
+COLLAPSE_BOW = False
+COLLAPSE_STERN = True
+
+
+class BuildCancelled(Exception):
+    pass
+
+
+def _step(progress, cancelled, done, total, stage):
+    """Between build steps: stop when cancelled, else report progress"""
+    if cancelled is not None and cancelled():
+        raise BuildCancelled()
+    if progress is not None:
+        progress(done, total, stage)
+
+
+def hull_sample_count(stations, station_order):
+    # grid-locked Gordon needs the same sample count on every station
+    n_samples = 40
+    for x in station_order:
+        ys = np.abs(np.asarray(stations[x], dtype=float).reshape(-1, 3)[:, 1])
+        if not len(ys):
+            continue
+        curv_hint = ys.max() - ys.min()
+        n_samples = max(n_samples, min(int(40 + curv_hint * 20), 70))
+    return n_samples
+
+
+def buttock_signature(buttockline_points):
+    """Buttock keys and packed points, a build state is only valid for the same ones"""
+    if not buttockline_points:
+        return None
+    keys, lengths, P = pack_polylines(sorted(buttockline_points), buttockline_points, 2)
+    return tuple(keys.tolist()), lengths.tobytes(), P.tobytes()
+
+
+def make_station_frames(stations, station_order, xs, n_samples, tick=None):
+    x_bow   = station_order[0]
+    x_stern = station_order[-1]
+
+    frames = []
+    for x in xs:
+        yz_pts = [(p[1], p[2]) for p in stations[x]]
+
+        collapse = (x == x_bow and COLLAPSE_BOW) or (x == x_stern and COLLAPSE_STERN)
+
+        frames.append(StationFrame(
+            x,
+            yz_pts,
+            n_samples=n_samples,
+            collapse=collapse
+        ))
+        if tick is not None:
+            tick(len(frames))
+    return frames
+
+
+def blend_bottom(S, frames, bottom, buttockline_points):
+    """Blend grid rows S into the buttock bottom surface under z_cut"""
+    B = Nurbs_geometry.build_surface_from_buttock(
+        station_frames=frames,
+        buttockline_points=buttockline_points
+    )
+
+    Y_s = bottom["Y_s"]
+    Y_b = B[0, :, 1]    # sorted buttock Y
+
+    f = interp1d(Y_b, B[:, :, 2], kind='cubic', fill_value='extrapolate', axis=1)
+
+    B_interp = np.empty_like(S)
+    B_interp[:, :, 0] = S[:, :, 0]  # x
+    B_interp[:, :, 1] = Y_s         # y
+    B_interp[:, :, 2] = f(Y_s)
+
+    z_cut = bottom["z_cut"]
+    blend_band = bottom["blend_band"]
+
+    z = S[:, :, 2:3]
+    t = (z - z_cut) / blend_band    # 0..1 inside the band
+
+    return np.where(
+        z <= z_cut,
+        B_interp,
+        np.where(z <= z_cut + blend_band, (1 - t) * B_interp + t * S, S)
+    )
+
+
+def build_hull_grid(stations, station_order, waterline_order, buttockline_points=None,
+                    progress=None, cancelled=None):
+    """
+    Full hull grid S (n_station, n_samples, 3).
+    Returns (S, frames, state), state is what update_hull_rows needs
+    to re-fit single rows later.
+    progress(done, total, stage) is called between steps, cancelled()
+    returning True stops the build with BuildCancelled.
+    """
+    total = len(station_order) + 3      # frames, Gordon grid, bottom, mesh
+
+    def tick(done, stage="station frames"):
+        _step(progress, cancelled, done, total, stage)
+
+    # 1 - 2 Station frames
+    tick(0)
+    n_samples = hull_sample_count(stations, station_order)
+    frames = make_station_frames(stations, station_order, station_order, n_samples, tick)
+    tick(len(frames), "Gordon surface")
+
+    # 3-4 Station & waterline curves are taken on the grid
+    # directly by build_gordon_surface_grid
+
+    # 5 Sample surface grid
+    frame_z_min = np.array([min(z for _, z in f.yz) for f in frames])
+    S = Nurbs_geometry.build_gordon_surface_grid(
+        station_frames=frames,
+        waterline_zs=waterline_order
+    )
+
+    # 6 Bottom override
+    bottom = None
+    if buttockline_points:
+        z_min = np.min(S[:, :, 2])
+        z_range = np.max(S[:, :, 2]) - z_min
+
+        bottom = {
+            "Y_s": S[0, :, 1].copy(),
+            "z_cut": z_min + 0.08 * z_range,    # 5–10% draft
+            "blend_band": 0.03 * z_range,
+        }
+
+    state = {
+        "order": tuple(station_order),
+        "waterlines": tuple(waterline_order),
+        "n_samples": n_samples,
+        "frame_z_min": frame_z_min,
+        "row_z_min": S[:, :, 2].min(axis=1),
+        "row_z_max": S[:, :, 2].max(axis=1),
+        "bottom": bottom,
+        "buttocks": buttock_signature(buttockline_points),
+    }
+
+    if bottom is not None:
+        tick(len(frames) + 1, "buttock bottom")
+        S = blend_bottom(S, frames, bottom, buttockline_points)
+
+    state["S"] = S
+    return S, frames, state
+
+
+def update_hull_rows(state, frames_all, stations, station_order, waterline_order, buttockline_points, xs):
+    """
+    Re-fit only the grid rows of stations xs (state and frames_all are updated).
+    Returns (S, first_row, last_row + 1) or None when a full build is needed.
+    """
+    st = state
+    if (st is None
+            or st["order"] != tuple(station_order)
+            or st["waterlines"] != tuple(waterline_order)
+            or st["n_samples"] != hull_sample_count(stations, station_order)
+            or st["buttocks"] != buttock_signature(buttockline_points)):
+        return None     # every row would get a new bottom
+
+    rows = sorted(station_order.index(x) for x in xs if x in station_order)
+    if not rows:
+        return None
+    if st["bottom"] is not None and rows[0] == 0:
+        return None     # row 0 defines the buttock Y sampling
+
+    frames = make_station_frames(stations, station_order, [station_order[i] for i in rows], st["n_samples"])
+
+    # bottom Z of the whole hull must stay the same
+    frame_z_min = st["frame_z_min"].copy()
+    frame_z_min[rows] = [min(z for _, z in f.yz) for f in frames]
+    if frame_z_min.min() != st["frame_z_min"].min():
+        return None
+
+    Q = Nurbs_geometry.build_gordon_surface_grid(
+        station_frames=frames,
+        waterline_zs=waterline_order,
+        z_min=frame_z_min.min()
+    )
+
+    # blending band comes from the global Z range
+    row_z_min = st["row_z_min"].copy()
+    row_z_max = st["row_z_max"].copy()
+    row_z_min[rows] = Q[:, :, 2].min(axis=1)
+    row_z_max[rows] = Q[:, :, 2].max(axis=1)
+    if st["bottom"] is not None and (
+            row_z_min.min() != st["row_z_min"].min() or
+            row_z_max.max() != st["row_z_max"].max()):
+        return None
+
+    if st["bottom"] is not None:
+        Q = blend_bottom(Q, frames, st["bottom"], buttockline_points)
+
+    for k, i in enumerate(rows):
+        frames_all[i] = frames[k]
+    st["S"][rows] = Q
+    st["frame_z_min"] = frame_z_min
+    st["row_z_min"] = row_z_min
+    st["row_z_max"] = row_z_max
+
+    return st["S"], rows[0], rows[-1] + 1
+
+
+def update_rows(inputs):
+    """
+    update_hull_rows on HullModel.row_update_inputs(), safe in a worker
+    thread. {"S", "rows", "frames", "state", "version"}, rows is
+    (first_row, last_row + 1), or None when a full build is needed.
+    """
+    state, frames = inputs["state"], inputs["frames"]
+    result = update_hull_rows(
+        state, frames, inputs["stations"], inputs["station_order"],
+        inputs["waterline_order"], inputs["buttockline_points"], inputs["xs"]
+    )
+    if result is None:
+        return None
+    S, a, b = result
+    state["version"] = inputs["version"]
+    return {"S": S, "rows": (a, b), "frames": frames, "state": state, "version": inputs["version"]}
+
+
+def hull_normals(S):
+    """
+    Vertex normals of the mesh of grid S (surface_to_mesh order), float32.
+    Vertices without any face area (collapsed stern, keel points) take
+    the normal of their grid neighbours.
+    """
+    nu, nv, _ = S.shape
+    N = vertex_normals(S.reshape(-1, 3), grid_faces(nu, nv)).reshape(nu, nv, 3)
+
+    zero = ~N.any(axis=2)
+    while zero.any():
+        P = np.pad(N, ((1, 1), (1, 1), (0, 0)))
+        near = P[:-2, 1:-1] + P[2:, 1:-1] + P[1:-1, :-2] + P[1:-1, 2:]
+        length = np.linalg.norm(near, axis=2)
+        fill = zero & (length > 0)
+        if not fill.any():
+            break
+        N[fill] = near[fill] / length[fill][:, None]
+        zero &= ~fill
+
+    return N.reshape(-1, 3).astype(np.float32)
+
+
+def build_hull(inputs, progress=None, cancelled=None, with_normals=False):
+    """
+    Whole build from HullModel.build_inputs(), safe in a worker thread
+    when the inputs are copies. {"S", "frames", "state", "vertices",
+    "faces", "normals"} plus the "version" of the inputs; normals only
+    with_normals (OBJ export), the viewer shades the mesh itself.
+    """
+    S, frames, state = build_hull_grid(
+        inputs["stations"], inputs["station_order"], inputs["waterline_order"],
+        inputs["buttockline_points"], progress, cancelled
+    )
+    total = len(frames) + 3
+    _step(progress, cancelled, total - 1, total, "mesh")
+    vertices, faces = surface_to_mesh(S)
+    normals = hull_normals(S) if with_normals else None
+    _step(progress, cancelled, total, total, "done")
+
+    return {"S": S, "frames": frames, "state": state, "vertices": vertices,
+            "faces": faces, "normals": normals, "version": inputs.get("version")}
+
+
+# ==============================
+# Output
+# ==============================
+def write_obj(path, vertices, faces, normals=None, name="hull"):
+    """Wavefront OBJ, faces (n, 3) 0-based. Normals with a zero row are left out."""
+    vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3) + 1
+    if normals is not None and not np.asarray(normals).reshape(-1, 3).any(axis=1).all():
+        normals = None
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"o {name}\n")
+        np.savetxt(f, vertices, fmt="v %.6f %.6f %.6f")
+        if normals is not None:
+            np.savetxt(f, np.asarray(normals, dtype=float).reshape(-1, 3), fmt="vn %.6f %.6f %.6f")
+            np.savetxt(f, np.repeat(faces, 2, axis=1), fmt="f %d//%d %d//%d %d//%d")
+        else:
+            np.savetxt(f, faces, fmt="f %d %d %d")
+
+
+def write_grid_csv(path, S):
+    """Surface grid as a table: station (row), sample (column), x, y, z"""
+    nu, nv, _ = S.shape
+    i, j = np.divmod(np.arange(nu * nv), nv)
+    table = np.column_stack((i, j, S.reshape(-1, 3)))
+    np.savetxt(path, table, delimiter=",", fmt=["%d", "%d", "%.6f", "%.6f", "%.6f"],
+               header="station,sample,x,y,z", comments="")
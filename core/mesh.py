@@ -0,0 +1,82 @@
+#mesh.py
+from functools import lru_cache
+import numpy as np
+
+
+# ==============================
+# Grid topology (cached per grid shape)
+# ==============================
+@lru_cache(maxsize=16)
+def grid_faces(nu, nv):
+    """
+    Triangle indices for a (nu, nv) vertex grid, (2*(nu-1)*(nv-1), 3) uint32.
+    Per cell: [p0, p1, p2], [p1, p3, p2]
+    Read-only, shared by every mesh of the same grid shape.
+    """
+    i, j = np.meshgrid(np.arange(nu - 1), np.arange(nv - 1), indexing="ij")
+    p0 = (i * nv + j).ravel()
+    p1 = p0 + 1
+    p2 = p0 + nv
+    p3 = p2 + 1
+
+    faces = np.empty((p0.size, 2, 3), dtype=np.uint32)
+    faces[:, 0] = np.column_stack((p0, p1, p2))
+    faces[:, 1] = np.column_stack((p1, p3, p2))
+
+    faces = faces.reshape(-1, 3)
+    faces.setflags(write=False)
+    return faces
+
+
+@lru_cache(maxsize=16)
+def grid_quads(nu, nv):
+    """Quad indices [p0, p1, p3, p2] per cell, ((nu-1)*(nv-1), 4) uint32"""
+    i, j = np.meshgrid(np.arange(nu - 1), np.arange(nv - 1), indexing="ij")
+    p0 = (i * nv + j).ravel()
+
+    quads = np.column_stack((p0, p0 + 1, p0 + nv + 1, p0 + nv)).astype(np.uint32)
+    quads.setflags(write=False)
+    return quads
+
+
+@lru_cache(maxsize=16)
+def grid_strips(nu, nv):
+    """
+    One triangle strip per grid row, (nu-1, 2*nv) uint32.
+    Order (i+1, 0), (i, 0), (i+1, 1), (i, 1), ... keeps the orientation
+    of grid_faces (cells are split on the other diagonal).
+    """
+    i = np.arange(nu - 1)[:, None]
+    j = np.arange(nv)[None, :]
+
+    strips = np.empty((nu - 1, nv, 2), dtype=np.uint32)
+    strips[:, :, 0] = (i + 1) * nv + j
+    strips[:, :, 1] = i * nv + j
+
+    strips = strips.reshape(nu - 1, 2 * nv)
+    strips.setflags(write=False)
+    return strips
+
+
+def vertex_normals(vertices, faces):
+    """
+    Area weighted unit vertex normals of a triangle mesh (front side by
+    the face winding), zero rows where no face around a vertex has area.
+    """
+    V = np.asarray(vertices, dtype=float)
+    F = np.asarray(faces, dtype=np.intp)
+    face_n = np.cross(V[F[:, 1]] - V[F[:, 0]], V[F[:, 2]] - V[F[:, 0]])   # length = 2 * area
+
+    N = np.empty_like(V)
+    for c in range(3):
+        N[:, c] = np.bincount(F.ravel(), weights=np.repeat(face_n[:, c], 3), minlength=len(V))
+
+    length = np.linalg.norm(N, axis=1, keepdims=True)
+    return np.divide(N, length, out=np.zeros_like(N), where=length > 0)
+
+
+def surface_to_mesh(S):
+    """Grid S (nu, nv, 3) -> vertices (nu*nv, 3) float32, faces uint32"""
+    nu, nv, _ = S.shape
+    vertices = S.reshape(-1, 3).astype(np.float32)
+    return vertices, grid_faces(nu, nv)
@@ -1,5 +1,7 @@
 #nurbs. py
+from math import comb
 import numpy as np
+from .nurbs_basis import find_span, basis_funs, cached_basis_matrix
 
 class NurbsSurface:
     def __init__(self, P, W, U, V, p, q):
@@ -40,24 +42,111 @@ class NurbsSurface:
     
 
     def evaluate(self, u, v):
-        num = np.zeros(3)
-        den = 0.0
-
-        for i in range(self.nu):
-            Ni = self.bspline_basis(i, self.p, u, self.U, self.nu)
-            if Ni == 0:
-                continue
-            for j in range(self.nv):
-                Nj = self.bspline_basis(j, self.q, v, self.V, self.nv)
-                if Nj == 0:
-                    continue
-                w = self.W[i, j]
-                B = Ni * Nj * w
-                num += B * self.P[i, j]
-                den += B
+        """Point on surface at (u, v), only the (p+1)x(q+1) active control points"""
+        su = int(find_span(self.nu, self.p, u, self.U))
+        sv = int(find_span(self.nv, self.q, v, self.V))
+
+        Nu = basis_funs(su, u, self.p, self.U)[0]
+        Nv = basis_funs(sv, v, self.q, self.V)[0]
+
+        P = self.P[su - self.p:su + 1, sv - self.q:sv + 1]
+        W = self.W[su - self.p:su + 1, sv - self.q:sv + 1]
+
+        B = np.outer(Nu, Nv) * W
+        num = np.einsum("ij,ijk->k", B, P)
+        den = B.sum()
 
         return num / den
-    
+
+    def homogeneous(self):
+        """Weighted control net (nu, nv, 4) = [w*x, w*y, w*z, w]"""
+        return np.concatenate(
+            (self.P * self.W[..., None], self.W[..., None]),
+            axis=-1
+        )
+
+    def evaluate_grid(self, us, vs):
+        """
+        Evaluate the whole tensor grid us x vs at once.
+        Returns array (len(us), len(vs), 3)
+        """
+        Nu = cached_basis_matrix(us, self.p, self.U, self.nu)
+        Nv = cached_basis_matrix(vs, self.q, self.V, self.nv)
+
+        # homogeneous contraction: Nu . Pw . Nv^T
+        Pw = self.homogeneous()
+        Aw = (Nu @ Pw.reshape(self.nu, -1)).reshape(-1, self.nv, 4)
+        Aw = np.matmul(Nv, Aw)     # (len(us), len(vs), 4)
+
+        return Aw[..., :3] / Aw[..., 3:]
+
+    def evaluate_points(self, uv):
+        """
+        Evaluate scattered parameters.
+        uv : array (m, 2) of (u, v), returns (m, 3)
+        """
+        uv = np.asarray(uv, dtype=float).reshape(-1, 2)
+        u, v = uv[:, 0], uv[:, 1]
+
+        su = find_span(self.nu, self.p, u, self.U)
+        sv = find_span(self.nv, self.q, v, self.V)
+        Nu = basis_funs(su, u, self.p, self.U)
+        Nv = basis_funs(sv, v, self.q, self.V)
+
+        # active (p+1)x(q+1) patch per point
+        iu = su[:, None] - self.p + np.arange(self.p + 1)
+        iv = sv[:, None] - self.q + np.arange(self.q + 1)
+        Pw = self.homogeneous()[iu[:, :, None], iv[:, None, :]]
+
+        Aw = np.einsum("mi,mj,mijk->mk", Nu, Nv, Pw)
+        return Aw[:, :3] / Aw[:, 3:]
+
+    def derivatives_grid(self, us, vs, order=2):
+        """
+        Partial derivatives over the grid us x vs (rational, NURBS Book A4.4).
+        Returns SKL (order+1, order+1, len(us), len(vs), 3)
+        SKL[k, l] = d^(k+l) S / du^k dv^l, only filled for k + l <= order
+        """
+        Nu = cached_basis_matrix(us, self.p, self.U, self.nu, n_der=order)
+        Nv = cached_basis_matrix(vs, self.q, self.V, self.nv, n_der=order)
+        Pw = self.homogeneous().reshape(self.nu, -1)
+        mu, mv = Nu.shape[1], Nv.shape[1]
+
+        # derivatives of the homogeneous surface
+        Aw = np.zeros((order + 1, order + 1, mu, mv, 4))
+        for k in range(order + 1):
+            Ak = (Nu[k] @ Pw).reshape(mu, self.nv, 4)
+            for l in range(order + 1 - k):
+                Aw[k, l] = np.matmul(Nv[l], Ak)
+
+        A = Aw[..., :3]
+        w = Aw[..., 3:]
+
+        SKL = np.zeros((order + 1, order + 1, mu, mv, 3))
+        for k in range(order + 1):
+            for l in range(order + 1 - k):
+                v = A[k, l].copy()
+                for j in range(1, l + 1):
+                    v -= comb(l, j) * w[0, j] * SKL[k, l - j]
+                for i in range(1, k + 1):
+                    v -= comb(k, i) * w[i, 0] * SKL[k - i, l]
+                    for j in range(1, l + 1):
+                        v -= comb(k, i) * comb(l, j) * w[i, j] * SKL[k - i, l - j]
+                SKL[k, l] = v / w[0, 0]
+
+        return SKL
+
+    def normals_grid(self, us, vs):
+        """
+        Unit normals Su x Sv over the grid us x vs, (len(us), len(vs), 3)
+        Degenerate points (Su x Sv = 0) return a zero vector.
+        """
+        SKL = self.derivatives_grid(us, vs, order=1)
+        n = np.cross(SKL[1, 0], SKL[0, 1])
+
+        length = np.linalg.norm(n, axis=-1, keepdims=True)
+        return np.divide(n, length, out=np.zeros_like(n), where=length > 1e-12)
+
 
     def insert_knot_v(self, v_new):
         """Insert knot in v-direction (refinement) Shape-preserving"""
@@ -0,0 +1,245 @@
+# nurbs_basis.py
+from collections import OrderedDict
+import numpy as np
+
+
+# ==============================
+# Knot span
+# ==============================
+def find_span(n_ctrl, degree, t, knots):
+    """
+    Knot span index for parameter(s) t.
+    t can be scalar or array, result has the same shape.
+    Last parameter (t == knots[-1]) belong to the last non-empty span.
+    """
+    knots = np.asarray(knots, dtype=float)
+    t = np.asarray(t, dtype=float)
+    n = n_ctrl - 1
+
+    span = np.searchsorted(knots, t, side="right") - 1
+    span = np.clip(span, degree, n)
+
+    # right end of the domain -> last span
+    span = np.where(t >= knots[n + 1], n, span)
+    return span
+
+
+# ==============================
+# Non-zero basis functions
+# ==============================
+def basis_funs(span, t, degree, knots):
+    """
+    The p+1 non-zero basis functions N[span-p .. span] at t.
+    Returns array (m, p+1) for m parameters.
+    """
+    knots = np.asarray(knots, dtype=float)
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    span = np.atleast_1d(span)
+    m = t.shape[0]
+
+    N = np.zeros((m, degree + 1))
+    left = np.zeros((m, degree + 1))
+    right = np.zeros((m, degree + 1))
+    N[:, 0] = 1.0
+
+    for j in range(1, degree + 1):
+        left[:, j] = t - knots[span + 1 - j]
+        right[:, j] = knots[span + j] - t
+        saved = np.zeros(m)
+
+        for r in range(j):
+            temp = N[:, r] / (right[:, r + 1] + left[:, j - r])
+            N[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+
+        N[:, j] = saved
+
+    return N
+
+
+def ders_basis_funs(span, t, degree, knots, n_der):
+    """
+    Non-zero basis functions and their derivatives up to n_der.
+    Returns array (m, n_der+1, p+1), ders[:, k] is the k-th derivative.
+    """
+    knots = np.asarray(knots, dtype=float)
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    span = np.atleast_1d(span)
+    m = t.shape[0]
+    p = degree
+
+    # ndu[:, j, r] : basis (upper) & knot differences (lower)
+    ndu = np.zeros((m, p + 1, p + 1))
+    left = np.zeros((m, p + 1))
+    right = np.zeros((m, p + 1))
+    ndu[:, 0, 0] = 1.0
+
+    for j in range(1, p + 1):
+        left[:, j] = t - knots[span + 1 - j]
+        right[:, j] = knots[span + j] - t
+        saved = np.zeros(m)
+
+        for r in range(j):
+            ndu[:, j, r] = right[:, r + 1] + left[:, j - r]
+            temp = ndu[:, r, j - 1] / ndu[:, j, r]
+            ndu[:, r, j] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+
+        ndu[:, j, j] = saved
+
+    ders = np.zeros((m, n_der + 1, p + 1))
+    ders[:, 0, :] = ndu[:, :, p]
+
+    # derivatives above degree are zero
+    du = min(n_der, p)
+
+    # derivatives (The NURBS Book, A2.3)
+    for r in range(p + 1):
+        a = np.zeros((m, 2, p + 1))
+        a[:, 0, 0] = 1.0
+        s1, s2 = 0, 1
+
+        for k in range(1, du + 1):
+            d = np.zeros(m)
+            rk = r - k
+            pk = p - k
+
+            if r >= k:
+                a[:, s2, 0] = a[:, s1, 0] / ndu[:, pk + 1, rk]
+                d = a[:, s2, 0] * ndu[:, rk, pk]
+
+            j1 = 1 if rk >= -1 else -rk
+            j2 = k - 1 if r - 1 <= pk else p - r
+
+            for j in range(j1, j2 + 1):
+                a[:, s2, j] = (a[:, s1, j] - a[:, s1, j - 1]) / ndu[:, pk + 1, rk + j]
+                d = d + a[:, s2, j] * ndu[:, rk + j, pk]
+
+            if r <= pk:
+                a[:, s2, k] = -a[:, s1, k - 1] / ndu[:, pk + 1, r]
+                d = d + a[:, s2, k] * ndu[:, r, pk]
+
+            ders[:, k, r] = d
+            s1, s2 = s2, s1
+
+    # multiply by p!/(p-k)!
+    factor = float(p)
+    for k in range(1, du + 1):
+        ders[:, k, :] *= factor
+        factor *= (p - k)
+
+    return ders
+
+
+# ==============================
+# Dense basis matrix
+# ==============================
+def basis_matrix(t, degree, knots, n_ctrl, n_der=0):
+    """
+    Dense basis matrix for a parameter array.
+    n_der = 0 -> (m, n_ctrl)
+    n_der > 0 -> (n_der+1, m, n_ctrl), [k] is the k-th derivative
+    """
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    m = t.shape[0]
+
+    span = find_span(n_ctrl, degree, t, knots)
+    cols = span[:, None] - degree + np.arange(degree + 1)
+    rows = np.arange(m)[:, None]
+
+    if n_der == 0:
+        B = np.zeros((m, n_ctrl))
+        B[rows, cols] = basis_funs(span, t, degree, knots)
+        return B
+
+    ders = ders_basis_funs(span, t, degree, knots, n_der)
+    B = np.zeros((n_der + 1, m, n_ctrl))
+    for k in range(n_der + 1):
+        B[k][rows, cols] = ders[:, k]
+    return B
+
+
+def greville(knots, degree, n_ctrl):
+    """Greville abscissae: parameter site of each control point"""
+    knots = np.asarray(knots, dtype=float)
+    idx = np.arange(n_ctrl)[:, None] + 1 + np.arange(degree)
+    if degree == 0:
+        return knots[:n_ctrl].copy()
+    return knots[idx].mean(axis=1)
+
+
+# ==============================
+# Basis matrix cache (LRU)
+# ==============================
+class BasisCache:
+    """
+    LRU cache of evaluated basis matrices.
+    Key = (knot vector, degree, n_ctrl, n_der, parameter array)
+    Eviction when max_entries or max_bytes is exceeded.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(t, degree, knots, n_ctrl, n_der=0):
+        t = np.ascontiguousarray(t, dtype=float)
+        knots = np.ascontiguousarray(knots, dtype=float)
+        return (
+            knots.tobytes(), int(degree), int(n_ctrl), int(n_der),
+            t.shape, t.tobytes()
+        )
+
+    def get(self, t, degree, knots, n_ctrl, n_der=0):
+        """Cached basis_matrix(), returned array is read-only"""
+        key = self.make_key(t, degree, knots, n_ctrl, n_der)
+
+        B = self._data.get(key)
+        if B is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return B
+
+        self.misses += 1
+        B = basis_matrix(t, degree, knots, n_ctrl, n_der)
+        B.setflags(write=False)
+
+        self._data[key] = B
+        self.nbytes += B.nbytes
+        self._evict()
+        return B
+
+    def _evict(self):
+        while self._data and (
+            len(self._data) > self.max_entries or
+            self.nbytes > self.max_bytes
+        ):
+            _, old = self._data.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._data),
+            "bytes": self.nbytes,
+        }
+
+
+# shared by NurbsSurface & NurbsCurve
+basis_cache = BasisCache()
+
+
+def cached_basis_matrix(t, degree, knots, n_ctrl, n_der=0):
+    return basis_cache.get(t, degree, knots, n_ctrl, n_der)
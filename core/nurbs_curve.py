@@ -1,6 +1,6 @@
 # nurbs_curve.py
 import numpy as np
-from scipy.interpolate import CubicSpline
+from .nurbs_basis import find_span, basis_funs, cached_basis_matrix
 
 class NurbsCurve:
     def __init__(self, P, W=None, U=None, degree=3):
@@ -10,27 +10,86 @@ class NurbsCurve:
         U : knot vector (optional), default open uniform
         degree : degree B-spline
         """
-        self.P = np.array(P)
+        self.P = np.array(P, dtype=float)
         self.n = len(P)
         self.degree = degree
-        self.W = np.ones(self.n) if W is None else np.array(W)
-        self.U = self.open_uniform_knot(self.n, degree) if U is None else np.array(U)
+        self.W = np.ones(self.n) if W is None else np.array(W, dtype=float)
+        self.U = self.open_uniform_knot(self.n, degree) if U is None else np.array(U, dtype=float)
+
+    def homogeneous(self):
+        """Weighted control points (n, 4) = [w*x, w*y, w*z, w]"""
+        return np.column_stack((self.P * self.W[:, None], self.W))
 
     def evaluate(self, t):
-        u = t
-        xs = np.linspace(0, 1, self.n)
-        cs_x = CubicSpline(xs, self.P[:,0])
-        cs_y = CubicSpline(xs, self.P[:,1])
-        cs_z = CubicSpline(xs, self.P[:,2])
-        return np.array([cs_x(u), cs_y(u), cs_z(u)])
+        """
+        Rational B-spline point(s).
+        t scalar -> (3,), t array -> (len(t), 3)
+        """
+        if np.ndim(t) == 0:
+            span = int(find_span(self.n, self.degree, t, self.U))
+            N = basis_funs(span, t, self.degree, self.U)[0]
+            i0 = span - self.degree
+            Nw = N * self.W[i0:span + 1]
+            return (Nw @ self.P[i0:span + 1]) / Nw.sum()
+
+        N = cached_basis_matrix(t, self.degree, self.U, self.n)
+        Cw = N @ self.homogeneous()
+        return Cw[:, :3] / Cw[:, 3:]
 
     @staticmethod
     def from_points(points, degree=3):
         """
         Make NurbsCurve from list [(x,y,z), ...]
+        The curve pass through every point at t = linspace(0, 1, n)
+        """
+        return NurbsCurve.interpolate(points, degree=degree)
+
+    @staticmethod
+    def interpolate(points, degree=3, params=None):
+        """
+        Global interpolation (NURBS Book A9.1), solved once.
+        params : parameter of each point, default uniform
+        """
+        Q = np.array(points, dtype=float)
+        n = len(Q)
+        p = min(degree, n - 1)
+
+        if params is None:
+            params = np.linspace(0, 1, n)
+        params = np.asarray(params, dtype=float)
+
+        U = NurbsCurve.averaging_knot(params, p)
+        A = cached_basis_matrix(params, p, U, n)
+        P = np.linalg.solve(A, Q)
+
+        return NurbsCurve(P, U=U, degree=p)
+
+    @staticmethod
+    def averaging_knot(params, degree):
+        """Knot vector by averaging the interpolation parameters"""
+        n = len(params)
+        U = np.zeros(n + degree + 1)
+        U[n:] = 1.0
+        for j in range(1, n - degree):
+            U[j + degree] = np.mean(params[j:j + degree])
+        return U
+
+    @staticmethod
+    def interpolation_matrix(params, samples, degree=3):
+        """
+        Linear map from values at params to the interpolating
+        B-spline at samples, (len(samples), len(params)).
+        Interpolate many curves/rows at once with one matmul.
         """
-        P = np.array(points)
-        return NurbsCurve(P, degree=degree)
+        params = np.asarray(params, dtype=float)
+        n = len(params)
+        p = min(degree, n - 1)
+
+        U = NurbsCurve.averaging_knot(params, p)
+        A = cached_basis_matrix(params, p, U, n)
+        B = cached_basis_matrix(samples, p, U, n)
+
+        return np.linalg.solve(A.T, B.T).T
 
     @staticmethod
     def open_uniform_knot(n_ctrl, degree):
@@ -0,0 +1,277 @@
+#project_io.py
+import json
+import os
+import numpy as np
+from .station_table import StationTable
+from .csv_import import import_csv
+
+# ==============================
+# Binary project format
+# ==============================
+#
+#   magic     8 bytes  b"JLYNPRJ\0"
+#   size      uint64   little-endian length of the header
+#   header    JSON     project info, names, orders, array table
+#   arrays    raw little-endian, each aligned to ALIGN bytes
+#
+# The array table maps a name to {"offset", "dtype", "shape"} (offset
+# from the start of the file), so arrays can be memory-mapped as they are.
+# Polylines (stations, waterlines, buttocks) are stored packed:
+# <kind>_keys (n,), <kind>_lengths (n,), <kind>_points (total, dim).
+
+MAGIC = b"JLYNPRJ\0"
+FORMAT_VERSION = 1
+ALIGN = 64
+FLOAT = "<f8"
+INT = "<i8"
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+def pack_polylines(keys, points, dim):
+    """{key: [(..), ...]} in key order -> keys (n,), lengths (n,), points (total, dim)"""
+    keys = list(keys)
+    blocks = [np.asarray(points.get(k, ()), dtype=float).reshape(-1, dim) for k in keys]
+    P = np.concatenate(blocks) if blocks else np.empty((0, dim))
+    return np.array(keys, dtype=float), np.array([len(b) for b in blocks], dtype=np.int64), P
+
+
+def unpack_polylines(keys, lengths, P):
+    """Inverse of pack_polylines, {key: [(..), ...]}"""
+    bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+    rows = np.asarray(P).tolist()
+    return {k: [tuple(p) for p in rows[bounds[i]:bounds[i + 1]]]
+            for i, k in enumerate(np.asarray(keys).tolist())}
+
+
+# ==============================
+# Sections
+# ==============================
+# Each section builds (header fields, arrays) from a model (the app or
+# anything with the same attributes). The arrays are new, packed copies:
+# they stay valid while the model is edited (autosave writes them in a thread).
+
+def meta_section(model):
+    header = {
+        "project": {
+            "name": getattr(model, "project_name", "Unnamed Project"),
+            "unit": "meter",
+            "version": "0.1",
+            "format": FORMAT_VERSION,
+        },
+        "ship_dimensions": dict(getattr(model, "ship_dimensions", {"Lpp": 0.0, "Bmax": 0.0, "Draft": 0.0})),
+    }
+    return header, {}
+
+
+def station_section(model):
+    stations = model.stations
+    keys = [x for x in model.station_order if x in stations]
+    if hasattr(stations, "packed"):
+        P, lengths = stations.packed(keys)
+        st = (np.array(keys, dtype=float), lengths.astype(np.int64), P)
+    else:
+        st = pack_polylines(keys, stations, 3)
+
+    header = {"station_names": [model.station_names.get(x, f"Station X={x:.3f}") for x in keys]}
+    return header, {"station_keys": st[0], "station_lengths": st[1], "station_points": st[2]}
+
+
+def waterline_section(model):
+    keys = list(getattr(model, "waterline_order", None) or model.waterlines)
+    wl = pack_polylines(keys, model.waterline_points, 2)
+    header = {"waterline_names": [model.waterline_names.get(z, f"WL z={z:.3f}") for z in keys]}
+    return header, {"waterline_keys": wl[0], "waterline_lengths": wl[1], "waterline_points": wl[2]}
+
+
+def buttockline_section(model):
+    keys = list(getattr(model, "buttocklines", []))
+    bl = pack_polylines(keys, getattr(model, "buttockline_points", {}), 2)
+    header = {"buttockline_names": [model.buttockline_names.get(y, f"BL y={y:.3f}") for y in keys]}
+    return header, {"buttockline_keys": bl[0], "buttockline_lengths": bl[1], "buttockline_points": bl[2]}
+
+
+def centerline_section(model):
+    centerline = np.asarray(getattr(model, "centerline_points", ()) or (), dtype=float).reshape(-1, 2)
+    return {}, {"centerline_points": centerline}
+
+
+SECTIONS = {
+    "meta": meta_section,
+    "stations": station_section,
+    "waterlines": waterline_section,
+    "buttocklines": buttockline_section,
+    "centerline": centerline_section,
+}
+
+
+def project_arrays(model):
+    """Header fields and arrays of all sections"""
+    header, arrays = {}, {}
+    for build in SECTIONS.values():
+        h, a = build(model)
+        header.update(h)
+        arrays.update(a)
+    return header, arrays
+
+
+# ==============================
+# Write
+# ==============================
+def write_arrays(path, header, arrays):
+    """Write header + arrays in the binary layout (temp file + rename, never half written)"""
+    arrays = {
+        name: np.ascontiguousarray(a, dtype=INT if np.issubdtype(np.asarray(a).dtype, np.integer) else FLOAT)
+        for name, a in arrays.items()
+    }
+
+    # the header size decides where the arrays start, lay out until it is stable
+    start = 0
+    while True:
+        table = {}
+        offset = start
+        for name, a in arrays.items():
+            table[name] = {"offset": offset, "dtype": a.dtype.str, "shape": list(a.shape)}
+            offset += a.nbytes + _pad(a.nbytes)
+        blob = json.dumps(dict(header, arrays=table)).encode("utf-8")
+        needed = len(MAGIC) + 8 + len(blob)
+        needed += _pad(needed)
+        if needed == start:
+            break
+        start = needed
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(blob)).astype("<u8").tobytes())
+        f.write(blob)
+        f.write(b"\0" * _pad(len(MAGIC) + 8 + len(blob)))
+        for a in arrays.values():
+            a.tofile(f)
+            f.write(b"\0" * _pad(a.nbytes))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def write_project(path, model):
+    """Save a model as a binary project"""
+    data = getattr(model.stations, "data", None)
+    if isinstance(data, np.memmap) and os.path.abspath(data.filename) == os.path.abspath(path):
+        model.stations.detach()     # do not overwrite the file the table is mapped on
+    header, arrays = project_arrays(model)
+    write_arrays(path, header, arrays)
+
+
+# ==============================
+# Read
+# ==============================
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a binary hull project")
+        size = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+        return json.loads(f.read(size).decode("utf-8"))
+
+
+def read_project(path, mmap=True):
+    """
+    Header and arrays of a binary project, {"header", "arrays"}.
+    With mmap the arrays are copy-on-write memory maps: nothing is read
+    until touched, edits stay in memory.
+    """
+    header = read_header(path)
+    arrays = {}
+    for name, info in header.pop("arrays").items():
+        shape = tuple(info["shape"])
+        dtype = np.dtype(info["dtype"])
+        count = int(np.prod(shape))
+        if mmap and count:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="c", offset=info["offset"], shape=shape)
+        else:
+            with open(path, "rb") as f:
+                f.seek(info["offset"])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return {"header": header, "arrays": arrays}
+
+
+def read_json(path):
+    """JSON project (Save as JSON) in the read_project layout, orders sorted like the GUI loader"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    def polylines(items, axis, dim, label, reverse=False):
+        items = sorted(items, key=lambda it: float(it[axis]), reverse=reverse)
+        keys = [float(it[axis]) for it in items]
+        points = {k: it.get("points", []) for k, it in zip(keys, items)}
+        names = [it.get("name", label.format(k)) for k, it in zip(keys, items)]
+        return names, pack_polylines(keys, points, dim)
+
+    header = {"ship_dimensions": data.get("ship_dimensions", {"Lpp": 0.0, "Bmax": 0.0, "Draft": 0.0})}
+    arrays = {}
+    for kind, axis, dim, label, reverse in (("station", "x", 3, "Station X={:.3f}", False),
+                                            ("waterline", "z", 2, "WL z={:.3f}", True),
+                                            ("buttockline", "y", 2, "BL y={:.3f}", False)):
+        names, (keys, lengths, P) = polylines(data.get(kind + "s", []), axis, dim, label, reverse)
+        header[kind + "_names"] = names
+        arrays.update({kind + "_keys": keys, kind + "_lengths": lengths, kind + "_points": P})
+
+    cl = data.get("centerline") or {}
+    C = np.asarray(cl.get("points", ()), dtype=float).reshape(-1, 2)
+    arrays["centerline_points"] = C[np.argsort(C[:, 0], kind="stable")]
+    return {"header": header, "arrays": arrays}
+
+
+def read_file(path, mmap=True):
+    """Any project file by extension: .json, .csv or binary"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        return read_json(path)
+    if ext == ".csv":
+        return import_csv(path)
+    return read_project(path, mmap)
+
+
+def load_into(model, project):
+    """
+    Replace the geometry of a model with a project from read_project
+    (or csv_import.import_csv). Sections missing from the arrays are kept.
+    """
+    header, a = project["header"], project["arrays"]
+
+    if "ship_dimensions" in header:
+        model.ship_dimensions = header["ship_dimensions"]
+
+    # === Stations (kept on the mapped array) ===
+    if "station_keys" in a:
+        keys = a["station_keys"].tolist()
+        model.stations = StationTable.from_packed(keys, a["station_points"], a["station_lengths"])
+        model.station_order[:] = keys
+        model.station_names.clear()
+        model.station_names.update(zip(keys, header.get("station_names", [])))
+
+    # === Waterlines ===
+    if "waterline_keys" in a:
+        points = unpack_polylines(a["waterline_keys"], a["waterline_lengths"], a["waterline_points"])
+        model.waterlines.clear()
+        model.waterline_points.clear()
+        model.waterline_names.clear()
+        model.waterline_order = list(points)
+        for z, pts in points.items():
+            model.waterlines[z] = []
+            model.waterline_points[z] = pts
+        model.waterline_names.update(zip(points, header.get("waterline_names", [])))
+
+    # === Buttocklines ===
+    if "buttockline_keys" in a:
+        points = unpack_polylines(a["buttockline_keys"], a["buttockline_lengths"], a["buttockline_points"])
+        model.buttocklines = list(points)
+        model.buttockline_points.clear()
+        model.buttockline_points.update(points)
+        model.buttockline_names = dict(zip(points, header.get("buttockline_names", [])))
+
+    # === Centerline ===
+    if "centerline_points" in a:
+        model.centerline_points = [tuple(p) for p in np.asarray(a["centerline_points"]).tolist()]
@@ -0,0 +1,347 @@
+#sectioning.py
+import numpy as np
+
+
+# ==============================
+# Change detection
+# ==============================
+def changed_range(old, new, axis):
+    """
+    Coordinate range (lo, hi) along axis covered by the segments that
+    differ between two polylines, None when they are equal.
+    The changed part is what remains after the common prefix and suffix;
+    its neighbours are included since their segments changed too.
+    """
+    if old == new:
+        return None
+
+    n = min(len(old), len(new))
+    a = 0
+    while a < n and old[a] == new[a]:
+        a += 1
+    s = 0
+    while s < n - a and old[-1 - s] == new[-1 - s]:
+        s += 1
+
+    touched = old[max(a - 1, 0):len(old) - s + 1] + new[max(a - 1, 0):len(new) - s + 1]
+    if not touched:
+        return None
+
+    values = [p[axis] for p in touched]
+    return min(values), max(values)
+
+
+# ==============================
+# Segment index
+# ==============================
+def _ranges(starts, stops):
+    """Concatenated aranges [starts[k], stops[k]) and the k of each entry"""
+    lengths = np.maximum(stops - starts, 0)
+    owner = np.repeat(np.arange(len(starts)), lengths)
+    first = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) - first[owner] + starts[owner], owner
+
+
+class IntervalIndex:
+    """
+    Closed intervals [lo, hi] sorted by lo.
+    An interval holding v has v - span <= lo <= v, so a level only scans
+    that window of the sorted array (span = longest short interval).
+    The few long intervals (stem, keel profile) are always checked.
+    """
+
+    LONG_FACTOR = 4.0       # "long" = above LONG_FACTOR x median length
+
+    def __init__(self, lo, hi):
+        lo = np.asarray(lo, dtype=float)
+        hi = np.asarray(hi, dtype=float)
+        length = hi - lo
+
+        limit = self.LONG_FACTOR * np.median(length) if len(lo) else 0.0
+        long = length > limit
+        self.long_ids = np.flatnonzero(long)
+
+        short_ids = np.flatnonzero(~long)
+        self.short_ids = short_ids[np.argsort(lo[short_ids], kind="stable")]
+        self.short_lo = lo[self.short_ids]
+        self.span = length[self.short_ids].max() if len(self.short_ids) else 0.0
+        self.hi = hi
+
+    def query(self, levels):
+        """Ids of intervals holding each level, (ids, level index of each id)"""
+        levels = np.asarray(levels, dtype=float)
+        slack = 1e-9 * (1.0 + np.abs(levels) + self.span)
+        a = np.searchsorted(self.short_lo, levels - self.span - slack, side="left")
+        b = np.searchsorted(self.short_lo, levels, side="right")
+        pos, level = _ranges(a, b)
+        ids = self.short_ids[pos]
+
+        if len(self.long_ids):
+            ids = np.concatenate((ids, np.tile(self.long_ids, len(levels))))
+            level = np.concatenate((level, np.repeat(np.arange(len(levels)), len(self.long_ids))))
+
+        keep = self.hi[ids] >= levels[level]
+        return ids[keep], level[keep]
+
+
+def _split(levels, n_levels, *columns):
+    """Per level lists of tuples from columns sorted by level"""
+    bounds = np.searchsorted(levels, np.arange(n_levels + 1))
+    columns = [c.tolist() for c in columns]
+    return [list(zip(*(c[bounds[k]:bounds[k + 1]] for c in columns))) for k in range(n_levels)]
+
+
+def pack_waterlines(waterline_points):
+    """{z: [(x, y), ...]} -> waterline segments (n, 5): x1, y1, x2, y2, z"""
+    blocks = []
+    for z, pts in waterline_points.items():
+        if len(pts) < 2:
+            continue
+        P = np.asarray(pts, dtype=float)[:, :2]
+        block = np.empty((len(P) - 1, 5))
+        block[:, 0:2] = P[:-1]
+        block[:, 2:4] = P[1:]
+        block[:, 4] = z
+        blocks.append(block)
+    return np.concatenate(blocks) if blocks else np.empty((0, 5))
+
+
+def pack_stations(stations, station_order):
+    """Points of the stations in order as one (n, 3) array, their keys and block lengths"""
+    keys = [x for x in station_order if x in stations]
+    if hasattr(stations, "packed"):
+        P, lengths = stations.packed(keys)       # StationTable
+    else:
+        blocks = [np.asarray(stations[x], dtype=float).reshape(-1, 3) for x in keys]
+        P = np.concatenate(blocks) if blocks else np.empty((0, 3))
+        lengths = np.array([len(b) for b in blocks], dtype=int)
+    return P, np.array(keys, dtype=float), lengths
+
+
+class SegmentIndex:
+    """
+    Station and centerline segments packed in one array,
+    with interval indexes on Z (waterlines) and Y (buttocks).
+    """
+
+    def __init__(self, stations, station_order, centerline=None):
+        # station segments, X is the station key
+        P, keys, lengths = pack_stations(stations, station_order)
+        starts = np.ones(len(P), dtype=bool)
+        starts[(np.cumsum(lengths) - 1)[lengths > 0]] = False
+        i = np.flatnonzero(starts)
+        x = np.repeat(keys, np.maximum(lengths - 1, 0))
+
+        C = np.asarray(centerline if centerline is not None else (), dtype=float).reshape(-1, 2)
+
+        # (n, 7): x1, y1, z1, x2, y2, z2, kind (0 station, 1 centerline)
+        S = np.zeros((len(i) + max(len(C) - 1, 0), 7))
+        S[:len(i)] = np.column_stack((x, P[i, 1], P[i, 2], x, P[i + 1, 1], P[i + 1, 2], np.zeros(len(i))))
+        if len(C) > 1:
+            S[len(i):, [0, 2]] = C[:-1]
+            S[len(i):, [3, 5]] = C[1:]
+            S[len(i):, 6] = 1
+        self.S = S
+        self.n = len(S)
+
+        self.by_z = IntervalIndex(np.minimum(S[:, 2], S[:, 5]), np.maximum(S[:, 2], S[:, 5]))
+
+        # buttocks only cut the stations
+        self.station_ids = np.flatnonzero(S[:, 6] == 0)
+        St = S[self.station_ids]
+        self.by_y = IntervalIndex(np.minimum(St[:, 1], St[:, 4]), np.maximum(St[:, 1], St[:, 4]))
+
+    def waterlines(self, zs):
+        """
+        Raw waterline points for every level in zs, {z: [(x, y), ...]}.
+        Same rules as StateManager.calculate_waterline_points:
+        stations include end points (flat segments skipped), the
+        centerline only counts strict crossings, points sorted by x
+        (stable, stations in station order first).
+        """
+        zs = list(zs)
+        if not self.n or not zs:
+            return {z: [] for z in zs}
+
+        z_arr = np.array(zs, dtype=float)
+        ids, level = self.by_z.query(z_arr)
+        x1, y1, z1, x2, y2, z2, kind = self.S[ids].T
+        z = z_arr[level]
+
+        station = (kind == 0) & ((z1 - z) * (z2 - z) <= 0) & (z1 != z2)
+        center = (kind == 1) & (((z1 < z) & (z2 > z)) | ((z1 > z) & (z2 < z)))
+        hit = station | center
+
+        ids, level = ids[hit], level[hit]
+        x1, y1, z1, x2, y2, z2, z = x1[hit], y1[hit], z1[hit], x2[hit], y2[hit], z2[hit], z[hit]
+
+        t = (z - z1) / (z2 - z1)
+        px = x1 + t * (x2 - x1)
+        py = y1 + t * (y2 - y1)
+
+        # per level: by x, ties keep the segment order
+        order = np.lexsort((ids, px, level))
+        return dict(zip(zs, _split(level[order], len(zs), px[order], py[order])))
+
+    def waterline(self, z):
+        return self.waterlines([z])[z]
+
+    def buttocks(self, ys, waterline_points):
+        """
+        Raw buttock points for every level in ys, {y: [(x, z), ...]}.
+        Same rules as StateManager.calculate_buttockline_points:
+        station segments include end points (flat segments skipped),
+        waterline polylines are cut half-open [y1, y2), duplicates
+        removed, points sorted by (x, z).
+        """
+        ys = list(ys)
+        if not ys:
+            return {}
+        y_arr = np.array(ys, dtype=float)
+
+        # station sections (YZ)
+        ids, level = self.by_y.query(y_arr)
+        x1, y1, z1, x2, y2, z2, _ = self.S[self.station_ids[ids]].T
+        y = y_arr[level]
+
+        hit = ((y1 - y) * (y2 - y) <= 0) & (y1 != y2)
+        t = (y[hit] - y1[hit]) / (y2[hit] - y1[hit])
+        sx = x1[hit] + t * (x2[hit] - x1[hit])
+        sz = z1[hit] + t * (z2[hit] - z1[hit])
+        s_level = level[hit]
+
+        # waterline polylines (XY at constant z)
+        W = pack_waterlines(waterline_points)
+        wl_index = IntervalIndex(np.minimum(W[:, 1], W[:, 3]), np.maximum(W[:, 1], W[:, 3]))
+        ids, level = wl_index.query(y_arr)
+        x1, y1, x2, y2, wz = W[ids].T
+        y = y_arr[level]
+
+        hit = ((y1 <= y) & (y < y2)) | ((y2 <= y) & (y < y1))
+        t = (y[hit] - y1[hit]) / (y2[hit] - y1[hit])
+        wx = x1[hit] + t * (x2[hit] - x1[hit])
+
+        level = np.concatenate((s_level, level[hit]))
+        px = np.concatenate((sx, wx))
+        pz = np.concatenate((sz, wz[hit]))
+
+        # sort by (level, x, z), drop exact duplicates
+        order = np.lexsort((pz, px, level))
+        level, px, pz = level[order], px[order], pz[order]
+        dup = np.zeros(len(level), dtype=bool)
+        dup[1:] = (level[1:] == level[:-1]) & (px[1:] == px[:-1]) & (pz[1:] == pz[:-1])
+        keep = ~dup
+
+        return dict(zip(ys, _split(level[keep], len(ys), px[keep], pz[keep])))
+
+
+def section_all(stations, station_order, centerline, zs, ys, waterline_points=None):
+    """
+    Whole lines plan at once: waterlines at every z in zs and buttocks at
+    every y in ys. Buttocks cross the new waterlines and the other
+    polylines of waterline_points (levels not in zs), if given.
+    Returns ({z: [(x, y)]}, {y: [(x, z)]}).
+    """
+    index = SegmentIndex(stations, station_order, centerline)
+    waterlines = index.waterlines(zs)
+
+    crossed = dict(waterline_points or {})
+    crossed.update(waterlines)
+    buttocks = index.buttocks(ys, crossed)
+    return waterlines, buttocks
+
+
+# ==============================
+# Waterline cache
+# ==============================
+class WaterlineCache:
+    """
+    Waterline intersection points per Z level.
+    A level is recomputed only when a station or centerline segment whose
+    Z range contains it has changed since the last update; view changes
+    (pan, zoom) cost no intersection work, and with a StationTable only
+    the stations whose edit stamp moved are looked at.
+    """
+
+    def __init__(self):
+        self.points = {}        # z -> [(x, y), ...]
+        self.stations = {}      # x -> station points as last seen
+        self.stamps = {}        # x -> StationTable stamp of that snapshot
+        self.centerline = ()
+        self.key = None         # (table version, station order, centerline) of the last update
+        self.index = None       # SegmentIndex of the last seen geometry
+
+    def clear(self):
+        self.points.clear()
+        self.stations = {}
+        self.stamps = {}
+        self.centerline = ()
+        self.key = None
+        self.index = None
+
+    def snapshot(self, stations, station_order, centerline):
+        """Station points as tuples, stations with an unchanged stamp keep their last snapshot"""
+        stamps = getattr(stations, "stamps", {})
+        snap = {}
+        for x in station_order:
+            if x not in stations:
+                continue
+            stamp = stamps.get(x)
+            if stamp is not None and self.stamps.get(x) == stamp:
+                snap[x] = self.stations[x]
+            else:
+                snap[x] = tuple(map(tuple, stations[x]))
+        return snap, centerline
+
+    def dirty_ranges(self, stations, centerline):
+        """Z ranges touched by changes since the last update"""
+        ranges = []
+        for x in set(self.stations) | set(stations):
+            if self.stations.get(x) is stations.get(x, ()):
+                continue    # same snapshot
+            r = changed_range(self.stations.get(x, ()), stations.get(x, ()), 2)
+            if r is not None:
+                ranges.append(r)
+
+        r = changed_range(self.centerline, centerline, 1)
+        if r is not None:
+            ranges.append(r)
+        return ranges
+
+    def update(self, stations, station_order, centerline, levels):
+        """
+        Waterline points for every z in levels, {z: points}.
+        New or invalidated levels are sliced together in one index query.
+        """
+        centerline = tuple(map(tuple, centerline or ()))
+        version = getattr(stations, "version", None)
+        key = (version, tuple(station_order), centerline)
+
+        ranges = []
+        if version is None or key != self.key or self.index is None:
+            snap, centerline = self.snapshot(stations, station_order, centerline)
+            ranges = self.dirty_ranges(snap, centerline)
+            if ranges or self.index is None:
+                self.index = SegmentIndex(stations, list(snap), centerline)
+            self.stations = snap
+            self.stamps = dict(getattr(stations, "stamps", {}))
+            self.centerline = centerline
+            self.key = key
+
+        levels = list(levels)
+        if ranges and self.points:
+            zs = np.fromiter(self.points, dtype=float, count=len(self.points))
+            lo, hi = np.array(ranges, dtype=float).T
+            stale = ((zs[:, None] >= lo) & (zs[:, None] <= hi)).any(axis=1)
+            for z in zs[stale].tolist():
+                del self.points[z]
+
+        keep = set(levels)
+        for z in [z for z in self.points if z not in keep]:
+            del self.points[z]
+
+        missing = [z for z in levels if z not in self.points]
+        if missing:
+            self.points.update(self.index.waterlines(missing))
+
+        return {z: self.points[z] for z in levels}
@@ -1,54 +1,14 @@
 from tkinter import simpledialog, messagebox
 from tkinter import messagebox 
 import math
+from .sectioning import WaterlineCache, SegmentIndex, section_all
+from . import curve_tessellation
 
 class StateManager:
-    def hermite(self, p0, p1, m0, m1, t):
-        h00 = 2*t**3 - 3*t**2 + 1
-        h10 = t**3 - 2*t**2 + t
-        h01 = -2*t**3 + 3*t**2
-        h11 = t**3 - t**2
-        return (
-            h00*p0[0] + h10*m0[0] + h01*p1[0] + h11*m1[0],
-            h00*p0[1] + h10*m0[1] + h01*p1[1] + h11*m1[1]
-        )
-    
     def generate_hermite_waterline(self, points, steps=20):
         if len(points) < 2:
             return points
-
-        result = []
-        n = len(points)
-
-        tangents = []
-        for i in range(n):
-            if i == 0:
-                # forward difference
-                m = (points[1][0] - points[0][0],
-                    points[1][1] - points[0][1])
-            elif i == n - 1:
-                # backward difference
-                m = (points[-1][0] - points[-2][0],
-                    points[-1][1] - points[-2][1])
-            else:
-                # central difference
-                m = ((points[i+1][0] - points[i-1][0]) * 0.5,
-                    (points[i+1][1] - points[i-1][1]) * 0.5)
-            tangents.append(m)
-
-        # === Build egments ===
-        for i in range(n - 1):
-            p0 = points[i]
-            p1 = points[i+1]
-            m0 = tangents[i]
-            m1 = tangents[i+1]
-
-            for s in range(steps):
-                t = s / steps
-                result.append(self.hermite(p0, p1, m0, m1, t))
-
-        result.append(points[-1])
-        return result
+        return curve_tessellation.hermite_polyline(points, None, steps).tolist()
 
     def rename_curve(self):
         if self.selected_station is None:
@@ -94,15 +54,26 @@ class StateManager:
         self.draw_all()
 
     def update_waterlines(self):
-        """Update the waterline"""
+        """Update the waterline, True when the points of any level changed"""
         if not self.stations or not self.waterlines:
-            return
+            return False
 
         if not hasattr(self, "waterline_points"):
             self.waterline_points = {}
 
-        for z_level in self.waterlines:
-            self.waterline_points[z_level] = self.calculate_waterline_points(z_level)
+        # only levels crossed by changed segments are recomputed
+        if getattr(self, "waterline_cache", None) is None:
+            self.waterline_cache = WaterlineCache()
+
+        points = self.waterline_cache.update(
+            self.stations, self.station_order, getattr(self, "centerline_points", None),
+            self.waterlines
+        )
+        # unchanged levels come back as the same list
+        changed = [z for z, pts in points.items()
+                   if self.waterline_points.get(z) is not pts and self.waterline_points.get(z) != pts]
+        self.waterline_points.update(points)
+        return bool(changed)
 
     def refresh_waterlines(self):
         """Refresh waterline"""
@@ -111,46 +82,18 @@ class StateManager:
             return
 
         self.save_state()  
+        if getattr(self, "waterline_cache", None) is not None:
+            self.waterline_cache.clear()
         self.update_waterlines()
         self.draw_all()
         messagebox.showinfo("Refreshed", "All waterlines have been updated.")
 
     def calculate_waterline_points(self, z):
         """Calculate raw (unsmoothed) waterline intersection points."""
-        wl_points = []
-
-        # === Intersection with station (YZ section) ===
-        for x in self.station_order:
-            pts = self.stations[x]
-            if len(pts) < 2:
-                continue
-
-            for (x1, y1, z1), (x2, y2, z2) in zip(pts[:-1], pts[1:]):
-                if (z1 - z) * (z2 - z) <= 0 and z1 != z2:
-                    t = (z - z1) / (z2 - z1)
-
-                    # NOTE: X station fixed, do NOT interpolate X!
-                    y_interp = y1 + t * (y2 - y1)
-
-                    wl_points.append((x, y_interp))
-
-        # === Intersection with centerline (XZ plane, Y=0) ===
-        if hasattr(self, "centerline_points") and len(self.centerline_points) >= 2:
-            for (cx1, cz1), (cx2, cz2) in zip(
-                    self.centerline_points[:-1],
-                    self.centerline_points[1:]):
-
-                if cz1 == cz2:
-                    continue
-
-                if (cz1 < z and cz2 > z) or (cz1 > z and cz2 < z):
-                    t = (z - cz1) / (cz2 - cz1)
-                    x_int = cx1 + t * (cx2 - cx1)
-
-                    wl_points.append((x_int, 0.0))
-
-        # Sort by X
-        wl_points.sort(key=lambda p: p[0])
+        # stations (YZ sections, X fixed) and centerline (XZ plane, Y=0),
+        # only segments whose Z range holds z are intersected, sorted by X
+        index = SegmentIndex(self.stations, self.station_order, getattr(self, "centerline_points", None))
+        wl_points = index.waterline(z)
 
         # Save raw points
         if not hasattr(self, "waterline_points"):
@@ -169,40 +112,11 @@ class StateManager:
         return smooth
     
 
-    #---------------------------------------------
-    #Draw Centerline
-    #---------------------------------------------
-    def hermite_segment(self, p0, p1, t0, t1, samples=32):
-        curve = []
-        for i in range(samples+1):
-            t = i / samples
-            h00 = 2*t*t*t - 3*t*t + 1
-            h10 = t*t*t - 2*t*t + t
-            h01 = -2*t*t*t + 3*t*t
-            h11 = t*t*t - t*t
-
-            x = h00*p0[0] + h10*t0[0] + h01*p1[0] + h11*t1[0]
-            z = h00*p0[1] + h10*t0[1] + h01*p1[1] + h11*t1[1]
-            curve.append((x, z))
-        return curve
-
     # ===========================
     # Spline For Centerline
     # ===========================
     def hermite_segment(self, p0, p1, t0, t1, samples=32):
-        curve = []
-        for i in range(samples+1):
-            t = i / samples
-            h00 = 2*t**3 - 3*t**2 + 1
-            h10 = t**3 - 2*t**2 + t
-            h01 = -2*t**3 + 3*t**2
-            h11 = t**3 - t**2
-
-            x = h00*p0[0] + h10*t0[0] + h01*p1[0] + h11*t1[0]
-            z = h00*p0[1] + h10*t0[1] + h01*p1[1] + h11*t1[1]
-
-            curve.append((x,z))
-        return curve
+        return curve_tessellation.hermite_segment(p0, p1, t0, t1, samples).tolist()
 
     def add_centerline_point(self):
         """Add centerline point in the side view (only for centerline)"""
@@ -313,53 +227,37 @@ class StateManager:
         self.draw_all()
 
     def calculate_buttockline_points(self, y):
-        bl_points = []
-
-        # === Intersection with each station  ===
-        for x in self.station_order:
-            pts = self.stations[x]
-            for i in range(len(pts) - 1):
-                p1 = pts[i]
-                p2 = pts[i + 1]
-                y1, y2 = p1[1], p2[1]
-
-                if (y1 - y) * (y2 - y) <= 0 and y1 != y2:
-                    t = (y - y1) / (y2 - y1)
-                    x_interp = p1[0] + t * (p2[0] - p1[0])
-                    z_interp = p1[2] + t * (p2[2] - p1[2])
-                    bl_points.append((x_interp, z_interp))
-                    
-        if hasattr(self, "waterline_points"):
-            for z, wl_pts in self.waterline_points.items():
-                if len(wl_pts) < 2:
-                    continue
-
-                for (x1, y1), (x2, y2) in zip(wl_pts[:-1], wl_pts[1:]):
-                    if (y1 <= y < y2) or (y2 <= y < y1):
-                        t = (y - y1) / (y2 - y1)
-                        x_i = x1 + t * (x2 - x1)
-                        bl_points.append((x_i, z))
-
-
-        bl_points = list(set(bl_points))   
-        bl_points.sort(key=lambda p: (p[0], p[1]))
-
-
-        # Save to dict
-        if not hasattr(self, "buttockline_points"):
-            self.buttockline_points = {}
-        self.buttockline_points[y] = bl_points
+        self.update_buttocklines([y])
 
-    def update_buttocklines(self):
+    def update_buttocklines(self, levels=None):
         """Update semua buttock line berdasarkan data terbaru"""
-        if not hasattr(self, "buttocklines") or not self.buttocklines:
-            return
+        if levels is None:
+            if not hasattr(self, "buttocklines") or not self.buttocklines:
+                return
+            levels = self.buttocklines
 
         if not hasattr(self, "buttockline_points"):
             self.buttockline_points = {}
 
-        for y_level in self.buttocklines:
-            self.calculate_buttockline_points(y_level)
+        # === Intersection with each station and every waterline, all levels at once ===
+        index = SegmentIndex(self.stations, self.station_order)
+        self.buttockline_points.update(
+            index.buttocks(levels, getattr(self, "waterline_points", {}))
+        )
+
+    def update_sections(self):
+        """Regenerate every waterline and buttock line (whole lines plan) in one pass"""
+        if not hasattr(self, "waterline_points"):
+            self.waterline_points = {}
+        if not hasattr(self, "buttockline_points"):
+            self.buttockline_points = {}
+        waterlines, buttocks = section_all(
+            self.stations, self.station_order, getattr(self, "centerline_points", None),
+            list(self.waterlines), getattr(self, "buttocklines", []),
+            waterline_points=self.waterline_points
+        )
+        self.waterline_points.update(waterlines)
+        self.buttockline_points.update(buttocks)
 
     def refresh_buttocklines(self):
         """Refresh buttock lines"""
@@ -370,4 +268,14 @@ class StateManager:
         self.save_state()
         self.update_buttocklines()
         self.draw_all()
-        messagebox.showinfo("Refreshed", "All buttock lines have been updated.")
\ No newline at end of file
+        messagebox.showinfo("Refreshed", "All buttock lines have been updated.")
+
+    def refresh_sections(self):
+        """Regenerate the whole lines plan (waterlines + buttock lines)"""
+        if not self.stations:
+            messagebox.showinfo("Info", "No stations to section.")
+            return
+
+        self.save_state()
+        self.update_sections()
+        self.draw_all()
\ No newline at end of file
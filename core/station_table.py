@@ -0,0 +1,284 @@
+#station_table.py
+from collections.abc import MutableMapping, MutableSequence
+from itertools import count
+import numpy as np
+
+# edit stamps, unique over all tables (an undo snapshot never reuses one)
+_stamps = count(1)
+
+
+class StationTable(MutableMapping):
+    """
+    All station points in one contiguous float64 array (rows x, y, z).
+    Each station owns a block [start, start + capacity) of rows, the
+    first length rows are its points in order.
+
+    Works like the old dict {x: [(x, y, z), ...]}:
+    table[x] is a StationPoints view (list of tuples), table[x] = points
+    replaces a station, del table[x] removes it. Hot paths use
+    array(x) to get the rows as a NumPy slice.
+
+    version changes on every edit, caches keyed on it (pick index)
+    know when the geometry moved. stamps[x] is the version of the last
+    edit of station x, to find the stations changed since a version.
+    """
+
+    MIN_CAPACITY = 8
+
+    def __init__(self, stations=None):
+        self.data = np.empty((64, 3))
+        self.used = 0           # rows handed out to blocks (incl. holes)
+        self.holes = 0          # rows of freed / moved blocks
+        self.blocks = {}        # x -> [start, length, capacity]
+        self.stamps = {}        # x -> version of its last edit
+        self.version = next(_stamps)
+        if stations:
+            self.update(stations)
+
+    # ------------------------------
+    # Storage
+    # ------------------------------
+    def _alloc(self, n):
+        """Reserve n rows at the end of the array, return start"""
+        if self.used + n > len(self.data):
+            if self.holes > self.used // 2:
+                self.compact()
+            if self.used + n > len(self.data):
+                grown = np.empty((max(2 * len(self.data), self.used + n), 3))
+                grown[:self.used] = self.data[:self.used]
+                self.data = grown
+
+        start = self.used
+        self.used += n
+        return start
+
+    def slack(self, n):
+        """Block capacity for n points, room for a few inserts"""
+        return n + max(self.MIN_CAPACITY, n // 8)
+
+    def _touch(self, x):
+        """New edit stamp for the table and station x"""
+        self.version = self.stamps[x] = next(_stamps)
+
+    def _place(self, x, P, capacity=None):
+        """Store rows P as station x, reusing its block when it fits"""
+        self._touch(x)
+        block = self.blocks.get(x)
+        if block is not None and block[2] >= len(P):
+            block[1] = len(P)
+        else:
+            if block is not None:
+                # free the old slot first, _alloc may compact
+                self.holes += block[2]
+                block[:] = [0, 0, 0]
+            capacity = capacity or self.slack(len(P))
+            block = self.blocks[x] = [self._alloc(capacity), len(P), capacity]
+        self.data[block[0]:block[0] + len(P)] = P
+
+    def compact(self):
+        """Rewrite all blocks back to back (drops holes, keeps slack)"""
+        blocks = {x: self.array(x).copy() for x in self.blocks if self.blocks[x][2]}
+        size = sum(self.slack(len(P)) for P in blocks.values())
+        order = list(self.blocks)
+        stamps = dict(self.stamps)      # points unchanged
+
+        self.data = np.empty((max(64, size), 3))
+        self.used = 0
+        self.holes = 0
+        self.blocks = {}
+        for x in order:
+            if x in blocks:
+                self._place(x, blocks[x])
+            else:
+                self.blocks[x] = [0, 0, 0]      # empty, or being moved by _place
+        self.stamps = stamps
+
+    @staticmethod
+    def as_rows(points):
+        return np.array(
+            points if isinstance(points, np.ndarray) else list(points),
+            dtype=float
+        ).reshape(-1, 3)
+
+    # ------------------------------
+    # Array access
+    # ------------------------------
+    def array(self, x):
+        """Rows (n, 3) of station x, a view valid until the table is resized"""
+        start, length, _ = self.blocks[x]
+        return self.data[start:start + length]
+
+    def packed(self, order=None):
+        """All points of the stations in order as one (n, 3) array, and the block lengths"""
+        order = list(self.blocks) if order is None else [x for x in order if x in self.blocks]
+        if not order:
+            return np.empty((0, 3)), np.zeros(0, dtype=int)
+        return (np.concatenate([self.array(x) for x in order]),
+                np.array([self.blocks[x][1] for x in order]))
+
+    def nbytes(self):
+        return self.data.nbytes
+
+    @classmethod
+    def from_packed(cls, keys, P, lengths):
+        """
+        Table over packed rows P (n, 3) without copying them, stations
+        keys with lengths back to back. P may be a copy-on-write memmap:
+        rows are read from the file only when touched.
+        """
+        table = cls()
+        if len(P):
+            table.data = P
+            table.used = len(P)
+        starts = np.cumsum(lengths) - lengths
+        for x, start, n in zip(np.asarray(keys).tolist(), starts.tolist(), np.asarray(lengths).tolist()):
+            table.blocks[x] = [start, n, n]
+            table.stamps[x] = table.version
+        return table
+
+    def detach(self):
+        """Copy a file backed data array into memory (before that file is rewritten)"""
+        if isinstance(self.data, np.memmap):
+            self.data = np.array(self.data)
+
+    # ------------------------------
+    # Point edits (in place)
+    # ------------------------------
+    def set_point(self, x, i, point):
+        start, length, _ = self.blocks[x]
+        self._touch(x)
+        self.data[start + self.index(x, i)] = point
+
+    def insert_point(self, x, i, point):
+        start, length, capacity = self.blocks[x]
+        i = max(0, min(length, i + length if i < 0 else i))
+
+        if length == capacity:
+            # block full: move it to the end with twice the room
+            P = self.array(x)
+            self._place(x, np.concatenate((P[:i], [point], P[i:])), 2 * capacity)
+            return
+
+        self._touch(x)
+        rows = self.data[start:start + length + 1]
+        rows[i + 1:] = rows[i:length].copy()
+        rows[i] = point
+        self.blocks[x][1] += 1
+
+    def delete_point(self, x, i):
+        start, length, _ = self.blocks[x]
+        i = self.index(x, i)
+        self._touch(x)
+        rows = self.data[start:start + length]
+        rows[i:-1] = rows[i + 1:].copy()
+        self.blocks[x][1] -= 1
+
+    def index(self, x, i):
+        length = self.blocks[x][1]
+        if i < 0:
+            i += length
+        if not 0 <= i < length:
+            raise IndexError("station point index out of range")
+        return i
+
+    # ------------------------------
+    # Mapping
+    # ------------------------------
+    def __getitem__(self, x):
+        if x not in self.blocks:
+            raise KeyError(x)
+        return StationPoints(self, x)
+
+    def __setitem__(self, x, points):
+        self._place(x, self.as_rows(points))
+
+    def __delitem__(self, x):
+        self.holes += self.blocks.pop(x)[2]
+        self.stamps.pop(x, None)
+        self.version = next(_stamps)
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def __contains__(self, x):
+        return x in self.blocks
+
+    def clear(self):
+        self.used = 0
+        self.holes = 0
+        self.blocks = {}
+        self.stamps = {}
+        self.version = next(_stamps)
+
+    def copy(self):
+        return StationTable({x: self.array(x) for x in self.blocks})
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __repr__(self):
+        return "StationTable({%s})" % ", ".join(f"{x!r}: {list(self[x])!r}" for x in self.blocks)
+
+
+class StationPoints(MutableSequence):
+    """List-like view of one station of a StationTable, items are (x, y, z) tuples"""
+
+    __slots__ = ("table", "x")
+    __hash__ = None
+
+    def __init__(self, table, x):
+        self.table = table
+        self.x = x
+
+    def array(self):
+        return self.table.array(self.x)
+
+    def __len__(self):
+        return self.table.blocks[self.x][1]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [tuple(p) for p in self.array()[i].tolist()]
+        return tuple(self.array()[self.table.index(self.x, i)].tolist())
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            points = list(self)
+            points[i] = value
+            self.table[self.x] = points
+        else:
+            self.table.set_point(self.x, i, value)
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            points = list(self)
+            del points[i]
+            self.table[self.x] = points
+        else:
+            self.table.delete_point(self.x, i)
+
+    def insert(self, i, value):
+        self.table.insert_point(self.x, i, value)
+
+    def __iter__(self):
+        return iter([tuple(p) for p in self.array().tolist()])
+
+    def __eq__(self, other):
+        if isinstance(other, (StationPoints, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.array(), dtype=dtype)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return list(self)
+
+    def __repr__(self):
+        return repr(list(self))
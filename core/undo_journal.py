@@ -0,0 +1,337 @@
+#undo_journal.py
+import copy
+from collections import deque
+import numpy as np
+
+class _Missing:
+    """Marker for an attribute / key that did not exist (survives deepcopy)"""
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+def approx_bytes(obj):
+    """Rough memory size of a patch value (for the journal memory cap)"""
+    if obj is MISSING or obj is None:
+        return 0
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + 96
+    if isinstance(obj, dict):
+        return 64 + sum(approx_bytes(k) + approx_bytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return 56 + sum(8 + approx_bytes(v) for v in obj)
+    if isinstance(obj, str):
+        return 49 + len(obj)
+    return 24
+
+
+# ==============================
+# Station patches
+# ==============================
+def station_rows(stations, x):
+    """Rows (n, 3) of station x as a private copy"""
+    if hasattr(stations, "array"):
+        return stations.array(x).copy()
+    return np.asarray(stations[x], dtype=float).reshape(-1, 3)
+
+
+def station_stamps(stations):
+    """Per-station edit stamps of a StationTable (copy), None for a plain dict"""
+    stamps = getattr(stations, "stamps", None)
+    return dict(stamps) if stamps is not None else None
+
+
+def set_station(stations, x, rows):
+    if hasattr(stations, "array"):
+        stations[x] = rows                  # StationTable takes the rows as is
+    else:
+        stations[x] = [tuple(p) for p in rows.tolist()]
+
+
+def diff_station(old, new):
+    """
+    Patch from rows old to rows new.
+    Same length: ("rows", changed indices, old rows, new rows)
+    Otherwise  : ("all", old rows, new rows), MISSING for no station
+    None when equal.
+    """
+    if old is MISSING or new is MISSING or len(old) != len(new):
+        return ("all", old, new)
+
+    changed = np.flatnonzero((old != new).any(axis=1))
+    if not len(changed):
+        return None
+    return ("rows", changed, old[changed], new[changed])
+
+
+def station_patch_bytes(patch):
+    return 64 + sum(approx_bytes(v) for v in patch[1:])
+
+
+# ==============================
+# Journal
+# ==============================
+class UndoJournal:
+    """
+    Undo/redo as a journal of patches instead of full snapshots.
+
+    checkpoint() is called before an edit (like the old save_state).
+    The changes made since the previous checkpoint are diffed against
+    a shadow copy of the model and stored as one entry: changed station
+    rows, and old/new values of the other fields that changed. With a
+    StationTable only the stations whose edit stamp moved are diffed.
+    Memory then grows with the size of the edits, not the model.
+
+    Consecutive checkpoints with the same coalesce tag (e.g. every
+    motion event of a drag) extend one entry; seal() ends it.
+    The oldest entries are dropped beyond max_bytes / max_entries.
+    """
+
+    FIELDS = (
+        "station_names", "station_order",
+        "waterlines", "waterline_order", "waterline_names", "waterline_points",
+        "buttocklines", "buttockline_names", "buttockline_points",
+        "centerline_points", "ship_dimensions",
+    )
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=1000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.undo_entries = deque()
+        self.redo_entries = []
+        self.bytes = 0
+        self.shadow = None      # model state at the last checkpoint
+        self.open_tag = None
+
+    # ------------------------------
+    # Shadow copy
+    # ------------------------------
+    def capture(self, model):
+        stations = {x: station_rows(model.stations, x) for x in model.stations}
+        fields = {f: copy.deepcopy(getattr(model, f, MISSING)) for f in self.FIELDS}
+        return {"stations": stations, "stamps": station_stamps(model.stations), "fields": fields}
+
+    def reset(self, model):
+        """Forget the history, start from the current model"""
+        self.undo_entries.clear()
+        self.redo_entries = []
+        self.bytes = 0
+        self.shadow = self.capture(model)
+        self.open_tag = None
+
+    # ------------------------------
+    # Diff
+    # ------------------------------
+    def diff(self, model):
+        """Changes since the shadow, None when nothing changed"""
+        old_st = self.shadow["stations"]
+        old_stamps = self.shadow["stamps"]
+        new_stamps = getattr(model.stations, "stamps", None)
+        if old_stamps is None or new_stamps is None:
+            candidates = set(old_st) | set(model.stations)
+        else:
+            # stamps are unique over all tables: a replaced table differs everywhere
+            candidates = {x for x in set(old_st) | set(new_stamps) if old_stamps.get(x) != new_stamps.get(x)}
+
+        stations = {}
+        for x in candidates:
+            new = station_rows(model.stations, x) if x in model.stations else MISSING
+            old = old_st.get(x, MISSING)
+            patch = diff_station(old, new)
+            if patch is not None:
+                stations[x] = patch
+
+        # station keys in order (order of the table is part of the state)
+        old_keys = list(old_st)
+        new_keys = list(model.stations)
+        keys = (old_keys, new_keys) if old_keys != new_keys else None
+
+        fields = {}
+        for f in self.FIELDS:
+            old = self.shadow["fields"][f]
+            new = getattr(model, f, MISSING)
+            if old is MISSING and new is MISSING:
+                continue
+            if old is MISSING or new is MISSING or type(old) is not type(new) or not isinstance(new, dict):
+                if old is MISSING or new is MISSING or old != new:
+                    fields[f] = ("set", old, copy.deepcopy(new))
+                continue
+
+            # dict fields: only the changed keys
+            changes = {}
+            for k in set(old) | set(new):
+                o = old.get(k, MISSING)
+                n = new.get(k, MISSING)
+                if o is MISSING or n is MISSING or o != n:
+                    changes[k] = (o, copy.deepcopy(n))
+            order = (list(old), list(new)) if list(old) != list(new) else None
+            if changes or order:
+                fields[f] = ("keys", changes, order)
+
+        if not stations and not fields and keys is None:
+            return None
+
+        size = 128 + sum(station_patch_bytes(p) for p in stations.values())
+        size += approx_bytes(keys) + approx_bytes(fields)
+        return {"stations": stations, "keys": keys, "fields": fields, "bytes": size}
+
+    def commit_shadow(self, entry, side):
+        """Move the shadow along an entry (side 2 = new values, 1 = old values)"""
+        st = self.shadow["stations"]
+        for x, patch in entry["stations"].items():
+            if patch[0] == "all":
+                rows = patch[side]
+                if rows is MISSING:
+                    st.pop(x, None)
+                else:
+                    st[x] = rows.copy()
+            else:
+                st[x] = st[x].copy()
+                st[x][patch[1]] = patch[side + 1]
+
+        if entry["keys"] is not None:
+            order = entry["keys"][side - 1]
+            self.shadow["stations"] = {x: st[x] for x in order if x in st}
+
+        fields = self.shadow["fields"]
+        for f, patch in entry["fields"].items():
+            if patch[0] == "set":
+                fields[f] = copy.deepcopy(patch[side])
+            else:
+                d = fields[f]
+                for k, values in patch[1].items():
+                    v = values[side - 1]
+                    if v is MISSING:
+                        d.pop(k, None)
+                    else:
+                        d[k] = copy.deepcopy(v)
+                if patch[2] is not None:
+                    items = [(k, d[k]) for k in patch[2][side - 1] if k in d]
+                    d.clear()
+                    d.update(items)
+
+    # ------------------------------
+    # Recording
+    # ------------------------------
+    def flush(self, model):
+        """Close the open entry: store the changes since the last checkpoint"""
+        if self.shadow is None:
+            self.shadow = self.capture(model)
+            return
+
+        entry = self.diff(model)
+        if entry is None:
+            self.shadow["stamps"] = station_stamps(model.stations)
+            return
+
+        self.commit_shadow(entry, 2)
+        self.shadow["stamps"] = station_stamps(model.stations)
+        self.undo_entries.append(entry)
+        self.bytes += entry["bytes"]
+        self.redo_entries = []
+
+        while self.undo_entries and (
+                self.bytes > self.max_bytes or len(self.undo_entries) > self.max_entries):
+            self.bytes -= self.undo_entries.popleft()["bytes"]
+
+    def checkpoint(self, model, coalesce=None):
+        """Call before an edit. Same coalesce tag as the open entry: keep extending it"""
+        if coalesce is not None and coalesce == self.open_tag:
+            return
+        self.flush(model)
+        self.open_tag = coalesce
+
+    def seal(self):
+        """End a coalesced sequence (e.g. mouse release after a drag)"""
+        self.open_tag = None
+
+    # ------------------------------
+    # Undo / redo
+    # ------------------------------
+    def apply(self, model, entry, side):
+        """Write one side of an entry into the model, return the touched station keys"""
+        stations = model.stations
+        for x, patch in entry["stations"].items():
+            if patch[0] == "all":
+                rows = patch[side]
+                if rows is MISSING:
+                    if x in stations:
+                        del stations[x]
+                else:
+                    set_station(stations, x, rows)
+            else:
+                rows = station_rows(stations, x)
+                rows[patch[1]] = patch[side + 1]
+                set_station(stations, x, rows)
+
+        # re-added stations land at the end, restore the key order if needed
+        if entry["keys"] is not None and list(stations) != entry["keys"][side - 1]:
+            rows = {x: station_rows(stations, x) for x in entry["keys"][side - 1] if x in stations}
+            stations.clear()
+            for x, r in rows.items():
+                set_station(stations, x, r)
+
+        for f, patch in entry["fields"].items():
+            if patch[0] == "set":
+                value = copy.deepcopy(patch[side])
+                if value is MISSING:
+                    if hasattr(model, f):
+                        delattr(model, f)
+                else:
+                    setattr(model, f, value)
+                continue
+
+            d = getattr(model, f)
+            for k, values in patch[1].items():
+                v = values[side - 1]
+                if v is MISSING:
+                    d.pop(k, None)
+                else:
+                    d[k] = copy.deepcopy(v)
+            if patch[2] is not None:
+                items = [(k, d[k]) for k in patch[2][side - 1] if k in d]
+                d.clear()
+                d.update(items)
+
+        return set(entry["stations"])
+
+    def undo(self, model):
+        """Revert the last entry (and any edit since), touched station keys or None"""
+        self.flush(model)
+        self.open_tag = None
+        if not self.undo_entries:
+            return None
+
+        entry = self.undo_entries.pop()
+        self.bytes -= entry["bytes"]
+        touched = self.apply(model, entry, 1)
+        self.commit_shadow(entry, 1)
+        self.shadow["stamps"] = station_stamps(model.stations)
+        self.redo_entries.append(entry)
+        return touched
+
+    def redo(self, model):
+        self.flush(model)
+        self.open_tag = None
+        if not self.redo_entries:
+            return None
+
+        entry = self.redo_entries.pop()
+        touched = self.apply(model, entry, 2)
+        self.commit_shadow(entry, 2)
+        self.shadow["stamps"] = station_stamps(model.stations)
+        self.undo_entries.append(entry)
+        self.bytes += entry["bytes"]
+        return touched
+
+    def stats(self):
+        return {"undo": len(self.undo_entries), "redo": len(self.redo_entries), "bytes": self.bytes}
@@ -2,15 +2,26 @@
 from core.geometry_nurbs import Nurbs_geometry
 from tkinter import messagebox
 import numpy as np
-from core.nurbs_curve import NurbsCurve
-from scipy.interpolate import interp1d
-import multiprocessing as mp
+from core import hull_pipeline
+from core.viewer_process import ViewerProcess
+from ui.tk_tasks import BackgroundTask, ProgressWindow
+from core.mesh import surface_to_mesh
 
 class Viewer3D:
     def __init__(self):
-        self.stations = {}
-        self.station_order = []
         self.geom = Nurbs_geometry()
+        self.geom.station_frames = self.model.station_frames     # drawn by draw_station_frames
+        self.viewer_process = None
+
+        self.live_preview = False
+        self.live_dirty = set()
+        self.live_after = None
+        self.live_interval_ms = 66      # ~15 updates per second
+
+        # background hull build, only the newest generation is shown
+        self.hull_task = None
+        self.hull_generation = 0
+        self.hull_progress = None
 
     def laplacian_smooth(S, iters=5, alpha=0.25):
         S = S.copy()
@@ -32,104 +43,168 @@ class Viewer3D:
             )
             return
 
-        # 1 Clear station frames
-        self.geom.station_frames.clear()
+        self.start_hull_build(show_progress=True)
 
-        # 2 Add stations
-        x_bow   = self.station_order[0]
-        x_stern = self.station_order[-1]
 
-        for x in self.station_order:
-            yz_pts = [(p[1], p[2]) for p in self.stations[x]]
+    def start_hull_build(self, show_progress=False):
+        """Build the hull in a worker thread on a copy of the model"""
+        inputs = self.model.build_inputs()
 
-            self.collapse_bow = False
-            self.collapse_stern = True
+        def work(task):
+            return hull_pipeline.build_hull(inputs, progress=task.progress, cancelled=task.is_cancelled)
 
-            collapse = (x == x_bow and self.collapse_bow) or (x == x_stern and self.collapse_stern)
+        def accept(result):
+            self.model.accept_build(result)
+            self.show_mesh_vispy(result["vertices"], result["faces"])
 
-            ys = [abs(p[1]) for p in yz_pts]
-            curv_hint = max(ys) - min(ys)   
-            n_samples = max(40, min(int(40 + curv_hint * 20), 70))
-            
-            self.geom.add_station_frame(
-                x,
-                yz_pts,
-                #n_samples=500,
-                n_samples=n_samples,
-                collapse=collapse 
-            )
+        self.run_hull_task(work, accept, show_progress)
 
-        # 3 Create NURBS
-        station_curves = []
-        for frame in self.geom.station_frames:
-            pts = frame.evaluate()  # [(x,y,z), ...]
-            
-            station_curves.append(NurbsCurve.from_points(pts))
-
-
-        # 4 Add waterlines
-        waterline_curves = []
-        if hasattr(self, "waterline_order") and self.waterline_order:
-            for z in self.waterline_order:
-                pts = []
-                for frame in self.geom.station_frames:
-                    
-                    zs = [p[1] for p in frame.yz]
-                    ys = [p[0] for p in frame.yz]
-
-                    y_interp = np.interp(z, zs, ys)
-
-                    pts.append((frame.x, y_interp, z))
-                waterline_curves.append(NurbsCurve.from_points(pts))
-
-                
-        # 5 Sample surface grid
-        S = Nurbs_geometry.build_gordon_surface_grid(
-            station_frames=self.geom.station_frames,
-        waterline_zs=self.waterline_order
-        )
-
-        # fairness optional
-        #S = Viewer3D.laplacian_smooth(S, iters=6, alpha=0.25)
-
-        # 6 Bottom override 
-        if hasattr(self, "buttockline_points") and self.buttockline_points:
-
-            B = Nurbs_geometry.build_surface_from_buttock(
-                station_frames=self.geom.station_frames,
-                buttockline_points=self.buttockline_points
-            )
 
-            Y_s = [S[0, j, 1] for j in range(S.shape[1])]
+    def start_row_update(self, xs):
+        """
+        Re-fit the grid rows of stations xs in a worker thread and send
+        them to the viewer, a full build when that is not possible.
+        """
+        vp = self.viewer_process
+        inputs = self.model.row_update_inputs(xs)
+        if inputs is None or vp is None or not vp.is_alive():
+            self.start_hull_build()
+            return
 
-            Y_b = sorted(B[0, :, 1])
+        def work(task):
+            return hull_pipeline.update_rows(inputs)
+
+        def accept(result):
+            if result is None:
+                self.start_hull_build()
+                return
+            self.model.accept_rows(result)
+            S = result["S"]
+            a, b = result["rows"]
+            nv = S.shape[1]
+            if not vp.update_rows(a * nv, S[a:b].reshape(-1, 3)):
+                vertices, faces = self.surface_to_mesh(S)
+                self.show_mesh_vispy(vertices, faces)
+
+        self.run_hull_task(work, accept)
+
+
+    def run_hull_task(self, work, accept, show_progress=False):
+        """
+        Run work(task) in a worker thread and accept(result) on the Tk
+        thread. A newer task cancels the running one; results of older
+        generations are dropped, so only the newest reaches the viewer.
+        Live preview edits made meanwhile wait in live_dirty until it ends.
+        """
+        if self.hull_task is not None:
+            self.hull_task.cancel()
+        self.hull_generation += 1
+        generation = self.hull_generation
+
+        def finish():
+            self.hull_task = None
+            if self.hull_progress is not None:
+                self.hull_progress.close()
+                self.hull_progress = None
+
+        def done(result):
+            if generation != self.hull_generation:
+                return
+            finish()
+            accept(result)
+            self.schedule_live_preview()
+
+        def failed(e):
+            if generation != self.hull_generation:
+                return
+            finish()
+            if isinstance(e, hull_pipeline.BuildCancelled):
+                return
+            if show_progress:
+                messagebox.showerror("Error", f"Failed to build hull:\n{e}")
+            # live preview fails quietly, queued edits retry
+            self.schedule_live_preview()
+
+        def report(done_steps, total, stage):
+            if generation == self.hull_generation and self.hull_progress is not None:
+                self.hull_progress.update(done_steps, total, f"Building hull: {stage}")
+
+        def open_progress():
+            # only for builds that take a while
+            if generation == self.hull_generation and self.hull_task is not None and self.hull_progress is None:
+                self.hull_progress = ProgressWindow(self.master, "Building hull...", on_cancel=self.cancel_hull_build)
+
+        self.hull_task = BackgroundTask(self, work, on_done=done, on_error=failed, on_progress=report)
+        self.hull_task.start()
+        if show_progress:
+            self.after(300, open_progress)
+
+
+    def cancel_hull_build(self):
+        if self.hull_task is not None:
+            self.hull_task.cancel()
+
+
+    # pipeline lives in core/hull_pipeline.py (no Tk), run on self.model
+    def hull_sample_count(self):
+        return hull_pipeline.hull_sample_count(self.stations, self.station_order)
+
+
+    def make_station_frames(self, xs, n_samples):
+        return hull_pipeline.make_station_frames(self.stations, self.station_order, xs, n_samples)
+
+
+    def build_hull_grid(self):
+        """Full hull grid, keeps the build state for live row updates"""
+        return self.model.build_hull_grid()
+
+
+    def update_hull_rows(self, xs):
+        """
+        Re-fit only the grid rows of stations xs.
+        Returns (S, first_row, last_row + 1) or None when a full build is needed.
+        """
+        return self.model.update_hull_rows(xs)
+
+
+    def blend_bottom(self, S, frames, bottom):
+        """Blend grid rows S into the buttock bottom surface under z_cut"""
+        return hull_pipeline.blend_bottom(S, frames, bottom, self.buttockline_points)
+
+
+    #------------------------------------
+    #  LIVE PREVIEW
+    #------------------------------------
+    def toggle_live_preview(self):
+        self.live_preview = not getattr(self, "live_preview", False)
+        if self.live_preview:
+            self.preview_hull_3d()
+
+    def mark_station_dirty(self, x):
+        """Queue station x for the next (throttled) live preview update"""
+        if not getattr(self, "live_preview", False):
+            return
 
-            B_interp = np.zeros_like(S)
-            for i in range(B.shape[0]):  
-                f = interp1d(Y_b, B[i, :, 2], kind='cubic', fill_value='extrapolate')
-                for j, y in enumerate(Y_s):
-                    B_interp[i, j, 0] = S[i, j, 0]  # x
-                    B_interp[i, j, 1] = y           # y
-                    B_interp[i, j, 2] = f(y)       
+        self.live_dirty.add(x)
+        self.schedule_live_preview()
 
-            z_min = np.min(S[:, :, 2])
-            z_range = np.max(S[:, :, 2]) - z_min
-            z_cut = z_min + 0.08 * z_range   # 5–10% draft
+    def schedule_live_preview(self):
+        if self.live_dirty and self.live_after is None:
+            self.live_after = self.after(self.live_interval_ms, self.flush_live_preview)
 
-            blend_band = 0.03 * z_range 
+    def flush_live_preview(self):
+        self.live_after = None
+        if not self.live_preview or len(self.station_order) < 4:
+            self.live_dirty.clear()
+            return
 
-            for i in range(S.shape[0]):
-                for j in range(S.shape[1]):
-                    z = S[i, j, 2]
-                    if z <= z_cut:
-                        S[i, j] = B_interp[i, j]
-                    elif z <= z_cut + blend_band:
-                        t = (z - z_cut) / blend_band  # 0..1
-                        S[i, j] = (1 - t) * B_interp[i, j] + t * S[i, j]
-            
-        # 7 Convert 
-        vertices, faces = self.surface_to_mesh(S)
-        self.show_mesh_vispy(vertices, faces)
+        # one hull task at a time, the running one picks the edits up when done
+        if self.hull_task is not None:
+            return
+
+        dirty, self.live_dirty = self.live_dirty, set()
+        if dirty:
+            self.start_row_update(dirty)
 
 
     def draw_station_frames(self):
@@ -155,20 +230,8 @@ class Viewer3D:
 
 
     def surface_to_mesh(self, S):
-        nu, nv, _ = S.shape
-        vertices = S.reshape(-1, 3).astype(np.float32)
-
-        faces = []
-        for i in range(nu - 1):
-            for j in range(nv - 1):
-                p0 = i * nv + j
-                p1 = p0 + 1
-                p2 = p0 + nv
-                p3 = p2 + 1
-                faces.append([p0, p1, p2])
-                faces.append([p1, p3, p2])
-
-        return vertices, np.array(faces, dtype=np.uint32)
+        # topology is cached per grid shape, only the vertex buffer is new
+        return surface_to_mesh(S)
     
 
     def redraw(self):
@@ -194,13 +257,11 @@ class Viewer3D:
 
  
     def show_mesh_vispy(self, vertices, faces):
-        mp.set_start_method("spawn", force=True)
+        # one viewer process for the whole session, mesh swapped in place
+        if getattr(self, "viewer_process", None) is None:
+            self.viewer_process = ViewerProcess()
 
-        p = mp.Process(
-            target=run_vispy_viewer,
-            args=(vertices, faces)
-        )
-        p.start()
+        self.viewer_process.show(vertices, faces)
 
 #------------------------------------
 #  VISPY VIEWER
@@ -211,15 +272,17 @@ def add_axes(view, length=1.0):
 
     # X axis
     x = np.array([[0, 0, 0], [length, 0, 0]], dtype=np.float32)
-    scene.visuals.Line(pos=x, color=(1, 0, 0, 1), width=3, parent=view.scene)
+    lx = scene.visuals.Line(pos=x, color=(1, 0, 0, 1), width=3, parent=view.scene)
 
     # Y axis
     y = np.array([[0, 0, 0], [0, length, 0]], dtype=np.float32)
-    scene.visuals.Line(pos=y, color=(0, 1, 0, 1), width=3, parent=view.scene)
+    ly = scene.visuals.Line(pos=y, color=(0, 1, 0, 1), width=3, parent=view.scene)
 
     # Z axis
     z = np.array([[0, 0, 0], [0, 0, length]], dtype=np.float32)
-    scene.visuals.Line(pos=z, color=(0, 0, 1, 1), width=3, parent=view.scene)
+    lz = scene.visuals.Line(pos=z, color=(0, 0, 1, 1), width=3, parent=view.scene)
+
+    return [lx, ly, lz]
 
 
 def run_vispy_viewer(vertices, faces):
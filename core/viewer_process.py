@@ -0,0 +1,280 @@
+#viewer_process.py
+import atexit
+import queue as queue_mod
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+
+#------------------------------------
+#  SHARED MEMORY HELPERS
+#------------------------------------
+def attach_shared(name):
+    """
+    Attach existing block. The spawned viewer shares the parent's
+    resource tracker, so the parent stays the only owner (unlink).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedArray:
+    """Growable shared memory buffer, parent side"""
+
+    def __init__(self):
+        self.shm = None
+        self.spec = None
+        self.retired = []
+
+    def write(self, arr):
+        """Copy arr into the buffer, return spec (name, shape, dtype)"""
+        arr = np.ascontiguousarray(arr)
+        size = max(arr.nbytes, 1)
+
+        if self.shm is None or self.shm.size < size:
+            if self.shm is not None:
+                # viewer may still map the old block, unlink on close
+                self.retired.append(self.shm)
+            self.shm = shared_memory.SharedMemory(create=True, size=int(size * 1.5) + 4096)
+
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=self.shm.buf)
+        view[...] = arr
+        self.spec = (self.shm.name, arr.shape, arr.dtype.str)
+        return self.spec
+
+    def write_rows(self, start, rows):
+        """Overwrite rows [start, start+len(rows)) of the last written array"""
+        name, shape, dtype = self.spec
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.shm.buf)
+        view[start:start + len(rows)] = rows
+
+    def release(self):
+        for shm in self.retired + ([self.shm] if self.shm else []):
+            try:
+                shm.close()
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.shm = None
+        self.spec = None
+        self.retired = []
+
+
+#------------------------------------
+#  PERSISTENT VIEWER (parent side)
+#------------------------------------
+class ViewerProcess:
+    """
+    Long-lived vispy viewer.
+    Started once, mesh updates go through shared memory,
+    only a small message is sent over the control queue.
+    """
+
+    def __init__(self):
+        self.ctx = mp.get_context("spawn")
+        self.process = None
+        self.control = None
+        self.lock = None
+        self.current = None
+        self.buffers = {
+            "vertices": SharedArray(),
+            "faces": SharedArray(),
+        }
+        self.version = 0
+        self.last_faces = None
+        atexit.register(self.close)
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        if self.is_alive():
+            return
+
+        self.control = self.ctx.Queue()
+        self.lock = self.ctx.Lock()
+        self.current = self.ctx.Value("q", 0, lock=False)   # guarded by self.lock
+        self.process = self.ctx.Process(
+            target=viewer_main,
+            args=(self.control, self.lock, self.current),
+            daemon=True
+        )
+        self.process.start()
+
+    def show(self, vertices, faces):
+        """Send a new mesh, (re)start the viewer when needed"""
+        self.start()
+        self.version += 1
+
+        # cached topology (core.mesh.grid_faces) is sent only once
+        same_faces = faces is self.last_faces and self.buffers["faces"].spec is not None
+        self.last_faces = faces
+
+        with self.lock:
+            msg = {
+                "version": self.version,
+                "vertices": self.buffers["vertices"].write(np.asarray(vertices, dtype=np.float32)),
+                "faces": self.buffers["faces"].spec if same_faces else
+                         self.buffers["faces"].write(np.asarray(faces, dtype=np.uint32)),
+                "faces_changed": not same_faces,
+            }
+            self.current.value = self.version
+
+        self.control.put(("mesh", msg))
+
+    def update_rows(self, start, vertices):
+        """
+        Overwrite vertex rows from index start, same topology.
+        Returns False when no mesh is shown yet (caller sends a full mesh).
+        """
+        if not self.is_alive() or self.buffers["vertices"].spec is None:
+            return False
+
+        stop = start + len(vertices)
+        self.version += 1
+
+        with self.lock:
+            self.buffers["vertices"].write_rows(start, np.asarray(vertices, dtype=np.float32))
+            self.current.value = self.version
+
+        self.control.put(("rows", {"version": self.version, "start": start, "stop": stop}))
+        return True
+
+    def close(self):
+        if self.is_alive():
+            try:
+                self.control.put(("quit", None))
+                self.process.join(timeout=2.0)
+            except Exception:
+                pass
+            if self.process.is_alive():
+                self.process.terminate()
+
+        self.process = None
+        self.last_faces = None
+        for buf in self.buffers.values():
+            buf.release()
+
+
+#------------------------------------
+#  VIEWER LOOP (child side)
+#------------------------------------
+def read_shared(spec, attached, rows=None):
+    """Copy array described by spec (or rows (a, b) of it) out of shared memory"""
+    name, shape, dtype = spec
+    shm = attached.get(name)
+    if shm is None:
+        shm = attach_shared(name)
+        attached[name] = shm
+
+    view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    if rows is not None:
+        view = view[rows[0]:rows[1]]
+    return view.copy()
+
+
+def viewer_main(control, lock, current, poll_ms=30):
+    from vispy import scene, app
+    from vispy.color import Color
+    from vispy.geometry import MeshData
+    from core.viewer3d2 import add_axes
+
+    canvas = scene.SceneCanvas(
+        keys='interactive',
+        show=True,
+        title='Hull Preview'
+    )
+
+    view = canvas.central_widget.add_view()
+    view.camera = scene.cameras.TurntableCamera(
+        fov=35,
+        azimuth=30,
+        elevation=25,
+        distance=3.0
+    )
+
+    mesh = scene.visuals.Mesh(
+        shading='smooth',
+        color=Color("#c4161c"),
+        parent=view.scene
+    )
+
+    # Light setting
+    view.scene.light_dir = (1, 1, 1)
+
+    state = {"axes": None, "mesh": None, "vertices": None, "faces": None}
+    attached = {}
+
+    # pending work since the last applied version
+    pending = {"version": None, "mesh": None, "rows": None}
+
+    def apply_pending():
+        with lock:
+            if current.value != pending["version"]:
+                return      # buffers already hold a newer state, its message follows
+
+            msg = pending["mesh"]
+            if msg is not None:
+                state["mesh"] = msg
+                state["vertices"] = read_shared(msg["vertices"], attached)
+                if msg["faces_changed"] or state["faces"] is None:
+                    state["faces"] = read_shared(msg["faces"], attached)
+
+            elif pending["rows"] is not None and state["mesh"] is not None:
+                a, b = pending["rows"]
+                msg = state["mesh"]
+                state["vertices"][a:b] = read_shared(msg["vertices"], attached, (a, b))
+
+        full = pending["mesh"] is not None
+        pending.update(version=None, mesh=None, rows=None)
+        if state["vertices"] is None:
+            return
+
+        vertices = state["vertices"]
+        # smooth shading recomputes the normals of the sampled mesh
+        mesh_data = MeshData(vertices=vertices, faces=state["faces"])
+        mesh.set_data(meshdata=mesh_data)
+
+        # Axis length follows the hull size
+        if full:
+            L = float(np.max(np.ptp(vertices, axis=0))) if len(vertices) else 1.0
+            for line in state["axes"] or []:
+                line.parent = None
+            state["axes"] = add_axes(view, length=0.2 * L)
+
+        canvas.update()
+
+    def poll(event):
+        try:
+            while True:
+                cmd, payload = control.get_nowait()
+                if cmd == "quit":
+                    app.quit()
+                    return
+
+                pending["version"] = payload["version"]
+                if cmd == "mesh":
+                    # only the newest full mesh matters
+                    pending["mesh"] = payload
+                    pending["rows"] = None
+                elif cmd == "rows":
+                    a, b = payload["start"], payload["stop"]
+                    if pending["rows"] is not None:
+                        a = min(a, pending["rows"][0])
+                        b = max(b, pending["rows"][1])
+                    pending["rows"] = (a, b)
+        except queue_mod.Empty:
+            pass
+
+        if pending["version"] is not None:
+            apply_pending()
+
+    timer = app.Timer(interval=poll_ms / 1000.0, connect=poll, start=True)
+    canvas.events.close.connect(lambda event: app.quit())
+
+    app.run()
+    timer.stop()
+    for shm in attached.values():
+        shm.close()
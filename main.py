@@ -30,6 +30,8 @@ class JalaynApp(tk.Frame, BodyPlan3DApp, BodyPlanUI, StateManager, CanvasDrawer,
 
         self.setup_ui()
         self.create_menu_bar()
+        self.start_autosave()
+        master.protocol("WM_DELETE_WINDOW", self.close_app)
 
 def start_main_app():
     root.deiconify()
@@ -1,4 +1,9 @@
 #drawcanvas.py
+from ui.retained_canvas import RetainedCanvas
+from ui.frame_scheduler import FrameScheduler
+import numpy as np
+from core import curve_tessellation
+
 class CanvasDrawer:
     def __init__(self):
         self.station_visibility = {}  # ← default
@@ -7,6 +12,8 @@ class CanvasDrawer:
         self.point_angles = {}       # key = (station, index) → angle in degrees
         self.point_strength = {}     # key = (station, index) → tangent strength
         self.station_spline = {}     # key = station → True/False for spline on/off
+        self.frame_scheduler = None  # created on the first request_redraw
+        self.show_frame_time = False
 
     def angle_to_tangent(self, angle_deg, strength=1.0):
         import math
@@ -14,103 +21,68 @@ class CanvasDrawer:
         return (math.cos(rad) * strength, math.sin(rad) * strength)
 
 
-    def hermite(self, p0, p1, m0, m1, t):
-        """Cubic Hermite interpolation."""
-        h00 = 2*t**3 - 3*t**2 + 1
-        h10 = t**3 - 2*t**2 + t
-        h01 = -2*t**3 + 3*t**2
-        h11 = t**3 - t**2
-        return (
-            h00*p0[0] + h10*m0[0] + h01*p1[0] + h11*m1[0],
-            h00*p0[1] + h10*m0[1] + h01*p1[1] + h11*m1[1]
-        )
-    
-    def generate_hermite_points(self, station, points, steps=20):
-        """Generate a polyline using Hermite cubic spline."""
-        if len(points) < 2:
-            return points
-
-        result = []
-        n = len(points)
-
-        # compute tangents 
-        tangents = []
-        for i in range(n):
-            key = (station, i) 
+    def station_tangents(self, station, P):
+        """Hermite tangents of points P (n, 2), with the per-point angle / strength overrides"""
+        tangents = curve_tessellation.default_tangents(P)
+        for i in range(len(P)):
+            key = (station, i)
             self.station_spline[key] = True
 
             if key in self.point_angles:
                 angle = self.point_angles[key]
-                strength = self.point_strength.get(key, 30)  
-                m = self.angle_to_tangent(angle, strength)
+                strength = self.point_strength.get(key, 30)
+                tangents[i] = self.angle_to_tangent(angle, strength)
+        return tangents
 
-            else:
-                # fallback normal Catmull-Rom
-                if i == 0:
-                    m = (points[1][0] - points[0][0], points[1][1] - points[0][1])
-                elif i == n - 1:
-                    m = (points[-1][0] - points[-2][0], points[-1][1] - points[-2][1])
-                else:
-                    m = (
-                        (points[i+1][0] - points[i-1][0]) * 0.5,
-                        (points[i+1][1] - points[i-1][1]) * 0.5
-                    )
-            tangents.append(m)
-
-        # build Hermite segments
-        for i in range(n - 1):
-            p0 = points[i]
-            p1 = points[i+1]
-            m0 = tangents[i]
-            m1 = tangents[i+1]
-
-            for s in range(steps):
-                t = s / steps
-                result.append(self.hermite(p0, p1, m0, m1, t))
-
-        result.append(points[-1])
-        return result
+    def generate_hermite_points(self, station, points, steps=20):
+        """Generate a polyline using Hermite cubic spline."""
+        if len(points) < 2:
+            return points
+
+        P = np.asarray(points, dtype=float)
+        return curve_tessellation.hermite_polyline(P, self.station_tangents(station, P), steps).tolist()
 
     def generate_hermite_points_generic(self, pts, steps=20):
         if len(pts) < 2:
             return pts
-
-        smooth = []
-        n = len(pts)
-
-        for i in range(n - 1):
-            p0 = pts[i - 1] if i > 0 else pts[i]
-            p1 = pts[i]
-            p2 = pts[i + 1]
-            p3 = pts[i + 2] if i + 2 < n else pts[i + 1]
-
-            for t in range(steps):
-                t /= steps
-                t2 = t * t
-                t3 = t2 * t
-
-                x = 0.5 * (
-                    (2 * p1[0]) +
-                    (-p0[0] + p2[0]) * t +
-                    (2*p0[0] - 5*p1[0] + 4*p2[0] - p3[0]) * t2 +
-                    (-p0[0] + 3*p1[0] - 3*p2[0] + p3[0]) * t3
-                )
-
-                y = 0.5 * (
-                    (2 * p1[1]) +
-                    (-p0[1] + p2[1]) * t +
-                    (2*p0[1] - 5*p1[1] + 4*p2[1] - p3[1]) * t2 +
-                    (-p0[1] + 3*p1[1] - 3*p2[1] + p3[1]) * t3
-                )
-
-                smooth.append((x, y))
-
-        smooth.append(pts[-1])
-        return smooth
+        return curve_tessellation.catmull_rom_polyline(pts, steps).tolist()
+
+
+    # viewport title -> retained scope
+    VIEWPORT_SCOPES = {
+        "Top View (X-Y)": "top",
+        "Front View (Y-Z)": "front",
+        "Side View (X-Z)": "side",
+        "Isometric View": "iso",
+    }
+
+    def retained_canvas(self, canvas):
+        """RetainedCanvas for canvas (one per canvas widget)"""
+        if not hasattr(self, "retained"):
+            self.retained = {}
+        r = self.retained.get(canvas)
+        if r is None:
+            r = self.retained[canvas] = RetainedCanvas(canvas)
+        return r
+
+    def station_angles(self, x, n):
+        """Custom tangents of station x, part of its redraw signature"""
+        if not self.point_angles:
+            return ()
+        return tuple(
+            (i, self.point_angles[(x, i)], self.point_strength.get((x, i)))
+            for i in range(n) if (x, i) in self.point_angles
+        )
 
 
     def draw_viewport(self, origin_x, origin_y, proj_func, title, target_canvas=None, scale=None, pan=None):
         canvas = target_canvas if target_canvas else self.canvas
+        r = self.retained_canvas(canvas)
+        vp = self.VIEWPORT_SCOPES.get(title, title)
+        own_frame = target_canvas is not None
+
+        if own_frame:
+            r.begin()
 
         # Set scale and pan
         if scale is None:
@@ -147,84 +119,104 @@ class CanvasDrawer:
         right = left + w
         bottom = top + h
 
-        # Viewport background
-        canvas.create_rectangle(left, top, right, bottom, fill="#f0f0f0", tags="background")
-        canvas.tag_lower("background")
-
-        canvas.create_text(left+10, top+10, text=title, anchor="nw", font=("Arial", 14, "bold"))
-
         # Center viewport coordinate
         cx, cy = origin_x, origin_y
 
-        # Axis 
-        canvas.create_line(max(left, cx - w//2 + pan_x), cy + pan_y,
-                        min(right, cx + w//2 + pan_x), cy + pan_y,
-                        fill="gray", dash=(4,2))
-        canvas.create_line(cx + pan_x, max(top, cy - h//2 + pan_y),
-                        cx + pan_x, min(bottom, cy + h//2 + pan_y),
-                        fill="gray", dash=(4,2))
+        # x position of the side view baseline
+        if self.station_order:
+            x_min = min(self.station_order)
+            x_max = max(self.station_order)
+        else:
+            x_min = -10  
+            x_max = 10
+
+        frame_sig = (left, top, right, bottom, scale, pan_x, pan_y, self.side_scale,
+                     tuple(self.view_pan_side), x_min, x_max)
+
+        if not r.group((vp, "frame"), frame_sig):
+            # Viewport background
+            r.rectangle((vp, "bg"), left, top, right, bottom, fill="#f0f0f0", tags="background")
+
+            r.text((vp, "title"), left+10, top+10, text=title, anchor="nw", font=("Arial", 14, "bold"))
+
+            # Axis 
+            r.line((vp, "axis_x"), max(left, cx - w//2 + pan_x), cy + pan_y,
+                            min(right, cx + w//2 + pan_x), cy + pan_y,
+                            fill="gray", dash=(4,2))
+            r.line((vp, "axis_y"), cx + pan_x, max(top, cy - h//2 + pan_y),
+                            cx + pan_x, min(bottom, cy + h//2 + pan_y),
+                            fill="gray", dash=(4,2))
         
 
-        # === Guideline For Centerline & Baseline ===
-        if title == "Front View (Y-Z)":
-            # Vertical centerline
-            cx_line = max(left, min(right, cx + pan_x))
-            top_line = top        
-            bottom_line = bottom 
-            canvas.create_line(int(cx_line), int(top_line), int(cx_line), int(bottom_line), fill="green", width=2, dash=(4,2))
-            text_cx = min(cx_line + 5, right - 2)
-            text_cy = min(top + 15, bottom - 2)
-            canvas.create_text(text_cx, text_cy, text="Centerline", fill="green", font=("Arial", 8), anchor="nw")
-            # Horizontal baseline
-            cy_line = max(top, min(bottom, cy + pan_y))
-            right_line = right
-            left_line = left
-            canvas.create_line(int(left_line), int(cy_line), int(right_line), int(cy_line), fill="brown", width=2, dash=(4,2))
-            text_cx = max(left, min(cx + 5 + pan_x, right - 2))
-            text_cy = max(top, min(cy_line + 5, bottom - 2))
-            canvas.create_text(text_cx, text_cy, text="Baseline", fill="brown", font=("Arial", 8), anchor="nw")
+            # === Guideline For Centerline & Baseline ===
+            if title == "Front View (Y-Z)":
+                # Vertical centerline
+                cx_line = max(left, min(right, cx + pan_x))
+                top_line = top        
+                bottom_line = bottom 
+                r.line((vp, "centerline"), int(cx_line), int(top_line), int(cx_line), int(bottom_line), fill="green", width=2, dash=(4,2))
+                text_cx = min(cx_line + 5, right - 2)
+                text_cy = min(top + 15, bottom - 2)
+                r.text((vp, "centerline_text"), text_cx, text_cy, text="Centerline", fill="green", font=("Arial", 8), anchor="nw")
+                # Horizontal baseline
+                cy_line = max(top, min(bottom, cy + pan_y))
+                right_line = right
+                left_line = left
+                r.line((vp, "baseline"), int(left_line), int(cy_line), int(right_line), int(cy_line), fill="brown", width=2, dash=(4,2))
+                text_cx = max(left, min(cx + 5 + pan_x, right - 2))
+                text_cy = max(top, min(cy_line + 5, bottom - 2))
+                r.text((vp, "baseline_text"), text_cx, text_cy, text="Baseline", fill="brown", font=("Arial", 8), anchor="nw")
 
         if title == "Side View (X-Z)":
             # baseline / Z = 0
             scale = self.side_scale  
             pan_x, pan_y = self.view_pan_side  
-            
-            y0 = cy + pan_y - 0 * scale  # Z=0
-            cy_line = max(top, min(bottom, y0))
 
-            # x position
-            if self.station_order:
-                x_min = min(self.station_order)
-                x_max = max(self.station_order)
-            else:
-                x_min = -10  
-                x_max = 10
+            if r.current is not None:
+                y0 = cy + pan_y - 0 * scale  # Z=0
+                cy_line = max(top, min(bottom, y0))
+
+                left_line = max(left, cx + pan_x + x_min * scale)
+                right_line = min(right, cx + pan_x + x_max * scale)
 
-            left_line = max(left, cx + pan_x + x_min * scale)
-            right_line = min(right, cx + pan_x + x_max * scale)
+                # baseline
+                r.line((vp, "baseline"), int(left_line), int(cy_line), int(right_line), int(cy_line),
+                                fill="brown", width=2, dash=(4,2))
 
-            # baseline
-            canvas.create_line(int(left_line), int(cy_line), int(right_line), int(cy_line),
-                            fill="brown", width=2, dash=(4,2))
+                #  text "Baseline"
+                text_cx = max(left, min(cx + 5 + pan_x, right - 2))
+                text_cy = max(top, min(cy_line + 5, bottom - 2))
+                r.text((vp, "baseline_text"), text_cx, text_cy, text="Baseline", fill="brown",
+                                font=("Arial", 8), anchor="nw")
+        r.end_group()
 
-            #  text "Baseline"
-            text_cx = max(left, min(cx + 5 + pan_x, right - 2))
-            text_cy = max(top, min(cy_line + 5, bottom - 2))
-            canvas.create_text(text_cx, text_cy, text="Baseline", fill="brown",
-                            font=("Arial", 8), anchor="nw")
+        view_sig = (left, top, right, bottom, cx, cy, scale, pan_x, pan_y)
             
 
         #---------------------------------------------------------
         # STATION
         #--------------------------------------------------------
+        # changed stations are projected first, their splines are
+        # tessellated together, then drawn into their groups
+        todo = []
         for x in self.station_order:
-            if not self.station_visibility.get(x, True):
+            pts = self.stations.get(x, [])
+            visible = self.station_visibility.get(x, True)
+            is_selected = (self.selected_station == x)
+            use_spline = self.station_spline.get(x, True)
+            name = self.station_names.get(x) if title == "Front View (Y-Z)" else None
+
+            sig = (view_sig, tuple(pts), visible, is_selected, use_spline, name,
+                   self.station_angles(x, len(pts)))
+            if r.group((vp, "station", x), sig):
                 continue
 
-            pts = self.stations.get(x, [])
-            if not pts:
+            if not visible or not pts:
+                r.end_group()
                 continue
 
+            tag = f"station_{x:.3f}"
+
             proj_pts = []
             for px, py, pz in pts:
                 sx, sy = proj_func(px, py, pz)
@@ -239,29 +231,37 @@ class CanvasDrawer:
 
                 proj_pts.append((sx, sy))
 
+            todo.append((x, proj_pts, is_selected, use_spline, name, tag))
+            r.end_group()
+
+        splined = [t for t in todo if t[3] and len(t[1]) > 1]
+        smooth = curve_tessellation.hermite_polylines(
+            [P for _, P, *_ in splined],
+            [self.station_tangents(x, np.asarray(P, dtype=float)) for x, P, *_ in splined],
+            steps=20
+        )
+        smooth = {t[0]: S for t, S in zip(splined, smooth)}
+
+        for x, proj_pts, is_selected, use_spline, name, tag in todo:
+            r.reopen((vp, "station", x))
 
             # ------------------------------------------------------
             #            DRAW CURVE 
             # ------------------------------------------------------
             # Draw lines 
             if len(proj_pts) > 1:
-                is_selected = (self.selected_station == x)
-                use_spline = self.station_spline.get(x, True)
-
                 # if spline mode 
                 if use_spline:
-                    smooth_pts = self.generate_hermite_points(x, proj_pts, steps=20)
+                    coords = smooth[x].ravel().tolist()
                 else:
-                    smooth_pts = proj_pts
-
-                coords = []
-                for sx, sy in smooth_pts:
-                    coords.extend([sx, sy])
+                    coords = [c for pt in proj_pts for c in pt]
 
-                canvas.create_line(
+                r.line(
+                    (vp, "station", x, "curve"),
                     *coords,
                     fill="red" if is_selected else "black",
-                    width=3 if (title=="Front View (Y-Z)" and is_selected) else 2
+                    width=3 if (title=="Front View (Y-Z)" and is_selected) else 2,
+                    tags=tag
                 )
 
 
@@ -270,41 +270,49 @@ class CanvasDrawer:
             #                DRAW POINTS 
             # ------------------------------------------------------
             for i, (sx, sy) in enumerate(proj_pts):
-                r = 5
+                rad = 5
 
                 # Modern point style: blue circle with outline
-                canvas.create_oval(
-                    max(left, sx - r), max(top, sy - r),
-                    min(right, sx + r), min(bottom, sy + r),
+                r.oval(
+                    (vp, "station", x, "point", i),
+                    max(left, sx - rad), max(top, sy - rad),
+                    min(right, sx + rad), min(bottom, sy + rad),
                     fill="#274157",               # bright cyan
                     outline="#ffffff",            # white border
                     width=1.3,
-                    tags=("point", f"point_{x}_{i}")
+                    tags=("point", f"point_{x}_{i}", tag)
                 )
                 
             # === curve name view ===
-            if title == "Front View (Y-Z)":
-                name = self.station_names.get(x)
-                if name and proj_pts:
-                    mid_idx = len(proj_pts) // 2
-                    p1 = proj_pts[mid_idx - 1]
-                    p2 = proj_pts[mid_idx]
-                    mid_sx = (p1[0] + p2[0]) / 2
-                    mid_sy = (p1[1] + p2[1]) / 2
+            if name and proj_pts:
+                mid_idx = len(proj_pts) // 2
+                p1 = proj_pts[mid_idx - 1]
+                p2 = proj_pts[mid_idx]
+                mid_sx = (p1[0] + p2[0]) / 2
+                mid_sy = (p1[1] + p2[1]) / 2
 
-                    canvas.create_text(mid_sx, mid_sy - 10, text=name, fill="blue", font=("Arial", 10, "bold"))
+                r.text((vp, "station", x, "name"), mid_sx, mid_sy - 10, text=name, fill="blue",
+                       font=("Arial", 10, "bold"), tags=tag)
 
             # Draw vertical lines for station in top and side view
             if title == "Top View (X-Y)" or title == "Side View (X-Z)":
                 sx = cx + x * scale + pan_x
                 sx = max(left, min(right, sx))
-                canvas.create_line(sx, top, sx, bottom, fill="red", dash=(2,2))
+                r.line((vp, "station", x, "mark"), sx, top, sx, bottom, fill="red", dash=(2,2), tags=tag)
+
+            r.end_group()
             
 
         # === Draw waterlines ===
+        todo = []
         for z in self.waterlines:
             wl_points = self.waterline_points.get(z, [])
+
+            if r.group((vp, "waterline", z), (view_sig, tuple(wl_points))):
+                continue
+
             if len(wl_points) < 2:
+                r.end_group()
                 continue
 
             # Projected points container
@@ -325,18 +333,24 @@ class CanvasDrawer:
                 proj.append((sx, sy))
 
             if len(proj) < 2:
+                r.end_group()
                 continue
 
+            todo.append((z, proj))
+            r.end_group()
 
-            # === APPLY SPLINE ===
-            smooth_proj = self.generate_hermite_points_generic(proj, steps=20)
+        # === APPLY SPLINE (all changed waterlines at once) ===
+        smooth = curve_tessellation.catmull_rom_polylines([proj for _, proj in todo], steps=20)
 
+        for (z, _), smooth_proj in zip(todo, smooth):
+            r.reopen((vp, "waterline", z))
 
             # Flatten list for canvas.create_line
-            coords = [c for pt in smooth_proj for c in pt]
+            coords = smooth_proj.ravel().tolist()
 
             # === Modern line style ===
-            canvas.create_line(
+            r.line(
+                (vp, "waterline", z, "curve"),
                 *coords,
                 fill="#1f78b4",        
                 width=2,
@@ -347,20 +361,62 @@ class CanvasDrawer:
 
             # === Label waterline  ===
             mid = len(smooth_proj) // 2
-            mx, my = smooth_proj[mid]
+            mx, my = smooth_proj[mid].tolist()
 
-            canvas.create_text(
+            r.text(
+                (vp, "waterline", z, "label"),
                 mx,
                 my - 8,
                 text=f"WL {z:.2f}",
                 fill="#1f78b4",
                 font=("Segoe UI", 8, "bold")
             )
+            r.end_group()
+
+        if own_frame:
+            r.end()
+
+
+    def request_redraw(self, viewports=None):
+        """
+        Redraw on the next frame instead of now.
+        viewports : "top", "front", "side", "iso" or a list of them, None = all
+        """
+        if self.frame_scheduler is None:
+            self.frame_scheduler = FrameScheduler(self, self.draw_all)
+        self.frame_scheduler.invalidate(viewports)
+
+    def toggle_frame_time(self):
+        self.show_frame_time = not self.show_frame_time
+        self.request_redraw("hud")
+
+    def draw_frame_time(self, r):
+        """Frame time counter in the top right corner"""
+        if not self.show_frame_time or self.frame_scheduler is None:
+            return
+        st = self.frame_scheduler.stats()
+        r.text(("hud", "frame_time"), self.width - 10, 10,
+               text=f"{st['last_ms']:.1f} ms (avg {st['avg_ms']:.1f}, max {st['max_ms']:.1f}) "
+                    f"~{st['fps']:.0f} fps | {st['frames']}/{st['requests']} frames/requests",
+               anchor="ne", fill="#555555", font=("Arial", 8))
 
 
     #DRAW ALL 
-    def draw_all(self):
-        self.canvas.delete("all")
+    def draw_all(self, viewports=None):
+        """viewports : set of viewports to redraw, None = all (see request_redraw)"""
+        if viewports is None and self.frame_scheduler is not None:
+            self.frame_scheduler.discard()      # full redraw now, pending frame is redundant
+
+        # waterlines follow the stations before anything is drawn; every view shows them
+        if self.update_waterlines() and viewports is not None:
+            viewports = set(viewports) | {"top", "front", "side", "iso"}
+
+        def dirty(vp):
+            return viewports is None or vp in viewports
+
+        r = self.retained_canvas(self.canvas)
+        r.begin(None if viewports is None else set(viewports) | {"hud"})
+
         w2 = self.width // 2
         h2 = self.height // 2
 
@@ -369,14 +425,20 @@ class CanvasDrawer:
         self.offsets['side'] = (self.divider_x // 2, (self.divider_y + self.height) // 2)
         self.offsets['iso'] = ((self.divider_x + self.width) // 2, (self.divider_y + self.height) // 2)
 
-        self.draw_viewport(self.divider_x // 2, self.divider_y // 2, self.project_top, "Top View (X-Y)")
-        self.draw_viewport((self.divider_x + self.width) // 2, self.divider_y // 2, self.project_front, "Front View (Y-Z)")
-        self.draw_viewport(self.divider_x // 2, (self.divider_y + self.height) // 2, self.project_side, "Side View (X-Z)")
-        self.draw_viewport((self.divider_x + self.width) // 2, (self.divider_y + self.height) // 2, self.project_iso, "Isometric View")
+        if dirty("top"):
+            self.draw_viewport(self.divider_x // 2, self.divider_y // 2, self.project_top, "Top View (X-Y)")
+        if dirty("front"):
+            self.draw_viewport((self.divider_x + self.width) // 2, self.divider_y // 2, self.project_front, "Front View (Y-Z)")
+        if dirty("side"):
+            self.draw_viewport(self.divider_x // 2, (self.divider_y + self.height) // 2, self.project_side, "Side View (X-Z)")
+        if dirty("iso"):
+            self.draw_viewport((self.divider_x + self.width) // 2, (self.divider_y + self.height) // 2, self.project_iso, "Isometric View")
 
 
-        self.canvas.create_line(self.divider_x, 0, self.divider_x, self.height, fill="black", width=2, tags="divider_v")
-        self.canvas.create_line(0, self.divider_y, self.width, self.divider_y, fill="black", width=2, tags="divider_h")
+        if dirty("frame") and not r.group(("frame", "dividers"), (self.divider_x, self.divider_y, self.width, self.height)):
+            r.line(("frame", "divider_v"), self.divider_x, 0, self.divider_x, self.height, fill="black", width=2, tags="divider_v")
+            r.line(("frame", "divider_h"), 0, self.divider_y, self.width, self.divider_y, fill="black", width=2, tags="divider_h")
+        r.end_group()
 
 
         
@@ -386,47 +448,46 @@ class CanvasDrawer:
             B = self.ship_dimensions.get("Bmax", 0)
             D = self.ship_dimensions.get("Draft", 0)
 
+            w = self.width // 2
+            h = self.height // 2
+
+            # Clamping helper
+            def clamp(val, minv, maxv):
+                return max(minv, min(maxv, val))
+
             # === SIDE VIEW (X-Z) ===
             cx_s, cy_s = self.offsets['side']
             scale = self.side_scale
             pan_x, pan_y = self.view_pan_side
-            w = self.width // 2
-            h = self.height // 2
             left_s = cx_s - w // 2
             right_s = left_s + w
             top_s = cy_s - h // 2
             bottom_s = top_s + h
 
-            x0 = cx_s + 0 * scale + pan_x
-            x1 = cx_s + Lpp * scale + pan_x
-            z0 = cy_s - 0 * scale + pan_y
-            zD = cy_s - D * scale + pan_y
+            if dirty("side") and not r.group(("side", "dimensions"), (cx_s, cy_s, w, h, scale, pan_x, pan_y, Lpp, D)):
+                x0 = cx_s + 0 * scale + pan_x
+                x1 = cx_s + Lpp * scale + pan_x
+                z0 = cy_s - 0 * scale + pan_y
+                zD = cy_s - D * scale + pan_y
 
-            # Clamping helper
-            def clamp(val, minv, maxv):
-                return max(minv, min(maxv, val))
-
-            # AP and FP guideline (X=0 dan X=Lpp)
-            if left_s < x0 < right_s:
-                y1 = clamp(top_s, top_s, bottom_s)
-                y2 = clamp(bottom_s, top_s, bottom_s)
-                self.canvas.create_line(x0, top_s, x0, bottom_s, fill="gray", dash=(4, 2))
-                self.canvas.create_text(x0 + 30, top_s + 20, text="X=0 (AP)", fill="gray", font=("Arial", 9, "italic"))
-            
-            if left_s < x1 < right_s:
-                y1 = clamp(top_s, top_s, bottom_s)
-                y2 = clamp(bottom_s, top_s, bottom_s)
-                self.canvas.create_line(x1, top_s, x1, bottom_s, fill="gray", dash=(4, 2))
-                self.canvas.create_text(x1 - 30, top_s + 20, text=f"X=FP={Lpp} m", fill="gray", font=("Arial", 9, "italic"))
-            
-            
-            # baseline and draft guideline
-            if top_s < z0 < bottom_s:
-                self.canvas.create_line(left_s, z0, right_s, z0, fill="gray", dash=(4, 2))
-                self.canvas.create_text(right_s - 50, z0 - 10, text="Baseline (Z=0)", fill="gray", font=("Arial", 9, "italic"))
-            if top_s < zD < bottom_s:
-                self.canvas.create_line(left_s, zD, right_s, zD, fill="gray", dash=(4, 2))
-                self.canvas.create_text(right_s - 50, zD - 10, text=f"Draft (Z={D} m)", fill="gray", font=("Arial", 9, "italic"))
+                # AP and FP guideline (X=0 dan X=Lpp)
+                if left_s < x0 < right_s:
+                    r.line(("side", "ap"), x0, top_s, x0, bottom_s, fill="gray", dash=(4, 2))
+                    r.text(("side", "ap_text"), x0 + 30, top_s + 20, text="X=0 (AP)", fill="gray", font=("Arial", 9, "italic"))
+                
+                if left_s < x1 < right_s:
+                    r.line(("side", "fp"), x1, top_s, x1, bottom_s, fill="gray", dash=(4, 2))
+                    r.text(("side", "fp_text"), x1 - 30, top_s + 20, text=f"X=FP={Lpp} m", fill="gray", font=("Arial", 9, "italic"))
+                
+                
+                # baseline and draft guideline
+                if top_s < z0 < bottom_s:
+                    r.line(("side", "dim_base"), left_s, z0, right_s, z0, fill="gray", dash=(4, 2))
+                    r.text(("side", "dim_base_text"), right_s - 50, z0 - 10, text="Baseline (Z=0)", fill="gray", font=("Arial", 9, "italic"))
+                if top_s < zD < bottom_s:
+                    r.line(("side", "draft"), left_s, zD, right_s, zD, fill="gray", dash=(4, 2))
+                    r.text(("side", "draft_text"), right_s - 50, zD - 10, text=f"Draft (Z={D} m)", fill="gray", font=("Arial", 9, "italic"))
+            r.end_group()
 
             # === FRONT VIEW (Y-Z) ===
             cx_f, cy_f = self.offsets['front']
@@ -437,28 +498,30 @@ class CanvasDrawer:
             top_f = cy_f - h // 2
             bottom_f = top_f + h
 
-            yL = cx_f - (B / 2) * scale + pan_x
-            yR = cx_f + (B / 2) * scale + pan_x
-            z0 = cy_f - 0 * scale + pan_y
-            zD = cy_f - D * scale + pan_y
+            if dirty("front") and not r.group(("front", "dimensions"), (cx_f, cy_f, w, h, scale, pan_x, pan_y, B, D)):
+                yL = cx_f - (B / 2) * scale + pan_x
+                yR = cx_f + (B / 2) * scale + pan_x
+                z0 = cy_f - 0 * scale + pan_y
+                zD = cy_f - D * scale + pan_y
 
-            # breadth guideline (Y = ±B/2)
-            if left_f < yL < right_f:
-                self.canvas.create_line(yL, top_f, yL, bottom_f, fill="gray", dash=(4, 2))
-                self.canvas.create_text(yL + 20, top_f + 20, text=f"-B/2={-B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
+                # breadth guideline (Y = ±B/2)
+                if left_f < yL < right_f:
+                    r.line(("front", "breadth_l"), yL, top_f, yL, bottom_f, fill="gray", dash=(4, 2))
+                    r.text(("front", "breadth_l_text"), yL + 20, top_f + 20, text=f"-B/2={-B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
 
-            if left_f < yR < right_f:
-                self.canvas.create_line(yR, top_f, yR, bottom_f, fill="gray", dash=(4, 2))
-                self.canvas.create_text(yR - 40, top_f + 20, text=f"+B/2={B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
+                if left_f < yR < right_f:
+                    r.line(("front", "breadth_r"), yR, top_f, yR, bottom_f, fill="gray", dash=(4, 2))
+                    r.text(("front", "breadth_r_text"), yR - 40, top_f + 20, text=f"+B/2={B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
 
-            # === Baseline & Draft (Front View) ===
-            if top_f < z0 < bottom_f:
-                self.canvas.create_line(left_f, z0, right_f, z0, fill="gray", dash=(4, 2))
-                self.canvas.create_text(right_f - 60, clamp(z0 - 10, top_f, bottom_f), text="Baseline (Z=0)", fill="gray", font=("Arial", 9, "italic"))
+                # === Baseline & Draft (Front View) ===
+                if top_f < z0 < bottom_f:
+                    r.line(("front", "dim_base"), left_f, z0, right_f, z0, fill="gray", dash=(4, 2))
+                    r.text(("front", "dim_base_text"), right_f - 60, clamp(z0 - 10, top_f, bottom_f), text="Baseline (Z=0)", fill="gray", font=("Arial", 9, "italic"))
 
-            if top_f < zD < bottom_f:
-                self.canvas.create_line(left_f, zD, right_f, zD, fill="gray", dash=(4, 2))
-                self.canvas.create_text(right_f - 60, clamp(zD - 10, top_f, bottom_f), text=f"Draft (Z={D} m)", fill="gray", font=("Arial", 9, "italic"))
+                if top_f < zD < bottom_f:
+                    r.line(("front", "draft"), left_f, zD, right_f, zD, fill="gray", dash=(4, 2))
+                    r.text(("front", "draft_text"), right_f - 60, clamp(zD - 10, top_f, bottom_f), text=f"Draft (Z={D} m)", fill="gray", font=("Arial", 9, "italic"))
+            r.end_group()
 
             # === TOP VIEW (X-Y) ===
             cx_t, cy_t = self.offsets['top']
@@ -469,30 +532,31 @@ class CanvasDrawer:
             top_t = cy_t - h // 2
             bottom_t = top_t + h
 
-            x0 = cx_t + 0 * scale + pan_x
-            x1 = cx_t + Lpp * scale + pan_x
-            yL = cy_t + (B / 2) * scale + pan_y     
-            yR = cy_t - (B / 2) * scale + pan_y
-
-            # breadth guideline in top view (±B/2)
-            if left_t < x0 < right_t:
-                # left (Y = +B/2)
-                if top_t < yL < bottom_t:
-                    self.canvas.create_line(left_t, yL, right_t, yL, fill="gray", dash=(4, 2))
-                    self.canvas.create_text(right_t - 60, clamp(yL - 10, top_t, bottom_t),
-                                            text=f"+B/2={B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
-                # right (Y = -B/2)
-                if top_t < yR < bottom_t:
-                    self.canvas.create_line(left_t, yR, right_t, yR, fill="gray", dash=(4, 2))
-                    self.canvas.create_text(right_t - 60, clamp(yR - 10, top_t, bottom_t),
-                                            text=f"-B/2={-B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
+            if dirty("top") and not r.group(("top", "dimensions"), (cx_t, cy_t, w, h, scale, pan_x, pan_y, B)):
+                x0 = cx_t + 0 * scale + pan_x
+                yL = cy_t + (B / 2) * scale + pan_y     
+                yR = cy_t - (B / 2) * scale + pan_y
+
+                # breadth guideline in top view (±B/2)
+                if left_t < x0 < right_t:
+                    # left (Y = +B/2)
+                    if top_t < yL < bottom_t:
+                        r.line(("top", "breadth_l"), left_t, yL, right_t, yL, fill="gray", dash=(4, 2))
+                        r.text(("top", "breadth_l_text"), right_t - 60, clamp(yL - 10, top_t, bottom_t),
+                               text=f"+B/2={B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
+                    # right (Y = -B/2)
+                    if top_t < yR < bottom_t:
+                        r.line(("top", "breadth_r"), left_t, yR, right_t, yR, fill="gray", dash=(4, 2))
+                        r.text(("top", "breadth_r_text"), right_t - 60, clamp(yR - 10, top_t, bottom_t),
+                               text=f"-B/2={-B/2:.1f} m", fill="gray", font=("Arial", 9, "italic"))
+            r.end_group()
         #---------------------------------------------------------------------------------------------
 
 
             # ===========================
             # DRAW CENTERLINE 
             # ===========================
-            if getattr(self, "centerline_points", None):
+            if dirty("side") and getattr(self, "centerline_points", None):
                 cx, cy = self.offsets['side']
                 scale = self.side_scale
                 pan_x, pan_y = self.view_pan_side
@@ -501,61 +565,66 @@ class CanvasDrawer:
                 left, right = cx - w//2, cx + w//2
                 top, bottom = cy - h//2, cy + h//2
 
-                if getattr(self, "centerline_points", None) and len(self.centerline_points) >= 2:
-                    cx, cy = self.offsets['side']
-                    scale = self.side_scale
-                    pan_x, pan_y = self.view_pan_side
+                sig = (cx, cy, w, h, scale, pan_x, pan_y, tuple(self.centerline_points),
+                       self.station_angles("centerline", len(self.centerline_points)))
 
-                    # --- spline ---
-                    smooth_pts = self.generate_hermite_points("centerline", self.centerline_points, steps=30)
+                if not r.group(("side", "centerline"), sig):
+                    if len(self.centerline_points) >= 2:
+                        # --- spline ---
+                        smooth_pts = self.generate_hermite_points("centerline", self.centerline_points, steps=30)
 
-                    # Convert to canvas coordinates
-                    coords = []
-                    for x, z in smooth_pts:
-                        sx = cx + x*scale + pan_x
-                        sy = cy - z*scale + pan_y
+                        # Convert to canvas coordinates
+                        coords = []
+                        for x, z in smooth_pts:
+                            sx = cx + x*scale + pan_x
+                            sy = cy - z*scale + pan_y
 
-                        # Clipping
-                        sx = max(left, min(right, sx))
-                        sy = max(top, min(bottom, sy))
+                            # Clipping
+                            sx = max(left, min(right, sx))
+                            sy = max(top, min(bottom, sy))
 
-                        coords.extend([sx, sy])
+                            coords.extend([sx, sy])
 
-                    if len(coords) >= 4:
-                    # --- Glow effect  ---
-                        for w in range(6, 2, -2):
-                            self.canvas.create_line(*coords, fill="#ff9999", width=w, smooth=True, splinesteps=100)
+                        if len(coords) >= 4:
+                        # --- Glow effect  ---
+                            for gw in range(6, 2, -2):
+                                r.line(("side", "centerline", "glow", gw), *coords, fill="#ff9999", width=gw, smooth=True, splinesteps=100)
 
-                    # --- Line ---
-                    self.canvas.create_line(*coords, fill="#ff0000", width=1, smooth=True, splinesteps=100)
+                        # --- Line ---
+                        r.line(("side", "centerline", "curve"), *coords, fill="#ff0000", width=1, smooth=True, splinesteps=100)
 
-                # --- Draw control points  ---
-                r = 5
-                for x, z in self.centerline_points:
-                    sx = cx + x*scale + pan_x
-                    sy = cy - z*scale + pan_y
-                    if left <= sx <= right and top <= sy <= bottom:
-                        # Outer circle (glow)
-                        self.canvas.create_oval(sx-r-1, sy-r-1, sx+r+1, sy+r+1, outline="#ff9999", width=1)
-                        # Inner circle (main point)
-                        self.canvas.create_oval(sx-r, sy-r, sx+r, sy+r, fill="#ff0000", outline="#ff5555", width=1)
+                    # --- Draw control points  ---
+                    rad = 5
+                    for i, (x, z) in enumerate(self.centerline_points):
+                        sx = cx + x*scale + pan_x
+                        sy = cy - z*scale + pan_y
+                        if left <= sx <= right and top <= sy <= bottom:
+                            # Outer circle (glow)
+                            r.oval(("side", "centerline", "glow_pt", i), sx-rad-1, sy-rad-1, sx+rad+1, sy+rad+1, outline="#ff9999", width=1)
+                            # Inner circle (main point)
+                            r.oval(("side", "centerline", "pt", i), sx-rad, sy-rad, sx+rad, sy+rad, fill="#ff0000", outline="#ff5555", width=1)
+                r.end_group()
             #--------------------------------------------------------
 
 
         # === Draw Waterline in Side View (XZ) ===
-        if hasattr(self, "waterline_points"):
-            cx, cy = self.offsets['side']
-            scale = self.side_scale
-            pan_x, pan_y = self.view_pan_side
-            w = self.width // 2
-            h = self.height // 2
-            left = cx - w//2
-            right = left + w
-            top = cy - h//2
-            bottom = top + h
+        cx, cy = self.offsets['side']
+        scale = self.side_scale
+        pan_x, pan_y = self.view_pan_side
+        w = self.width // 2
+        h = self.height // 2
+        left = cx - w//2
+        right = left + w
+        top = cy - h//2
+        bottom = top + h
+        side_sig = (cx, cy, w, h, scale, pan_x, pan_y)
 
+        if dirty("side") and hasattr(self, "waterline_points"):
             for z_level, pts in self.waterline_points.items():
+                if r.group(("side", "wl_side", z_level), (side_sig, tuple(pts))):
+                    continue
                 if not pts:
+                    r.end_group()
                     continue
                 coords = []
                 for x, y in pts:
@@ -565,29 +634,23 @@ class CanvasDrawer:
                         coords.extend([sx, sy])
                 if len(coords) >= 4:
                     for w_glow in range(4, 0, -2):
-                        self.canvas.create_line(*coords, fill="#166ad1", width=w_glow, smooth=True)
-                    self.canvas.create_line(*coords, fill="#166ad1", width=2, smooth=True)
-
-        self.update_waterlines()
+                        r.line(("side", "wl_side", z_level, "glow", w_glow), *coords, fill="#166ad1", width=w_glow, smooth=True)
+                    r.line(("side", "wl_side", z_level, "curve"), *coords, fill="#166ad1", width=2, smooth=True)
+                r.end_group()
         #-----------------------------------------------------
 
 
         # === draw buttock lines ===
-        if hasattr(self, "buttocklines"):
+        if dirty("side") and hasattr(self, "buttocklines"):
             # projection 
-            title = "Side View (X-Z)"
-            if "Side View (X-Z)" in title: 
-                proj_func = self.project_side
-            elif "Top View (X-Y)" in title:
-                proj_func = self.project_top
-            elif "Front View (Y-Z)" in title:
-                proj_func = self.project_front
-            else:
-                proj_func = self.project_iso  # fallback (isometric)
+            proj_func = self.project_side
 
             for y in self.buttocklines:
                 bl_points = self.buttockline_points.get(y, [])
+                if r.group(("side", "buttock", y), (side_sig, tuple(bl_points))):
+                    continue
                 if len(bl_points) < 2:
+                    r.end_group()
                     continue
 
                 proj_pts = []
@@ -605,15 +668,19 @@ class CanvasDrawer:
                     coords.extend([sx, sy])
 
                 if len(coords) >= 4:
-                    self.canvas.create_line(*coords, fill="red", width=2, dash=(3, 3), smooth=True)
+                    r.line(("side", "buttock", y, "curve"), *coords, fill="red", width=2, dash=(3, 3), smooth=True)
 
                 # label
                 mid_idx = len(proj_pts)//2
                 if proj_pts:
                     mx, my = proj_pts[mid_idx]
-                    self.canvas.create_text(mx, my - 10, text=f"BL y={y:.2f}", fill="red", font=("Arial", 8, "bold"))
+                    r.text(("side", "buttock", y, "label"), mx, my - 10, text=f"BL y={y:.2f}", fill="red", font=("Arial", 8, "bold"))
+                r.end_group()
             #---------------------------------------------------
 
+        self.draw_frame_time(r)
+        r.end()
+
 
     #Sinchronize all canvas
     def draw_all_canvases(self):
@@ -632,7 +699,7 @@ class CanvasDrawer:
         self.offsets['side'] = (self.divider_x // 2, (self.divider_y + self.height) // 2)
         self.offsets['iso'] = ((self.divider_x + self.width) // 2, (self.divider_y + self.height) // 2)
 
-        self.draw_all()
+        self.request_redraw()
 
     #------For Hide and Show Station in Station List---------
     def hide_station(self, x_vals):
@@ -2,6 +2,7 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 import math
+from ui.pick_index import PickIndex
 
 
 class EventHandler:
@@ -44,7 +45,7 @@ class EventHandler:
         elif viewport == "iso":
             self.iso_scale = new_scale
 
-        self.draw_all()
+        self.request_redraw(viewport)
     
     #Pan function
     def on_middle_click(self, event):
@@ -75,7 +76,7 @@ class EventHandler:
         pan[1] += dy
 
         self.middle_drag_start = (event.x, event.y, vp)
-        self.draw_all()
+        self.request_redraw(vp)
 
     def on_middle_release(self, event):
         self.middle_drag_start = None
@@ -106,7 +107,6 @@ class EventHandler:
             self.current_station_x = x
             self.selected_station = x  
             
-            self.update_waterlines()
             self.draw_all()
             
             messagebox.showinfo("Station Added", f"New station created at X={x} and set as active.")
@@ -149,7 +149,6 @@ class EventHandler:
                 return
             
             self.stations[x].append( (x,y,z) )
-            self.update_waterlines()
             self.draw_all()
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -159,74 +158,50 @@ class EventHandler:
     def is_point_near(self, px, py, x, y, tol=10):
         return abs(px - x) <= tol and abs(py - y) <= tol
 
+    def view_transform(self, vp):
+        """(projection, cx, cy, scale, pan_x, pan_y) of a viewport"""
+        proj, scale, pan = {
+            "top": (self.project_top, self.top_scale, self.view_pan_top),
+            "front": (self.project_front, self.front_scale, self.view_pan_front),
+            "side": (self.project_side, self.side_scale, self.view_pan_side),
+            "iso": (self.project_iso, self.iso_scale, self.view_pan_iso),
+        }[vp]
+        cx, cy = self.offsets[vp]
+        return proj, cx, cy, scale, pan[0], pan[1]
+
+    def pick_index(self, vp):
+        """Screen-space hash of the station points of viewport vp, rebuilt lazily"""
+        if not hasattr(self, "pick_indexes"):
+            self.pick_indexes = {}
+
+        transform = self.view_transform(vp)
+        version = getattr(self.stations, "version", None)    # None: plain dict, no edit stamps
+        key = (transform[1:], version, id(self.stations), tuple(self.station_order))
+
+        cached = self.pick_indexes.get(vp)
+        if version is not None and cached is not None and cached[0] == key:
+            return cached[1]
+
+        index = PickIndex(self.stations, self.station_order, *transform)
+        self.pick_indexes[vp] = (key, index)
+        return index
+
     def find_nearest_point_front(self, x, y):
         # Find point in front view near x,y canvas pos, return (station_x, point_index)
-        cx, cy = self.offsets['front']
-        scale = self.front_scale
-        w = self.width // 2
-        h = self.height // 2
-        left = cx - w//2
-        top = cy - h//2
-
-        for station_x in self.station_order:
-            pts = self.stations[station_x]
-            for i, (px, py3d, pz3d) in enumerate(pts):
-                sx, sy = self.project_front(px, py3d, pz3d)
-                pan_x, pan_y = self.view_pan_front
-                sx = cx + sx * scale + pan_x
-                sy = cy - sy * scale + pan_y
-                if self.is_point_near(sx, sy, x, y):
-                    return station_x, i, sx, sy
-        return None, None, None, None
+        index = self.pick_index("front")
+        row = index.point_at(x, y, tol=10)
+        if row is None:
+            return None, None, None, None
+        return index.station[row].item(), int(index.index[row]), float(index.sx[row]), float(index.sy[row])
 
     def find_nearest_line_front(self, x, y):
         # Find line segment near x,y canvas pos in Front View, return (station_x, index_of_segment)
-        cx, cy = self.offsets['front']
-        scale = self.front_scale
-        w = self.width // 2
-        h = self.height // 2
-
-        def point_line_dist(px, py, x1, y1, x2, y2):
-            # Distance from point to line segment
-            A = px - x1
-            B = py - y1
-            C = x2 - x1
-            D = y2 - y1
-
-            dot = A * C + B * D
-            len_sq = C*C + D*D
-            param = dot / len_sq if len_sq != 0 else -1
-
-            if param < 0:
-                xx, yy = x1, y1
-            elif param > 1:
-                xx, yy = x2, y2
-            else:
-                xx = x1 + param * C
-                yy = y1 + param * D
-
-            dx = px - xx
-            dy = py - yy
-            return math.sqrt(dx*dx + dy*dy), xx, yy
-
-        for station_x in self.station_order:
-            pts = self.stations[station_x]
-            if len(pts) < 2:
-                continue
-            for i in range(len(pts)-1):
-                p1 = pts[i]
-                p2 = pts[i+1]
-                sx1, sy1 = self.project_front(*p1)
-                sx2, sy2 = self.project_front(*p2)
-                pan_x, pan_y = self.view_pan_front
-                sx1 = cx + sx1 * scale + pan_x
-                sy1 = cy - sy1 * scale + pan_y
-                sx2 = cx + sx2 * scale + pan_x
-                sy2 = cy - sy2 * scale + pan_y
-                dist, xx, yy = point_line_dist(x, y, sx1, sy1, sx2, sy2)
-                if dist < 8:
-                    return station_x, i, (xx, yy)
-        return None, None, None
+        index = self.pick_index("front")
+        hit = index.segment_at(x, y, tol=8)
+        if hit is None:
+            return None, None, None
+        row, xx, yy = hit
+        return index.station[row].item(), int(index.index[row]), (xx, yy)
 
 
     # Mouse event handlers
@@ -306,11 +281,11 @@ class EventHandler:
 
         if self.dragging_divider == 'vertical':
             self.divider_x = max(100, min(self.width - 100, event.x))
-            self.draw_all()
+            self.request_redraw()
             return
         elif self.dragging_divider == 'horizontal':
             self.divider_y = max(100, min(self.height - 100, event.y))
-            self.draw_all()
+            self.request_redraw()
             return
         
         # === DRAG CENTERLINE IN SIDE VIEW ===
@@ -322,9 +297,11 @@ class EventHandler:
 
             x = (event.x - cx - pan_x) / scale
             z = (cy - event.y + pan_y) / scale
+            self.save_state(coalesce="drag")     # whole drag = one undo step
             self.centerline_points[idx] = (x, z)
-            
-            self.draw_all()
+
+            # waterline sections follow the centerline in every viewport
+            self.request_redraw()
             return
         
         # === DRAG POINT IN FRONT VIEW ===
@@ -348,8 +325,10 @@ class EventHandler:
         proj_z = (cy - event.y + pan_y) / scale
 
         # Update point, keep x fixed (station_x)
+        self.save_state(coalesce="drag")     # whole drag = one undo step
         self.stations[station_x][pidx] = (station_x, proj_y, proj_z)
-        self.draw_all()
+        self.mark_station_dirty(station_x)
+        self.request_redraw()
 
 
     #left click release
@@ -358,6 +337,7 @@ class EventHandler:
         self.drag_data['point_index'] = None
         self.drag_data.pop('centerline_index', None)
         self.dragging_divider = None
+        self.journal.seal()
 
     #right click
     def on_right_click(self, event):
@@ -466,7 +446,7 @@ class EventHandler:
             return
 
         self.stations[station_x].append((station_x, proj_y, proj_z))
-        self.update_waterlines()
+        self.mark_station_dirty(station_x)
         self.draw_all()
 
     #menu delete point using right click
@@ -479,6 +459,7 @@ class EventHandler:
         pts = self.stations[station_x]
         if 0 <= pidx < len(pts):
             pts.pop(pidx)
+            self.mark_station_dirty(station_x)
             self.draw_all()
     
     #Menu add point between two points in a curve using right click
@@ -500,6 +481,7 @@ class EventHandler:
             (p1[2] + p2[2]) / 2
         )
         pts.insert(idx+1, mid)
+        self.mark_station_dirty(station_x)
         self.draw_all()
 
 
@@ -518,29 +500,31 @@ class EventHandler:
         x_mouse, y_mouse = event.x, event.y
         found = False
 
-        for x_val in self.stations:
-            for _, y, z in self.stations[x_val]:
-                px, py = self.canvas_drawer.project_point(x_val, y, z)
-
-                # Detect mouse near point
-                if abs(px - x_mouse) < 5 and abs(py - y_mouse) < 5:
-                    # Update tooltip
-                    self.tooltip.config(text=f"Y={y:.3f}, Z={z:.3f}")
-
-                    # delete tooltip
-                    if self.tooltip_window:
-                        self.canvas.delete(self.tooltip_window)
-
-                    # create new tooltip
-                    self.tooltip_window = self.canvas.create_window(
-                        event.x + 10, event.y + 10,
-                        window=self.tooltip, anchor="nw"
-                    )
-                    found = True
-                    break
-
-            if found:
-                break
+        # viewport quadrant under the mouse (same split as project_point)
+        if x_mouse < self.divider_x:
+            vp = "top" if y_mouse < self.divider_y else "side"
+        else:
+            vp = "front" if y_mouse < self.divider_y else "iso"
+
+        # Detect mouse near point
+        index = self.pick_index(vp) if vp in self.offsets else None
+        row = index.point_at(x_mouse, y_mouse, tol=5, strict=True) if index else None
+        if row is not None:
+            _, y, z = index.points[row]
+
+            # Update tooltip
+            self.tooltip.config(text=f"Y={y:.3f}, Z={z:.3f}")
+
+            # delete tooltip
+            if self.tooltip_window:
+                self.canvas.delete(self.tooltip_window)
+
+            # create new tooltip
+            self.tooltip_window = self.canvas.create_window(
+                event.x + 10, event.y + 10,
+                window=self.tooltip, anchor="nw"
+            )
+            found = True
 
         if not found and self.tooltip_window:
             self.canvas.delete(self.tooltip_window)
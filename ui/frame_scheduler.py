@@ -0,0 +1,108 @@
+#frame_scheduler.py
+import time
+from collections import deque
+
+
+class FrameScheduler:
+    """
+    Coalesce redraw requests from Tk events.
+    Handlers only invalidate viewports, the drawing runs at most once
+    per frame (after_idle, or after() when the last frame was too recent).
+
+    widget : any Tk widget (for after / after_idle)
+    draw   : callback draw(viewports), viewports = set of names or None (all)
+    """
+
+    def __init__(self, widget, draw, interval_ms=16):
+        self.widget = widget
+        self.draw = draw
+        self.interval_ms = interval_ms      # ~60 fps
+        self.dirty = set()
+        self.dirty_all = False
+        self.after_id = None
+        self.last_frame = 0.0
+
+        # frame time counter
+        self.frame_times = deque(maxlen=120)
+        self.frames = 0
+        self.requests = 0
+
+    # ------------------------------
+    # Invalidation
+    # ------------------------------
+    def invalidate(self, viewports=None):
+        """Mark viewports (name or iterable, None = everything) for the next frame"""
+        self.requests += 1
+        if viewports is None:
+            self.dirty_all = True
+        elif isinstance(viewports, str):
+            self.dirty.add(viewports)
+        else:
+            self.dirty.update(viewports)
+
+        if self.after_id is None:
+            wait = self.interval_ms - (time.perf_counter() - self.last_frame) * 1000.0
+            if wait > 1:
+                self.after_id = self.widget.after(int(wait), self.flush)
+            else:
+                self.after_id = self.widget.after_idle(self.flush)
+
+    def pending(self):
+        return self.dirty_all or bool(self.dirty)
+
+    # ------------------------------
+    # Frame
+    # ------------------------------
+    def flush(self):
+        """Draw everything invalidated since the last frame"""
+        self.after_id = None
+        if not self.pending():
+            return
+
+        viewports = None if self.dirty_all else set(self.dirty)
+        self.dirty.clear()
+        self.dirty_all = False
+
+        self.last_frame = time.perf_counter()
+        self.draw(viewports)
+        self.record(time.perf_counter() - self.last_frame)
+
+    def flush_now(self):
+        """Draw pending work immediately (e.g. before a dialog opens)"""
+        self.cancel()
+        self.flush()
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+    def discard(self):
+        """Drop pending invalidations, a full redraw already happened"""
+        self.cancel()
+        self.dirty.clear()
+        self.dirty_all = False
+
+    # ------------------------------
+    # Frame time counter
+    # ------------------------------
+    def record(self, seconds):
+        self.frames += 1
+        self.frame_times.append(seconds * 1000.0)
+
+    def stats(self):
+        """Frame times in ms over the last frames, fps = what the draw time allows"""
+        if not self.frame_times:
+            return {"frames": 0, "requests": self.requests,
+                    "last_ms": 0.0, "avg_ms": 0.0, "max_ms": 0.0, "fps": 0.0}
+
+        times = self.frame_times
+        avg = sum(times) / len(times)
+        return {
+            "frames": self.frames,
+            "requests": self.requests,
+            "last_ms": times[-1],
+            "avg_ms": avg,
+            "max_ms": max(times),
+            "fps": 1000.0 / avg if avg > 0 else 0.0,
+        }
@@ -4,9 +4,13 @@ from tkinter import messagebox
 from tkinter import messagebox, filedialog
 from tkinter import ttk
 import csv
-import copy
 import json
 from ui.draw_canvas import CanvasDrawer
+from core import project_io
+from core.csv_import import import_csv, ImportCancelled
+from ui.tk_tasks import BackgroundTask, ProgressWindow
+from core.autosave import Autosave, read_autosave
+import time
 
 class MenuBar:
     def create_menu_bar(self):
@@ -20,12 +24,16 @@ class MenuBar:
         filemenu.add_separator()
         filemenu.add_command(label="Load JSON", command=self.load_project_json)
         filemenu.add_command(label="Save as JSON", command=self.save_project_json)
+        filemenu.add_command(label="Load Binary Project", command=self.load_project_binary)
+        filemenu.add_command(label="Save as Binary Project", command=self.save_project_binary)
         #filemenu.add_command(label="Load", command=self.load_project) #not active
         filemenu.add_separator()
         filemenu.add_command(label="Load CSV", command=self.load_csv)
         filemenu.add_command(label="Save as CSV", command=self.save_project)
         filemenu.add_separator()
-        filemenu.add_command(label="Exit", command=self.master.quit)
+        filemenu.add_command(label="Recover Autosave", command=self.recover_autosave)
+        filemenu.add_separator()
+        filemenu.add_command(label="Exit", command=self.close_app)
         menubar.add_cascade(label="File", menu=filemenu)
 
         # Edit menu
@@ -38,6 +46,7 @@ class MenuBar:
         edit_menu.add_separator()
         edit_menu.add_command(label="Add Buttockline", command=self.add_buttockline)
         edit_menu.add_command(label="Refresh Buttocklines", command=self.refresh_buttocklines)
+        edit_menu.add_command(label="Refresh All Sections", command=self.refresh_sections)
         menubar.add_cascade(label="Edit", menu=edit_menu)
 
         # Window menu
@@ -50,28 +59,19 @@ class MenuBar:
         # Window View
         window_view = tk.Menu(menubar, tearoff=0)
         window_view.add_command(label="Preview Hull", command=self.preview_hull_3d)
+        window_view.add_checkbutton(label="Live Preview", command=self.toggle_live_preview)
+        window_view.add_separator()
+        window_view.add_checkbutton(label="Show Frame Time", command=self.toggle_frame_time)
         menubar.add_cascade(label="View", menu=window_view)
 
 
     #Definition For Menu Bar
     def new_file(self):
         if messagebox.askyesno("New Project", "Any unsaved changes will be lost. Continue?"):
-            # Reset all data
-            self.stations = {}
-            self.station_names = {}
-            self.station_order = []
+            # Reset all data (the model observer clears the canvas)
             self.front_scale = 50
             self.view_pan_front = [0, 0]
-            self.waterlines = []
-            self.waterline_points = {}    
-            self.waterline_names = {}
-            self.centerline_points = []
-            self.buttocklines = []
-            self.buttockline_points = {}
-            self.buttockline_names = {}
-
-            # Clear canvas
-            self.draw_all()
+            self.model.clear()
 
             messagebox.showinfo("New Project", "New project created.")
 
@@ -180,7 +180,7 @@ class MenuBar:
                 project["stations"].append({
                     "x": x,
                     "name": self.station_names.get(x, f"Station X={x:.3f}"),
-                    "points": self.stations.get(x, [])
+                    "points": list(self.stations.get(x, []))
                 })
 
             # === Waterlines ===
@@ -226,80 +226,60 @@ class MenuBar:
             return
 
         try:
+            # orders sorted like before: stations by X, waterlines top down
+            project = project_io.read_json(filename)
             self.save_state()
+            self.model.load(project)
+            messagebox.showinfo("Success", f"Loaded JSON project:\n{filename}")
 
-            # === Clear existing data ===
-            self.stations.clear()
-            self.station_names.clear()
-            self.station_order.clear()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load JSON:\n{e}")
 
-            self.waterlines.clear()
-            self.waterline_names.clear()
-            self.waterline_points.clear()
-            self.waterline_order = []
 
-            self.centerline_points = []
 
-            self.buttocklines = []
-            self.buttockline_names = {}
-            self.buttockline_points = {}
+    def save_project_binary(self):
+        if (not self.station_order
+            and not self.waterlines
+            and not getattr(self, "centerline_points", [])
+            and not getattr(self, "buttocklines", [])):
+            messagebox.showwarning("Warning", "No geometry data to save.")
+            return
 
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".hullbin",
+            filetypes=[("Hull Project Binary (*.hullbin)", "*.hullbin")],
+            title="Save Project As Binary"
+        )
+        if not filename:
+            return
 
-            
-            # === Ship Dimensions ===
-            self.ship_dimensions = data.get(
-                "ship_dimensions",
-                {"Lpp": 0.0, "Bmax": 0.0, "Draft": 0.0}
-            )
+        try:
+            self.model.save(filename)
+            messagebox.showinfo("Success", f"Project saved as binary:\n{filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save binary project:\n{e}")
 
 
-            # === Stations ===
-            for st in data.get("stations", []):
-                x = float(st["x"])
-                self.station_order.append(x)
-                self.station_names[x] = st.get("name", f"Station X={x:.3f}")
-                self.stations[x] = [
-                    tuple(p) for p in st.get("points", [])
-                ]
 
-            # === Waterlines ===
-            for wl in data.get("waterlines", []):
-                z = float(wl["z"])
-                self.waterlines[z] = []
-                self.waterline_order.append(z)
-                self.waterline_names[z] = wl.get("name", f"WL z={z:.3f}")
-                self.waterline_points[z] = [
-                    tuple(p) for p in wl.get("points", [])
-                ]
+    def load_project_binary(self):
+        filename = filedialog.askopenfilename(
+            defaultextension=".hullbin",
+            filetypes=[("Hull Project Binary (*.hullbin)", "*.hullbin")],
+            title="Load Project (Binary)"
+        )
+        if not filename:
+            return
 
-            # === Buttocklines ===
-            for bl in data.get("buttocklines", []):
-                y = float(bl["y"])
-                self.buttocklines.append(y)
-                self.buttockline_names[y] = bl.get("name", f"BL y={y:.3f}")
-                self.buttockline_points[y] = [
-                    tuple(p) for p in bl.get("points", [])
-                ]
+        try:
+            # arrays are memory-mapped, points are read when first touched
+            project = project_io.read_project(filename)
+            self.save_state()
+            self.model.load(project)
 
-            # === Centerline ===
-            cl = data.get("centerline")
-            if cl:
-                self.centerline_points = [
-                    tuple(p) for p in cl.get("points", [])
-                ]
-
-            # === Sorting ===
-            self.station_order.sort()
-            self.waterline_order.sort(reverse=True)
-            self.centerline_points.sort(key=lambda p: p[0])
-
-            self.draw_all()
-            messagebox.showinfo("Success", f"Loaded JSON project:\n{filename}")
+            messagebox.showinfo("Success", f"Loaded binary project:\n{filename}")
 
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load JSON:\n{e}")
+            messagebox.showerror("Error", f"Failed to load binary project:\n{e}")
 
 
 
@@ -311,100 +291,41 @@ class MenuBar:
         )
         if not filename:
             return
+        self.import_csv_file(filename)
 
-        try:
-            self.save_state()
-
-            # Clear existing data
-            self.stations.clear()
-            self.station_names.clear()
-            self.station_order.clear()
-            self.waterlines.clear()
-            self.waterline_names.clear()
-            self.waterline_points.clear()
-            self.centerline_points = []
-            self.buttocklines = []
-            self.buttockline_names = {}
-            self.buttockline_points = {}
-
-            with open(filename, newline='', encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    row_type = row.get("type", "").lower().strip()
-
-                    if row_type == "station":
-                        try:
-                            x = float(row["axis_value"])
-                            y = float(row["y"])
-                            z = float(row["z"])
-                        except ValueError:
-                            continue
-                        name = row["name"]
-
-                        if x not in self.stations:
-                            self.stations[x] = []
-                            self.station_order.append(x)
-                            self.station_names[x] = name
-                        self.stations[x].append((x, y, z))
-
-                    elif row_type == "waterline":
-                        try:
-                            z_val = float(row["axis_value"])
-                            x = float(row["y"])
-                            y = float(row["z"])
-                        except ValueError:
-                            continue
-
-                        name = row["name"]
 
-                        # pastikan struktur ada
-                        if not hasattr(self, "waterlines"):
-                            self.waterlines = {}
-                        if not hasattr(self, "waterline_order"):
-                            self.waterline_order = []
-                        if not hasattr(self, "waterline_names"):
-                            self.waterline_names = {}
+    def import_csv_file(self, filename):
+        """Parse a CSV in the background (chunked NumPy), put it in the model when done"""
+        if getattr(self, "csv_task", None) is not None:
+            messagebox.showwarning("Warning", "A CSV import is already running.")
+            return
 
-                        if z_val not in self.waterlines:
-                            self.waterlines[z_val] = []
-                            self.waterline_order.append(z_val)
-                            self.waterline_names[z_val] = name
+        def cancel():
+            task.cancel()
 
-                        self.waterlines[z_val].append((x, y))
+        progress = ProgressWindow(self.master, "Importing CSV...", on_cancel=cancel)
 
+        def work(task):
+            return import_csv(filename, progress=task.progress, cancelled=task.is_cancelled)
 
-                    elif row_type == "centerline":
-                        try:
-                            x = float(row["axis_value"])
-                            z = float(row["z"])
-                        except ValueError:
-                            continue
-                        self.centerline_points.append((x, z))
-
-                    elif row_type == "buttockline":
-                        try:
-                            y_val = float(row["axis_value"])
-                            x = float(row["y"])
-                            z = float(row["z"])
-                        except ValueError:
-                            continue
-                        name = row["name"]
-                        if y_val not in self.buttocklines:
-                            self.buttocklines.append(y_val)
-                            self.buttockline_points[y_val] = []
-                            self.buttockline_names[y_val] = name
-                        self.buttockline_points[y_val].append((x, z))
+        def done(project):
+            self.csv_task = None
+            progress.close()
+            self.save_state()
+            self.model.load(project)
+            messagebox.showinfo("Success", f"Loaded CSV:\n{filename}")
 
-            # Sorting
-            self.station_order.sort()
-            self.waterline_order.sort(reverse=True)
-            self.centerline_points.sort(key=lambda p: p[0])
+        def failed(e):
+            self.csv_task = None
+            progress.close()
+            if not isinstance(e, ImportCancelled):
+                messagebox.showerror("Error", f"Failed to load CSV:\n{e}")
 
-            self.draw_all()
-            messagebox.showinfo("Success", f"Loaded project from {filename}")
+        def report(done_bytes, total_bytes):
+            progress.update(done_bytes, total_bytes, f"Importing CSV... {100 * done_bytes // total_bytes}%")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load file:\n{e}")
+        task = self.csv_task = BackgroundTask(self, work, on_done=done, on_error=failed, on_progress=report)
+        task.start()
 
 
     def station_list(self):
@@ -481,6 +402,7 @@ class MenuBar:
                     elif col == "#2":  # Z column
                         z = new_val
                     self.stations[x_val][idx] = (x_val, y, z)
+                    self.mark_station_dirty(x_val)
                     self.draw_all()  # update GUI
                     tree.set(item_id, column=col, value=f"{new_val:.3f}")
                 except ValueError:
@@ -597,77 +519,63 @@ class MenuBar:
         filename = filedialog.askopenfilename(title="Load CSV", filetypes=[("CSV files","*.csv")])
         if not filename:
             return
-        # Dave state
-        self.save_state()
-        try:
-            self.stations.clear()
-            self.station_names.clear()
-            self.station_order.clear()
-
-            with open(filename, newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    name = row['station_name']
-                    x = float(row['station_x'])
-                    y = float(row['y'])
-                    z = float(row['z'])
+        # station export (station_name,station_x,y,z) or full project (type,name,axis_value,y,z)
+        self.import_csv_file(filename)
 
-                    # Add to station
-                    if x not in self.stations:
-                        self.stations[x] = []
-                        self.station_order.append(x)
-                        self.station_names[x] = name
 
-                    self.stations[x].append((x, y, z))
+    # ===============================
+    # Autosave
+    # ===============================
+    def start_autosave(self, interval_ms=30000):
+        # changed sections are written by a worker thread, see core/autosave.py
+        self.autosave = Autosave()
+        self.autosave.prime(self.model)
+        self.autosave_interval_ms = interval_ms
+        self.after(interval_ms, self.autosave_tick)
+
+    def autosave_tick(self):
+        try:
+            self.autosave.request(self.model)
+        except Exception as e:
+            self.autosave.last_error = e
+        self.after(self.autosave_interval_ms, self.autosave_tick)
+
+    def close_app(self):
+        # the autosave worker finishes its write and marks the session closed
+        if getattr(self, "autosave", None) is not None:
+            self.autosave.stop()
+        self.master.destroy()
+
+    def recover_autosave(self):
+        project = read_autosave(self.autosave.directory)
+        if project is None:
+            messagebox.showinfo("Recover Autosave", "No autosave found.")
+            return
 
-            self.draw_all()
-            messagebox.showinfo("Success", "CSV loaded successfully!")
+        saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(project["saved"] or 0))
+        if not messagebox.askyesno("Recover Autosave", f"Replace the current project with the autosave of {saved}?"):
+            return
 
+        try:
+            self.save_state()
+            self.model.load(project)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load CSV:\n{e}")
+            messagebox.showerror("Error", f"Failed to recover autosave:\n{e}")
 
 
-    def save_state(self):
-        state = {
-            'stations': copy.deepcopy(self.stations),
-            'station_names': copy.deepcopy(self.station_names),
-            'station_order': copy.deepcopy(self.station_order)
-        }
-        self.undo_stack.append(state)
-        
-        self.redo_stack.clear()
+    def save_state(self, coalesce=None):
+        # checkpoint before an edit, the journal stores only what changed
+        self.journal.checkpoint(self.model, coalesce)
     
     def undo(self):
-        if not self.undo_stack:
-            return
-        # save current state to redo
-        self.redo_stack.append({
-            'stations': copy.deepcopy(self.stations),
-            'station_names': copy.deepcopy(self.station_names),
-            'station_order': copy.deepcopy(self.station_order)
-        })
-        # take the latest state 
-        state = self.undo_stack.pop()
-        self.stations = state['stations']
-        self.station_names = state['station_names']
-        self.station_order = state['station_order']
-        self.draw_all()
+        touched = self.journal.undo(self.model)
+        if touched is not None:
+            self.model.changed("history", touched)
 
     def redo(self):
-        if not self.redo_stack:
-            return
-        # save thr current state to undo
-        self.undo_stack.append({
-            'stations': copy.deepcopy(self.stations),
-            'station_names': copy.deepcopy(self.station_names),
-            'station_order': copy.deepcopy(self.station_order)
-        })
-        # take the latest state 
-        state = self.redo_stack.pop()
-        self.stations = state['stations']
-        self.station_names = state['station_names']
-        self.station_order = state['station_order']
-        self.draw_all()
+        touched = self.journal.redo(self.model)
+        if touched is not None:
+            self.model.changed("history", touched)
 
 
     # ===============================
@@ -0,0 +1,119 @@
+#pick_index.py
+import numpy as np
+from core.sectioning import pack_stations
+
+
+def _ranges(counts):
+    """For each k, local indices 0..counts[k]-1 concatenated, and the k of each"""
+    owner = np.repeat(np.arange(len(counts)), counts)
+    first = np.cumsum(counts) - counts
+    return np.arange(counts.sum()) - first[owner], owner
+
+
+class ScreenGrid:
+    """
+    Uniform grid hash over screen-space boxes (x0, y0, x1, y1).
+    Each box is listed in every cell it overlaps; boxes spanning more
+    than max_cells cells are kept apart and always returned.
+    """
+
+    def __init__(self, boxes, cell=32.0, max_cells=64):
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self.cell = cell
+
+        i0 = np.floor(np.minimum(boxes[:, 0], boxes[:, 2]) / cell).astype(np.int64)
+        j0 = np.floor(np.minimum(boxes[:, 1], boxes[:, 3]) / cell).astype(np.int64)
+        ni = np.floor(np.maximum(boxes[:, 0], boxes[:, 2]) / cell).astype(np.int64) - i0 + 1
+        nj = np.floor(np.maximum(boxes[:, 1], boxes[:, 3]) / cell).astype(np.int64) - j0 + 1
+        counts = ni * nj
+
+        big = counts > max_cells
+        self.always = np.flatnonzero(big)
+        counts[big] = 0
+
+        local, ids = _ranges(counts)
+        keys = self.key(i0[ids] + local // nj[ids], j0[ids] + local % nj[ids])
+
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        self.ids = ids[order]
+
+        uniq, starts = np.unique(keys, return_index=True)
+        stops = np.append(starts[1:], len(keys))
+        self.cells = dict(zip(uniq.tolist(), zip(starts.tolist(), stops.tolist())))
+
+    @staticmethod
+    def key(i, j):
+        return (i << 32) + (j & 0xFFFFFFFF)
+
+    def candidates(self, x, y, tol):
+        """Ids of boxes that may lie within tol of (x, y), ascending"""
+        c = self.cell
+        found = [self.always]
+        for i in range(int(np.floor((x - tol) / c)), int(np.floor((x + tol) / c)) + 1):
+            for j in range(int(np.floor((y - tol) / c)), int(np.floor((y + tol) / c)) + 1):
+                span = self.cells.get(self.key(i, j))
+                if span is not None:
+                    found.append(self.ids[span[0]:span[1]])
+        return np.unique(np.concatenate(found))
+
+
+class PickIndex:
+    """
+    Screen positions of all station points and segments of one viewport,
+    hashed for hover and pick queries. Rebuilt when the view transform or
+    the geometry changes (see EventHandler.pick_index).
+    Order of points/segments = station order, then point order.
+    """
+
+    def __init__(self, stations, station_order, proj_func, cx, cy, scale, pan_x, pan_y, cell=32.0):
+        P, keys, lengths = pack_stations(stations, station_order)
+
+        self.station = np.repeat(keys, lengths)
+        self.index = np.concatenate([np.arange(n) for n in lengths]) if len(lengths) else np.zeros(0, dtype=int)
+        self.points = P
+
+        px, py = proj_func(P[:, 0], P[:, 1], P[:, 2])
+        self.sx = cx + np.asarray(px, dtype=float) * scale + pan_x
+        self.sy = cy - np.asarray(py, dtype=float) * scale + pan_y
+        self.point_grid = ScreenGrid(np.column_stack((self.sx, self.sy, self.sx, self.sy)), cell)
+
+        # segments i -> i+1 inside a station
+        starts = np.ones(len(P), dtype=bool)
+        starts[(np.cumsum(lengths) - 1)[lengths > 0]] = False
+        self.seg = np.flatnonzero(starts)
+        self.seg_grid = ScreenGrid(np.column_stack((
+            self.sx[self.seg], self.sy[self.seg], self.sx[self.seg + 1], self.sy[self.seg + 1]
+        )), cell)
+
+    def point_at(self, x, y, tol, strict=False):
+        """First point with |dx|, |dy| <= tol (< tol if strict), its row or None"""
+        ids = self.point_grid.candidates(x, y, tol)
+        dx = np.abs(self.sx[ids] - x)
+        dy = np.abs(self.sy[ids] - y)
+        hit = (dx < tol) & (dy < tol) if strict else (dx <= tol) & (dy <= tol)
+        ids = ids[hit]
+        return int(ids[0]) if len(ids) else None
+
+    def segment_at(self, x, y, tol):
+        """First segment closer than tol, (row of its first point, foot x, foot y) or None"""
+        ids = self.seg_grid.candidates(x, y, tol)
+        a = self.seg[ids]
+        x1, y1 = self.sx[a], self.sy[a]
+        C = self.sx[a + 1] - x1
+        D = self.sy[a + 1] - y1
+
+        len_sq = C * C + D * D
+        dot = (x - x1) * C + (y - y1) * D
+        param = np.divide(dot, len_sq, out=np.full(len(a), -1.0), where=len_sq != 0)
+
+        x2, y2 = self.sx[a + 1], self.sy[a + 1]
+        xx = np.where(param < 0, x1, np.where(param > 1, x2, x1 + param * C))
+        yy = np.where(param < 0, y1, np.where(param > 1, y2, y1 + param * D))
+        dist = np.sqrt((x - xx) ** 2 + (y - yy) ** 2)
+
+        hit = np.flatnonzero(dist < tol)
+        if not len(hit):
+            return None
+        k = hit[0]
+        return int(a[k]), float(xx[k]), float(yy[k])
@@ -0,0 +1,124 @@
+#retained_canvas.py
+
+
+class RetainedCanvas:
+    """
+    Retained-mode helper for a tk.Canvas.
+    Items are kept by key between frames and only moved (coords) or
+    re-styled (itemconfigure) when they change, instead of delete("all").
+
+    key   : tuple, key[0] is the scope (viewport name)
+    group : set of items drawn from the same data, skipped as a whole
+            when its signature (data + view transform) is unchanged
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items = {}         # key -> [kind, item_id, coords, options]
+        self.groups = {}        # group key -> (signature, set of item keys)
+        self.live = set()
+        self.live_groups = set()
+        self.scopes = None
+        self.current = None
+        self.created = False
+
+    # ------------------------------
+    # Frame
+    # ------------------------------
+    def begin(self, scopes=None):
+        """scopes : viewports redrawn this frame (None = all)"""
+        self.live = set()
+        self.live_groups = set()
+        self.scopes = None if scopes is None else set(scopes)
+        self.current = None
+        self.created = False
+
+    def in_scope(self, key):
+        return self.scopes is None or key[0] in self.scopes
+
+    def end(self):
+        """Delete items of the redrawn scopes that were not drawn again"""
+        for key in [k for k in self.items if k not in self.live and self.in_scope(k)]:
+            self.canvas.delete(self.items.pop(key)[1])
+
+        for key in [g for g in self.groups if g not in self.live_groups and self.in_scope(g)]:
+            del self.groups[key]
+
+        if self.created:
+            # keep stacking: viewport backgrounds below, dividers on top
+            self.canvas.tag_lower("background")
+            self.canvas.tag_raise("divider_v")
+            self.canvas.tag_raise("divider_h")
+
+        self.current = None
+
+    def clear(self):
+        for entry in self.items.values():
+            self.canvas.delete(entry[1])
+        self.items.clear()
+        self.groups.clear()
+
+    # ------------------------------
+    # Groups
+    # ------------------------------
+    def group(self, key, signature):
+        """
+        Open a group. Returns True when nothing changed since the last
+        frame: its items are kept and the caller skips drawing them.
+        """
+        self.live_groups.add(key)
+        old = self.groups.get(key)
+        if old is not None and old[0] == signature:
+            self.live.update(old[1])
+            self.current = None
+            return True
+
+        self.groups[key] = (signature, set())
+        self.current = key
+        return False
+
+    def reopen(self, key):
+        """Draw more items into a group opened (and changed) earlier this frame"""
+        self.current = key
+
+    def end_group(self):
+        self.current = None
+
+    # ------------------------------
+    # Items
+    # ------------------------------
+    def item(self, kind, key, coords, options):
+        coords = tuple(coords)
+        entry = self.items.get(key)
+
+        if entry is None or entry[0] != kind:
+            if entry is not None:
+                self.canvas.delete(entry[1])
+            item_id = getattr(self.canvas, "create_" + kind)(*coords, **options)
+            self.items[key] = [kind, item_id, coords, options]
+            self.created = True
+        else:
+            item_id = entry[1]
+            if entry[2] != coords:
+                self.canvas.coords(item_id, *coords)
+                entry[2] = coords
+            if entry[3] != options:
+                self.canvas.itemconfigure(item_id, **options)
+                entry[3] = options
+
+        self.live.add(key)
+        if self.current is not None:
+            self.groups[self.current][1].add(key)
+        return item_id
+
+    def line(self, key, *coords, **options):
+        return self.item("line", key, coords, options)
+
+    def oval(self, key, *coords, **options):
+        return self.item("oval", key, coords, options)
+
+    def rectangle(self, key, *coords, **options):
+        return self.item("rectangle", key, coords, options)
+
+    def text(self, key, *coords, **options):
+        return self.item("text", key, coords, options)
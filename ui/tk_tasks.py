@@ -0,0 +1,107 @@
+#tk_tasks.py
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+
+class BackgroundTask:
+    """
+    Run work(task) in a worker thread without blocking the Tk loop.
+    The worker reports through task.progress(...) and checks
+    task.is_cancelled(); results come back on the Tk thread by polling
+    a queue with after():
+
+        on_progress(*args)   latest progress report of each poll
+        on_done(result)      work returned
+        on_error(exc)        work raised
+    """
+
+    def __init__(self, widget, work, on_done=None, on_error=None, on_progress=None, poll_ms=50):
+        self.widget = widget
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.finished = False
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.widget.after(self.poll_ms, self.poll)
+        return self
+
+    # ------------------------------
+    # Worker side
+    # ------------------------------
+    def run(self):
+        try:
+            self.events.put(("done", self.work(self)))
+        except Exception as e:
+            self.events.put(("error", e))
+
+    def progress(self, *args):
+        self.events.put(("progress", args))
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    # ------------------------------
+    # Tk side
+    # ------------------------------
+    def cancel(self):
+        self.cancel_event.set()
+
+    def poll(self):
+        progress = None
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                progress = value
+                continue
+
+            self.finished = True
+            if progress is not None and self.on_progress:
+                self.on_progress(*progress)
+            callback = self.on_done if kind == "done" else self.on_error
+            if callback:
+                callback(value)
+            return
+
+        if progress is not None and self.on_progress:
+            self.on_progress(*progress)
+        self.widget.after(self.poll_ms, self.poll)
+
+
+class ProgressWindow:
+    """Small modal-less window with a progress bar and a Cancel button"""
+
+    def __init__(self, master, title, on_cancel=None):
+        self.win = tk.Toplevel(master)
+        self.win.title(title)
+        self.win.geometry("320x110")
+        self.win.resizable(False, False)
+        self.win.protocol("WM_DELETE_WINDOW", on_cancel or self.close)
+
+        self.label = ttk.Label(self.win, text=title)
+        self.label.pack(padx=10, pady=(10, 5), anchor="w")
+        self.bar = ttk.Progressbar(self.win, orient="horizontal", length=300, mode="determinate", maximum=100)
+        self.bar.pack(padx=10, pady=5)
+        if on_cancel:
+            ttk.Button(self.win, text="Cancel", command=on_cancel).pack(pady=5)
+
+    def update(self, done, total, text=None):
+        self.bar["value"] = 100.0 * done / total if total else 0.0
+        if text is not None:
+            self.label.configure(text=text)
+
+    def close(self):
+        if self.win.winfo_exists():
+            self.win.destroy()